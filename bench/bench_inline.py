@@ -0,0 +1,41 @@
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from textnode import TextNode, TextType
+from nodesplitter import split_nodes_delimiter, split_nodes_image, split_nodes_link, split_text_inline
+
+# Compares the single pass inline tokenizer used by text_to_text_nodes with
+# the original pipeline of five split passes.
+#
+#   python3 bench/bench_inline.py [repeat]
+
+SENTENCE = (
+    "This is **bold** text with an _italic_ word, a `code span`, an "
+    "![image](/images/tolkien.png) and a [link](/blog/tom) in it. "
+)
+
+def split_text_multi_pass(text):
+    nodes = split_nodes_image([TextNode(text, TextType.TEXT)])
+    nodes = split_nodes_link(nodes)
+    for delimiter, text_type in (("**", TextType.BOLD), ("_", TextType.ITALIC), ("`", TextType.CODE)):
+        nodes = split_nodes_delimiter(nodes, delimiter, text_type)
+    return nodes
+
+def bench(sentences, repeat):
+    text = SENTENCE * sentences
+    assert split_text_inline(text) == split_text_multi_pass(text)
+    number = max(1, 2000 // sentences)
+    multi_pass = min(timeit.repeat(lambda: split_text_multi_pass(text), number=number, repeat=repeat)) / number
+    single_pass = min(timeit.repeat(lambda: split_text_inline(text), number=number, repeat=repeat)) / number
+    print(f"{sentences:>6} sentences  multi-pass {multi_pass * 1e6:10.1f} us  single-pass {single_pass * 1e6:10.1f} us  speedup {multi_pass / single_pass:5.2f}x")
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) >= 2 else 5
+    for sentences in (1, 10, 100, 1000):
+        bench(sentences, repeat)
+
+if __name__ == "__main__":
+    main()
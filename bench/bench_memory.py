@@ -0,0 +1,52 @@
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from convertnode import markdown_to_html_node
+from htmlnode import LeafNode, ParentNode
+from textnode import TextNode, TextType
+
+# Measures the peak memory of parsing markdown into a full HTMLNode tree,
+# reported per MB of markdown, plus the size of single node instances.
+#
+#   python3 bench/bench_memory.py [megabytes]
+
+PARAGRAPH = (
+    "This is **bold** text with an _italic_ word, a `code span`, an "
+    "![image](/images/tolkien.png) and a [link](/blog/tom) in it.\n"
+    "A second line with more **bold** and _italic_ words.\n\n"
+)
+LIST = "- item with **bold**\n- item with _italic_\n- item with `code`\n\n"
+
+def make_markdown(megabytes):
+    chunk = "## Heading\n\n" + PARAGRAPH * 4 + LIST
+    return chunk * max(1, int(megabytes * 1024 * 1024 / len(chunk)))
+
+def instance_size(obj):
+    size = sys.getsizeof(obj)
+    if hasattr(obj, "__dict__"):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+def main():
+    megabytes = float(sys.argv[1]) if len(sys.argv) >= 2 else 1
+    markdown = make_markdown(megabytes)
+    markdown_megabytes = len(markdown.encode()) / (1024 * 1024)
+
+    tracemalloc.start()
+    node = markdown_to_html_node(markdown)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"markdown          {markdown_megabytes:8.2f} MB")
+    print(f"peak              {peak / (1024 * 1024):8.2f} MB")
+    print(f"peak per MB       {peak / (1024 * 1024) / markdown_megabytes:8.2f} MB")
+    print(f"TextNode          {instance_size(TextNode('text', TextType.TEXT)):8d} bytes")
+    print(f"LeafNode          {instance_size(LeafNode('b', 'text')):8d} bytes")
+    print(f"ParentNode        {instance_size(ParentNode('p', [])):8d} bytes")
+    del node
+
+if __name__ == "__main__":
+    main()
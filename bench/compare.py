@@ -0,0 +1,32 @@
+import json
+import sys
+
+# Compares two result files written by bench/run.py stage by stage.
+#
+#   python3 bench/compare.py BASELINE.json CANDIDATE.json
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+def main():
+    if len(sys.argv) != 3:
+        print("usage: compare.py BASELINE.json CANDIDATE.json")
+        sys.exit(2)
+    baseline = load(sys.argv[1])
+    candidate = load(sys.argv[2])
+    if baseline.get("corpus") != candidate.get("corpus"):
+        print(f"warning: corpora differ, {baseline.get('corpus')} vs {candidate.get('corpus')}")
+
+    print(f"{'stage':<22}{baseline.get('commit') or 'baseline':>12}{candidate.get('commit') or 'candidate':>12}{'change':>10}")
+    rows = list(baseline["stages"].items()) + [("total", baseline["total_seconds"])]
+    candidate_stages = dict(candidate["stages"], total=candidate["total_seconds"])
+    for name, before in rows:
+        after = candidate_stages.get(name)
+        if after is None:
+            continue
+        change = f"{(after - before) / before * 100:+.1f}%" if before else "n/a"
+        print(f"{name:<22}{before * 1000:10.1f}ms{after * 1000:10.1f}ms{change:>10}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import argparse
+import json
+import os
+import random
+
+# Generates a synthetic content tree for benchmarking, laid out like
+# ./content: one index.md per directory under blog/.
+#
+#   python3 bench/corpus.py DEST --pages 1000 --size small --mix inline
+
+SIZES = {
+    # Approximate number of blocks per page.
+    "small": 12,
+    "huge": 4000,
+}
+MIXES = {
+    # Relative weight of each block kind.
+    "inline": {"paragraph": 8, "heading": 1, "list": 1, "quote": 1, "code": 1},
+    "list": {"paragraph": 1, "heading": 1, "list": 8, "quote": 1, "code": 1},
+    "mixed": {"paragraph": 4, "heading": 1, "list": 3, "quote": 1, "code": 1},
+}
+WORDS = (
+    "the of and to in hobbit ring shire elf dwarf wizard mountain river forest "
+    "journey song tale road king dragon shadow light council gate tower sword"
+).split()
+
+def sentence(rng, inline_heavy):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(6, 14))]
+    if inline_heavy:
+        words[1] = f"**{words[1]}**"
+        words[3] = f"_{words[3]}_"
+        words[5] = f"`{words[5]}`"
+        if rng.random() < 0.5:
+            words.append(f"[{rng.choice(WORDS)}](/blog/post{rng.randint(0, 99)})")
+        if rng.random() < 0.2:
+            words.append(f"![{rng.choice(WORDS)}](/images/tolkien.png)")
+    return " ".join(words).capitalize() + "."
+
+def block(rng, kind, inline_heavy):
+    match kind:
+        case "paragraph":
+            return "\n".join(sentence(rng, inline_heavy) for _ in range(rng.randint(2, 5)))
+        case "heading":
+            return f"{'#' * rng.randint(2, 4)} {sentence(rng, False)}"
+        case "list":
+            if rng.random() < 0.5:
+                return "\n".join(f"- {sentence(rng, inline_heavy)}" for _ in range(rng.randint(3, 8)))
+            return "\n".join(f"{i}. {sentence(rng, inline_heavy)}" for i in range(1, rng.randint(4, 9)))
+        case "quote":
+            return "\n".join(f"> {sentence(rng, inline_heavy)}" for _ in range(rng.randint(1, 4)))
+        case "code":
+            return "```\n" + "\n".join(f"print({rng.choice(WORDS)!r})" for _ in range(rng.randint(2, 6))) + "\n```"
+
+def page(rng, index, size, mix):
+    kinds = list(MIXES[mix])
+    weights = list(MIXES[mix].values())
+    blocks = [f"# Page {index}"]
+    for kind in rng.choices(kinds, weights, k=SIZES[size]):
+        blocks.append(block(rng, kind, mix != "list"))
+    return "\n\n".join(blocks) + "\n"
+
+def generate_corpus(dest, pages, size = "small", mix = "mixed", seed = 0):
+    # Reuses an existing corpus when it was generated with the same
+    # parameters, the huge variants take a while to write.
+    params = {"pages": pages, "size": size, "mix": mix, "seed": seed}
+    params_path = os.path.join(dest, "corpus.json")
+    if os.path.exists(params_path):
+        with open(params_path) as f:
+            if json.load(f) == params:
+                return params
+    rng = random.Random(seed)
+    for index in range(pages):
+        page_dir = dest if index == 0 else os.path.join(dest, "blog", f"post{index}")
+        os.makedirs(page_dir, exist_ok=True)
+        with open(os.path.join(page_dir, "index.md"), 'w') as f:
+            f.write(page(rng, index, size, mix))
+    with open(params_path, 'w') as f:
+        json.dump(params, f)
+    return params
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic content tree")
+    parser.add_argument("dest")
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--size", choices=SIZES, default="small")
+    parser.add_argument("--mix", choices=MIXES, default="mixed")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    generate_corpus(args.dest, args.pages, args.size, args.mix, args.seed)
+
+if __name__ == "__main__":
+    main()
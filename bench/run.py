@@ -0,0 +1,164 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, os.path.join(REPO_DIR, "src"))
+
+import convertnode
+from convertnode import block_lines_to_html_node
+from htmlnode import ParentNode
+from main import find_pages
+from markdownnode import block_to_block_type, extract_title, markdown_to_blocks
+from template import load_template
+
+from corpus import MIXES, SIZES, generate_corpus
+
+# Builds a synthetic corpus and times every stage of page generation
+# separately, writing the totals as JSON so runs can be compared between
+# commits with bench/compare.py.
+#
+#   python3 bench/run.py --pages 1k --size small --mix inline
+
+STAGES = [
+    "read",
+    "markdown_to_blocks",
+    "block_to_block_type",
+    "text_to_text_nodes",
+    "block_to_html_nodes",
+    "to_html",
+    "template",
+    "write",
+]
+
+def parse_count(text):
+    multipliers = {"k": 1000, "m": 1000000}
+    suffix = text[-1].lower()
+    if suffix in multipliers:
+        return int(float(text[:-1]) * multipliers[suffix])
+    return int(text)
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+class StageTimer:
+    def __init__(self):
+        self.totals = dict.fromkeys(STAGES, 0.0)
+
+    def wrap(self, name, func):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.totals[name] += time.perf_counter() - start
+        return timed
+
+def time_pages(pages, template, timer):
+    clock = time.perf_counter
+    bytes_read = 0
+    bytes_written = 0
+    for source_path, dest_path in pages:
+        start = clock()
+        with open(source_path) as f:
+            content = f.read()
+        timer.totals["read"] += clock() - start
+        bytes_read += len(content)
+
+        start = clock()
+        blocks = markdown_to_blocks(content)
+        timer.totals["markdown_to_blocks"] += clock() - start
+
+        start = clock()
+        block_types = [block_to_block_type(block) for block in blocks]
+        timer.totals["block_to_block_type"] += clock() - start
+
+        # text_to_text_nodes is wrapped by the timer, so its share is taken
+        # out of the time spent building the nodes.
+        inline_before = timer.totals["text_to_text_nodes"]
+        start = clock()
+        children = [block_lines_to_html_node(block_type, block.split("\n")) for block, block_type in zip(blocks, block_types)]
+        node = ParentNode("div", children)
+        timer.totals["block_to_html_nodes"] += clock() - start - (timer.totals["text_to_text_nodes"] - inline_before)
+
+        start = clock()
+        html = node.to_html()
+        timer.totals["to_html"] += clock() - start
+
+        start = clock()
+        page = template.render({"Title": extract_title(content), "Content": html})
+        timer.totals["template"] += clock() - start
+
+        start = clock()
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        with open(dest_path, 'w') as f:
+            f.write(page)
+        timer.totals["write"] += clock() - start
+        bytes_written += len(page)
+    return bytes_read, bytes_written
+
+def run(content_dir, template_path, dest_dir):
+    pages = find_pages(content_dir, dest_dir)
+    template = load_template(template_path)
+    timer = StageTimer()
+    original = convertnode.text_to_text_nodes
+    convertnode.text_to_text_nodes = timer.wrap("text_to_text_nodes", original)
+    start = time.perf_counter()
+    try:
+        bytes_read, bytes_written = time_pages(pages, template, timer)
+    finally:
+        convertnode.text_to_text_nodes = original
+    total = time.perf_counter() - start
+    return {
+        "pages": len(pages),
+        "bytes_read": bytes_read,
+        "bytes_written": bytes_written,
+        "total_seconds": total,
+        "pages_per_second": len(pages) / total if total else None,
+        "stages": timer.totals,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Time each stage of page generation on a synthetic corpus")
+    parser.add_argument("--pages", default="1k", help="number of pages, e.g. 10, 1k, 100k")
+    parser.add_argument("--size", choices=SIZES, default="small")
+    parser.add_argument("--mix", choices=MIXES, default="mixed")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--corpus-dir", help="where to generate the corpus, reused between runs")
+    parser.add_argument("--output", help="JSON results path, defaults to .build/bench/<commit>-<corpus>.json")
+    args = parser.parse_args()
+
+    pages = parse_count(args.pages)
+    corpus_name = f"{pages}-{args.size}-{args.mix}-{args.seed}"
+    corpus_dir = args.corpus_dir or os.path.join(REPO_DIR, ".build", "bench", f"corpus-{corpus_name}")
+    corpus = generate_corpus(corpus_dir, pages, args.size, args.mix, args.seed)
+
+    with tempfile.TemporaryDirectory() as dest_dir:
+        results = run(corpus_dir, os.path.join(REPO_DIR, "template.html"), dest_dir)
+    results["corpus"] = corpus
+    results["commit"] = git_commit()
+    results["python"] = platform.python_version()
+
+    for name, seconds in results["stages"].items():
+        print(f"{name:<22}{seconds * 1000:12.1f} ms")
+    print(f"{'total':<22}{results['total_seconds'] * 1000:12.1f} ms  ({results['pages_per_second']:.1f} pages/s)")
+
+    output = args.output or os.path.join(REPO_DIR, ".build", "bench", f"{results['commit'] or 'unknown'}-{corpus_name}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {output}")
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1 @@
-python3 src/main.py
-if [[ "$?" -eq 0 ]]; then
-    cd public && python3 -m http.server 8888
-    cd -
-fi
\ No newline at end of file
+python3 src/main.py serve --watch "$@"
@@ -0,0 +1,222 @@
+import concurrent.futures
+import hashlib
+import os
+import shutil
+
+from manifest import hash_file
+
+# Number of hex digits of the content hash put in fingerprinted file names.
+FINGERPRINT_LENGTH = 8
+
+# ioctl request number for FICLONE on Linux, used to reflink files on
+# filesystems that support it (btrfs, xfs, ...).
+FICLONE = 0x40049409
+
+class SyncResult:
+    def __init__(self):
+        # Maps every source file (relative to the source dir) to the path it
+        # was synced to (relative to the dest dir).
+        self.assets = {}
+        self.copied = []
+        # The subset of copied files that did not exist in dest before.
+        self.added = []
+        self.removed = []
+
+def _reflink(fsrc, fdst):
+    try:
+        import fcntl
+        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+    except (ImportError, OSError):
+        return False
+    return True
+
+def _copy_range(fsrc, fdst, size):
+    # Prefer copy_file_range, then sendfile, so the data never has to pass
+    # through userspace. Both can be refused depending on the kernel and
+    # filesystems involved, in which case we fall back to a buffered copy.
+    for copy_func in (getattr(os, "copy_file_range", None), getattr(os, "sendfile", None)):
+        if copy_func is None:
+            continue
+        offset = 0
+        try:
+            while offset < size:
+                if copy_func is os.sendfile:
+                    sent = os.sendfile(fdst.fileno(), fsrc.fileno(), offset, size - offset)
+                else:
+                    sent = os.copy_file_range(fsrc.fileno(), fdst.fileno(), size - offset, offset, offset)
+                if sent == 0:
+                    break
+                offset += sent
+        except OSError:
+            if offset == 0:
+                continue
+            raise
+        if offset == size:
+            return
+        fsrc.seek(offset)
+        fdst.seek(offset)
+        shutil.copyfileobj(fsrc, fdst)
+        return
+    shutil.copyfileobj(fsrc, fdst)
+
+def copy_file(source, dest):
+    stat = os.stat(source)
+    tmp_path = f"{dest}.sync-tmp"
+    with open(source, 'rb') as fsrc, open(tmp_path, 'wb') as fdst:
+        if not _reflink(fsrc, fdst):
+            _copy_range(fsrc, fdst, stat.st_size)
+    # Carry the source mtime over so the next sync can compare by stat alone.
+    os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    shutil.copymode(source, tmp_path)
+    os.replace(tmp_path, dest)
+
+def file_changed(source, dest, checksum = False):
+    try:
+        dest_stat = os.stat(dest)
+    except FileNotFoundError:
+        return True
+    source_stat = os.stat(source)
+    if source_stat.st_size != dest_stat.st_size:
+        return True
+    if checksum:
+        return hash_file(source) != hash_file(dest)
+    return source_stat.st_mtime_ns != dest_stat.st_mtime_ns
+
+def fingerprinted_path(relative_path, digest):
+    # images/tom.png -> images/tom.3f9a1c2b.png
+    root, ext = os.path.splitext(relative_path)
+    return f"{root}.{digest[:FINGERPRINT_LENGTH]}{ext}"
+
+def asset_dest_path(source_path, dest, relative_path, previous_dest_path = None, checksum = False):
+    # A copy keeps the source mtime, so when the file synced last time still
+    # matches by size and mtime its fingerprint is reused instead of hashing
+    # the source again.
+    if previous_dest_path is not None and not file_changed(source_path, os.path.join(dest, previous_dest_path), checksum):
+        return previous_dest_path
+    return fingerprinted_path(relative_path, hash_file(source_path))
+
+class AssetUrls:
+    # What pages need to know about static files, by root relative URL: the
+    # fingerprinted URL of every fingerprinted file and the (width, height)
+    # of every image, sizes being None when images are not measured at all.
+    # Two instances compare and hash equal when their content does, so they
+    # can be part of the template and block cache keys.
+    def __init__(self, urls, sizes = None):
+        self.urls = urls
+        self.sizes = sizes
+        digest = hashlib.blake2b(digest_size=16)
+        for url, fingerprinted_url in sorted(urls.items()):
+            digest.update(f"{url}\0{fingerprinted_url}\0".encode())
+        digest.update(b"\0")
+        for url, (width, height) in sorted((sizes or {}).items()):
+            digest.update(f"{url}\0{width}x{height}\0".encode())
+        self.version = digest.hexdigest()
+
+    @classmethod
+    def from_assets(cls, assets, sizes = None, aliases = None):
+        # aliases maps files that were not synced themselves, such as
+        # stylesheets merged into a bundle, to the synced file replacing them.
+        urls = {
+            "/" + relative_path.replace(os.sep, "/"): "/" + dest_relative_path.replace(os.sep, "/")
+            for relative_path, dest_relative_path in assets.items()
+            if relative_path != dest_relative_path
+        }
+        for relative_path, target_path in (aliases or {}).items():
+            urls["/" + relative_path.replace(os.sep, "/")] = "/" + assets[target_path].replace(os.sep, "/")
+        return cls(urls, sizes)
+
+    def get(self, url, default = None):
+        return self.urls.get(url, default)
+
+    def image_size(self, url):
+        return self.sizes.get(url) if self.sizes is not None else None
+
+    def __eq__(self, other):
+        return isinstance(other, AssetUrls) and self.version == other.version
+
+    def __hash__(self):
+        return hash(self.version)
+
+    def __repr__(self):
+        return f"AssetUrls({self.urls}, {self.sizes})"
+
+def remove_empty_dirs(dir_path, root):
+    # Walk back up from dir_path removing directories that are now empty,
+    # stopping at root which is never removed.
+    while os.path.abspath(dir_path) != os.path.abspath(root) and os.path.isdir(dir_path) and not os.listdir(dir_path):
+        os.rmdir(dir_path)
+        dir_path = os.path.dirname(dir_path)
+
+def list_files(source):
+    files = []
+    for dir_path, _, file_names in os.walk(source):
+        for file_name in file_names:
+            files.append(os.path.relpath(os.path.join(dir_path, file_name), source))
+    return sorted(files)
+
+def sync_dir(source, dest, previous_assets = None, checksum = False, threads = None, fingerprint = False, prepared = None, rewrite_css = None):
+    # Copies new or changed files from source into dest and removes files a
+    # previous sync put in dest that are no longer wanted, because their
+    # source was deleted or they were synced under another name. Files in
+    # dest that the sync never created (generated pages) are left alone.
+    # With fingerprint every file is copied under a name containing a hash
+    # of its content, so it can be cached forever. prepared maps relative
+    # paths to a file a build stage generated to copy instead of the one in
+    # source, or to None to leave the file out. Stylesheets refer to other
+    # files by URL, so when fingerprinting they are synced after every other
+    # file and rewrite_css(relative_path, source_path, urls) returns the
+    # file to copy with its references pointed at the fingerprinted URLs.
+    previous_assets = previous_assets or {}
+    prepared = prepared or {}
+    result = SyncResult()
+    to_copy = []
+    relative_paths = sorted(set(list_files(source)) | set(prepared))
+    if fingerprint and rewrite_css is not None:
+        relative_paths.sort(key=lambda relative_path: relative_path.endswith(".css"))
+    for relative_path in relative_paths:
+        source_path = prepared.get(relative_path, os.path.join(source, relative_path))
+        if source_path is None:
+            continue
+        if fingerprint and rewrite_css is not None and relative_path.endswith(".css"):
+            urls = {
+                "/" + synced_path.replace(os.sep, "/"): "/" + dest_relative_path.replace(os.sep, "/")
+                for synced_path, dest_relative_path in result.assets.items()
+            }
+            source_path = rewrite_css(relative_path, source_path, urls)
+        if fingerprint:
+            previous_dest_path = previous_assets.get(relative_path)
+            if previous_dest_path == relative_path:
+                previous_dest_path = None
+            dest_relative_path = asset_dest_path(source_path, dest, relative_path, previous_dest_path, checksum)
+        else:
+            dest_relative_path = relative_path
+        result.assets[relative_path] = dest_relative_path
+        dest_path = os.path.join(dest, dest_relative_path)
+        if file_changed(source_path, dest_path, checksum):
+            if not os.path.exists(dest_path):
+                result.added.append(relative_path)
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            to_copy.append((source_path, dest_path))
+            result.copied.append(relative_path)
+
+    if len(to_copy) > 1:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
+            futures = [executor.submit(copy_file, source_path, dest_path) for source_path, dest_path in to_copy]
+            for (source_path, dest_path), future in zip(to_copy, futures):
+                future.result()
+                print(f"Copying {source_path} to {dest_path}")
+    else:
+        for source_path, dest_path in to_copy:
+            copy_file(source_path, dest_path)
+            print(f"Copying {source_path} to {dest_path}")
+
+    for relative_path, dest_relative_path in previous_assets.items():
+        if result.assets.get(relative_path) == dest_relative_path:
+            continue
+        dest_path = os.path.join(dest, dest_relative_path)
+        if os.path.exists(dest_path):
+            print(f"Removing stale asset {dest_path}")
+            os.remove(dest_path)
+            remove_empty_dirs(os.path.dirname(dest_path), dest)
+        result.removed.append(dest_relative_path)
+    return result
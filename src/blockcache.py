@@ -0,0 +1,90 @@
+import collections
+import hashlib
+
+from manifest import load_json, save_json
+
+BLOCK_CACHE_VERSION = 5
+
+class BlockCache:
+    # Maps a hash of a markdown block to its rendered HTML fragment, the URLs
+    # it links to and its searchable text, keeping at most maxsize entries
+    # and evicting the least recently used first. Only with track_new set, as
+    # in worker processes, are added entries also kept until taken.
+    def __init__(self, maxsize = 4096, path = None, track_new = False):
+        self.maxsize = maxsize
+        self.path = path
+        self.track_new = track_new
+        self.entries = collections.OrderedDict()
+        self.new_entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, maxsize = 4096, path = None, track_new = False):
+        cache = cls(maxsize, path, track_new)
+        data = load_json(path, "Block cache", "starting with an empty cache", BLOCK_CACHE_VERSION)
+        if data is None:
+            return cache
+        # Entries are stored least recently used first, so loading them in
+        # order restores the LRU order and keeps the newest when trimming.
+        for key, (html, links, text) in data.get("entries", [])[-maxsize:]:
+            cache.entries[key] = (html, tuple(links), text)
+        return cache
+
+    def save(self):
+        if self.path is None:
+            return
+        save_json(self.path, {"version": BLOCK_CACHE_VERSION, "entries": list(self.entries.items())})
+
+    @staticmethod
+    def key(block_type, lines, basepath = '/', assets = None, minify = False, anchor = None):
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(block_type.value.encode())
+        digest.update(b"\0")
+        digest.update(basepath.encode())
+        digest.update(b"\0")
+        if assets is not None:
+            digest.update(assets.version.encode())
+        digest.update(b"\0")
+        if minify:
+            digest.update(b"minify\0")
+        if anchor is not None:
+            digest.update(f"#{anchor}\0".encode())
+        digest.update("\n".join(lines).encode())
+        return digest.hexdigest()
+
+    def get(self, key):
+        # Returns (html, links, text) or None.
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key, html, links = (), text = ""):
+        entry = (html, tuple(links), text)
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        if self.track_new:
+            self.new_entries[key] = entry
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def take_new_entries(self):
+        # Entries added since the last call. Worker processes hand these back
+        # so the parent's cache can be persisted with them.
+        new_entries = self.new_entries
+        self.new_entries = {}
+        return new_entries
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self.entries),
+            "maxsize": self.maxsize,
+        }
@@ -1,8 +1,8 @@
 import re
 
-from htmlnode import LeafNode, ParentNode
-from markdownnode import markdown_to_blocks, block_to_block_type, BlockType
-from nodesplitter import split_nodes_delimiter, split_nodes_image, split_nodes_link
+from htmlnode import LeafNode, ParentNode, RawNode
+from markdownnode import iter_blocks, lines_to_block_type, BlockType
+from nodesplitter import split_text_inline
 from textnode import TextNode, TextType
 
 def text_node_to_html_node(text_node):
@@ -27,21 +27,7 @@ def text_node_to_html_node(text_node):
             raise ValueError(f"{text_node.text_type} not a handled type.")
 
 def text_to_text_nodes(text):
-    simple_delimeters = [
-        ("**", TextType.BOLD),
-        ("_", TextType.ITALIC),
-        ("`", TextType.CODE),
-    ]
-    nodes = [
-        TextNode(text, TextType.TEXT)
-    ]
-
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
-    for delimeter, text_type in simple_delimeters:
-        nodes = split_nodes_delimiter(nodes, delimeter, text_type)
-    
-    return nodes
+    return split_text_inline(text)
 
 def text_to_children(block):
     text_nodes = text_to_text_nodes(block)
@@ -53,69 +39,141 @@ def text_to_children(block):
 
     return html_nodes
 
-def code_block_to_html_node(block):
+def code_block_to_html_node(lines):
+    block = "\n".join(lines)
     content = re.sub(r"^```(\n)?", "", block) # Remove code markdown and first newline if it exists
     content = content.removesuffix("```") # Remove the trailing code markdown
     return ParentNode("pre", [text_node_to_html_node(TextNode(content, TextType.CODE))])
 
-def paragraph_block_to_html_node(block):
-    content = block.strip() # Remove leading and trailing whitespace
-    content = content.replace("\n", " ") # All new lines should be spaces. HTML renderer should handle where new lines go.
+def paragraph_block_to_html_node(lines):
+    content = " ".join(lines) # All new lines should be spaces. HTML renderer should handle where new lines go.
     return ParentNode("p", text_to_children(content))
 
-def heading_block_to_html_node(block):
-    heading = re.match(r"(#+ )(.*)", block)
+def heading_block_to_html_node(lines, anchor = None):
+    heading = re.match(r"(#+ )(.*)", lines[0])
     markdown_count = heading.group(1).count("#")
     content = heading.group(2)
     heading_level = markdown_count if markdown_count <= 6 else 6
-    return ParentNode(f"h{heading_level}", text_to_children(content))
+    return ParentNode(f"h{heading_level}", text_to_children(content), {"id": anchor} if anchor else None)
 
-def quote_block_to_html_node(block):
-    lines = block.split("\n")
-    for i in range(0, len(lines)):
-        lines[i] = re.sub(r"^> ?", "", lines[i])
-    content = "\n".join(lines)
+def quote_block_to_html_node(lines):
+    content = "\n".join(re.sub(r"^> ?", "", line) for line in lines)
     return ParentNode("blockquote", text_to_children(content))
 
-def ordered_list_block_to_html_node(block):
-    lines = block.split("\n")
+def ordered_list_block_to_html_node(lines):
     list_items = []
     for line in lines:
         content = re.sub(r"^[\d]\. ", "", line)
         list_items.append(ParentNode("li", text_to_children(content)))
     return ParentNode("ol", list_items)
 
-def unordered_list_block_to_html_node(block):
-    lines = block.split("\n")
+def unordered_list_block_to_html_node(lines):
     list_items = []
     for line in lines:
         content = re.sub(r"^- ", "", line)
         list_items.append(ParentNode("li", text_to_children(content)))
     return ParentNode("ul", list_items)
 
-def block_to_html_nodes(block):
-    block_type = block_to_block_type(block)
-        
+def block_lines_to_html_node(block_type, lines, anchor = None):
     match block_type:
         case BlockType.CODE:
-            return code_block_to_html_node(block)
+            return code_block_to_html_node(lines)
         case BlockType.PARAGRAPH:
-            return paragraph_block_to_html_node(block)
+            return paragraph_block_to_html_node(lines)
         case BlockType.HEADING:
-            return heading_block_to_html_node(block)
+            return heading_block_to_html_node(lines, anchor)
         case BlockType.QUOTE:
-            return quote_block_to_html_node(block)
+            return quote_block_to_html_node(lines)
         case BlockType.ORDERED_LIST:
-            return ordered_list_block_to_html_node(block)
+            return ordered_list_block_to_html_node(lines)
         case BlockType.UNORDERED_LIST:
-            return unordered_list_block_to_html_node(block)
+            return unordered_list_block_to_html_node(lines)
         case _:
             raise ValueError("No matching block type.")
 
-def markdown_to_html_node(markdown):
-    blocks = markdown_to_blocks(markdown)
-    children = []
-    for block in blocks:
-        children.append(block_to_html_nodes(block))
+def block_to_html_nodes(block):
+    lines = block.split("\n")
+    return block_lines_to_html_node(lines_to_block_type(lines), lines)
+
+def html_node_links(node):
+    # URLs of the links and images of a parsed block, in document order.
+    # Only the <a> and <img> leaves made from LINK and IMAGE text nodes have
+    # props, so no HTML needs to be read back.
+    links = []
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node.children:
+            stack.extend(reversed(node.children))
+        elif node.props:
+            url = node.props.get("href", node.props.get("src"))
+            if url is not None:
+                links.append(url)
+    return links
+
+def html_node_text(node):
+    # The readable text of a parsed block: the plain, bold, italic and link
+    # text nodes, leaving out code and image alt text. List items are
+    # separated by a space, inline nodes already carry their own.
+    texts = []
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, str):
+            texts.append(node)
+        elif node.children:
+            if node.tag == "li":
+                stack.append(" ")
+            stack.extend(reversed(node.children))
+        elif node.tag in (None, "b", "i", "a") and node.value:
+            texts.append(node.value)
+    return " ".join("".join(texts).split())
+
+def block_anchor(block_type, lines, page_info):
+    if page_info is None or block_type != BlockType.HEADING:
+        return None
+    return page_info.heading_anchor(lines)
+
+def cached_block_lines_to_html_node(block_type, lines, block_cache, basepath = '/', assets = None, minify = False, page_info = None):
+    # Identical blocks render to identical HTML, so a cache hit skips both
+    # parsing and serializing the block. The fragment is wrapped in a
+    # RawNode, which serializes it as is, so the serialization options and
+    # heading id are part of the key. The block's links and text are cached
+    # alongside, so page_info still gets them without parsing it.
+    anchor = block_anchor(block_type, lines, page_info)
+    key = block_cache.key(block_type, lines, basepath, assets, minify, anchor)
+    entry = block_cache.get(key)
+    if entry is None:
+        node = block_lines_to_html_node(block_type, lines, anchor)
+        entry = (node.to_html(basepath, assets, minify), html_node_links(node), html_node_text(node))
+        block_cache.put(key, *entry)
+    if page_info is not None:
+        page_info.add_block(block_type, anchor, entry[1], entry[2])
+    return RawNode(entry[0])
+
+def iter_markdown_html_nodes(lines, block_cache = None, basepath = '/', assets = None, minify = False, page_info = None):
+    # page_info, when given, collects the links and text of every block.
+    for block_type, block_lines in iter_blocks(lines):
+        if block_cache is None:
+            anchor = block_anchor(block_type, block_lines, page_info)
+            node = block_lines_to_html_node(block_type, block_lines, anchor)
+            if page_info is not None:
+                page_info.add_block(block_type, anchor, html_node_links(node), html_node_text(node))
+            yield node
+        else:
+            yield cached_block_lines_to_html_node(block_type, block_lines, block_cache, basepath, assets, minify, page_info)
+
+def iter_markdown_html(lines, block_cache = None, basepath = '/', assets = None, minify = False, page_info = None):
+    # Streaming counterpart of markdown_to_html_node(...).to_html(): each
+    # block is parsed, serialized and dropped before the next one is read.
+    yield "<div>"
+    for node in iter_markdown_html_nodes(lines, block_cache, basepath, assets, minify, page_info):
+        yield from node.iter_html(basepath, assets, minify)
+    yield "</div>"
+
+def markdown_to_html_node(markdown, block_cache = None, basepath = '/', assets = None, minify = False):
+    # The serialization options only matter for cached blocks, which are
+    # stored serialized. Pass the same ones to to_html().
+    children = list(iter_markdown_html_nodes(markdown.split("\n"), block_cache, basepath, assets, minify))
     html = ParentNode("div", children)
-    return html
\ No newline at end of file
+    return html
@@ -0,0 +1,243 @@
+import argparse
+import functools
+import http.server
+import os
+import threading
+import time
+
+from assetsync import copy_file, list_files, remove_empty_dirs
+from main import (
+    CONTENT_PATH, LAYOUTS_PATH, MANIFEST_PATH, METADATA_INDEX_PATH, PARTIALS_PATH, PUBLIC_PATH, STATIC_CONTENT_PATH, TEMPLATE_PATH,
+    build, generate_page, generate_pages_incremental, load_assets, load_metadata_index, page_dest_path, parse_args, render_settings, remove_output,
+    update_listings, update_search_index,
+)
+from manifest import BuildManifest, DependencyState, hash_file
+
+RELOAD_PATH = "/__livereload"
+RELOAD_SCRIPT = (
+    f"<script>new EventSource(\"{RELOAD_PATH}\").onmessage = function () {{ location.reload(); }};</script>"
+).encode()
+POLL_INTERVAL = 0.05
+
+def snapshot(paths):
+    # Maps every file under paths to (mtime, size). Comparing two snapshots
+    # tells which files were added, changed or removed in between.
+    files = {}
+    for path in paths:
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            files[path] = (stat.st_mtime_ns, stat.st_size)
+            continue
+        for dir_path, _, file_names in os.walk(path):
+            for file_name in file_names:
+                file_path = os.path.join(dir_path, file_name)
+                try:
+                    stat = os.stat(file_path)
+                except FileNotFoundError:
+                    continue
+                files[file_path] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+def diff_snapshots(old, new):
+    changed = {path for path, stat in new.items() if old.get(path) != stat}
+    removed = set(old) - set(new)
+    return changed, removed
+
+class ReloadBroker:
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.version = 0
+
+    def notify(self):
+        with self.condition:
+            self.version += 1
+            self.condition.notify_all()
+
+    def wait(self, version, timeout):
+        with self.condition:
+            self.condition.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+class LiveReloadHandler(http.server.SimpleHTTPRequestHandler):
+    broker = None
+
+    def do_GET(self):
+        if self.path == RELOAD_PATH:
+            self.send_events()
+            return
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            path = os.path.join(path, "index.html")
+        if path.endswith(".html") and os.path.isfile(path) and self.path.endswith(("/", ".html")):
+            self.send_html(path)
+            return
+        super().do_GET()
+
+    def send_html(self, path):
+        with open(path, 'rb') as f:
+            body = f.read()
+        # Inject the reload script into the served copy only, the files in
+        # the output directory are left exactly as the build wrote them.
+        index = body.rfind(b"</body>")
+        if index == -1:
+            body += RELOAD_SCRIPT
+        else:
+            body = body[:index] + RELOAD_SCRIPT + body[index:]
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_events(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        version = self.broker.version
+        try:
+            while True:
+                new_version = self.broker.wait(version, 15)
+                if new_version == version:
+                    # Comment line to keep idle connections open.
+                    self.wfile.write(b": ping\n\n")
+                else:
+                    self.wfile.write(b"data: reload\n\n")
+                    version = new_version
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            return
+
+class SiteWatcher:
+    def __init__(self, args):
+        self.args = args
+        self.manifest = BuildManifest.load(MANIFEST_PATH)
+        self.assets = None if self.builds_assets(args) else load_assets(args, self.manifest.assets)
+        self.paths = [CONTENT_PATH, STATIC_CONTENT_PATH, TEMPLATE_PATH, LAYOUTS_PATH, PARTIALS_PATH]
+        self.files = snapshot(self.paths)
+
+    @staticmethod
+    def builds_assets(args):
+        # Fingerprinted, minified or bundled static files are produced by
+        # build stages rather than copied as is.
+        return args.fingerprint or args.minify_css or args.bundle_css
+
+    def poll(self):
+        files = snapshot(self.paths)
+        changed, removed = diff_snapshots(self.files, files)
+        self.files = files
+        if not changed and not removed:
+            return False
+        self.rebuild(changed, removed)
+        return True
+
+    @staticmethod
+    def is_template_file(path):
+        return path == TEMPLATE_PATH or any(path.startswith(dir_path + os.sep) for dir_path in (LAYOUTS_PATH, PARTIALS_PATH))
+
+    def rebuild(self, changed, removed):
+        # Only the pages and assets behind the changed files are rebuilt. A
+        # template, layout or partial change, or a change to the image sizes,
+        # can affect any page so that falls back to the incremental build,
+        # which only rebuilds the pages depending on what changed.
+        start = time.perf_counter()
+        if self.builds_assets(self.args):
+            # Fingerprinted and bundled URLs appear in every page, so the
+            # incremental build works out what the change affects.
+            self.manifest.save()
+            build(self.args)
+            self.manifest = BuildManifest.load(MANIFEST_PATH)
+            print(f"Rebuilt in {(time.perf_counter() - start) * 1000:.1f} ms")
+            return
+        assets_changed = False
+        if any(path.startswith(STATIC_CONTENT_PATH + os.sep) for path in changed | removed):
+            assets = load_assets(self.args, {path: path for path in list_files(STATIC_CONTENT_PATH)})
+            assets_changed = assets != self.assets
+            self.assets = assets
+        rebuild_all = any(self.is_template_file(path) for path in changed | removed) or assets_changed
+        if rebuild_all:
+            generate_pages_incremental(CONTENT_PATH, PUBLIC_PATH, self.manifest, render_settings(self.args, self.assets))
+        for path in sorted(changed | removed):
+            if self.is_template_file(path):
+                continue
+            if path.startswith(CONTENT_PATH + os.sep):
+                # After a template or image size change every page affected
+                # was already rebuilt above.
+                if rebuild_all or not path.endswith(".md"):
+                    continue
+                if path in removed:
+                    dest_path = self.manifest.remove_page(path)
+                    if dest_path is not None:
+                        remove_output(dest_path, PUBLIC_PATH)
+                    continue
+                dest_path = page_dest_path(path, CONTENT_PATH, PUBLIC_PATH)
+                settings = render_settings(self.args, self.assets)
+                page_info = settings.fresh_page_info()
+                try:
+                    generate_page(path, dest_path, settings, None, page_info)
+                except Exception as e:
+                    print(f"Failed to generate page from {path}: {e}")
+                    continue
+                info = page_info.to_dict()
+                info["dependencies"] = DependencyState(self.assets).record(page_info.dependencies, page_info.urls)
+                self.manifest.record_page(path, dest_path, hash_file(path), info)
+            else:
+                relative_path = os.path.relpath(path, STATIC_CONTENT_PATH)
+                dest_path = os.path.join(PUBLIC_PATH, relative_path)
+                if path in removed:
+                    if os.path.exists(dest_path):
+                        print(f"Removing stale asset {dest_path}")
+                        os.remove(dest_path)
+                        remove_empty_dirs(os.path.dirname(dest_path), PUBLIC_PATH)
+                    self.manifest.assets.pop(relative_path, None)
+                    continue
+                os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+                print(f"Copying {path} to {dest_path}")
+                copy_file(path, dest_path)
+                self.manifest.assets[relative_path] = relative_path
+        metadata_index = load_metadata_index(self.manifest)
+        metadata_index.save(METADATA_INDEX_PATH)
+        update_listings(self.args, self.manifest, metadata_index, self.assets)
+        update_search_index(self.args, self.manifest)
+        self.manifest.save()
+        print(f"Rebuilt in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+def parse_serve_args(argv):
+    parser = argparse.ArgumentParser(prog="main.py serve", description="Build the site and serve ./docs")
+    parser.add_argument("--watch", action="store_true", help="rebuild on changes and reload open browsers")
+    parser.add_argument("--port", type=int, default=8888)
+    parser.add_argument("--bind", default="127.0.0.1")
+    serve_args, build_argv = parser.parse_known_args(argv)
+    return serve_args, parse_args(build_argv)
+
+def serve_main(argv):
+    serve_args, args = parse_serve_args(argv)
+    failures = build(args)
+    for source_path, error in failures:
+        print(f"Failed to generate page from {source_path}: {error}")
+
+    broker = ReloadBroker()
+    handler = functools.partial(type("Handler", (LiveReloadHandler,), {"broker": broker}), directory=PUBLIC_PATH)
+    server = http.server.ThreadingHTTPServer((serve_args.bind, serve_args.port), handler)
+    server.daemon_threads = True
+    print(f"Serving {PUBLIC_PATH} on http://{serve_args.bind}:{serve_args.port}/")
+    if not serve_args.watch:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        server.server_close()
+        return
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    watcher = SiteWatcher(args)
+    try:
+        while True:
+            if watcher.poll():
+                broker.notify()
+            time.sleep(POLL_INTERVAL)
+    except KeyboardInterrupt:
+        pass
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,28 @@
+import os
+import tempfile
+import unittest
+
+def write_file(path, content):
+    # Writes text, or bytes, to path, creating its directories first.
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb' if isinstance(content, bytes) else 'w') as f:
+        f.write(content)
+    return path
+
+def read_file(path):
+    with open(path) as f:
+        return f.read()
+
+class TempDirTestCase(unittest.TestCase):
+    # Every test gets a new temporary directory, self.tmp, removed after it.
+    # write and read take paths relative to root, the temporary directory
+    # unless given, and return or read absolute paths as they are.
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write(self, relative_path, content, root = None):
+        return write_file(os.path.join(root or self.tmp.name, relative_path), content)
+
+    def read(self, relative_path, root = None):
+        return read_file(os.path.join(root or self.tmp.name, relative_path))
@@ -0,0 +1,102 @@
+import datetime
+import io
+import re
+
+from markdownnode import extract_title_from_lines
+
+FRONT_MATTER_FENCE = "---"
+FIELD_PATTERN = re.compile(r"^([\w-]+):\s*(.*)$")
+LIST_ITEM_PATTERN = re.compile(r"^\s+-\s+(.*)$")
+# Fields that always hold a list, also when written as "a, b".
+LIST_FIELDS = frozenset(("tags",))
+# Fields the layouts, listings and feed use, with the type they must have.
+SCALAR_FIELDS = {"title": str, "summary": str, "description": str, "layout": str, "draft": bool}
+TYPE_NAMES = {str: "a string", bool: "true or false"}
+# A full ISO date, optionally with a time, seconds and a UTC offset.
+DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}(?:T\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:\d{2})?)?$")
+
+def parse_value(value):
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    if value.startswith("[") and value.endswith("]"):
+        return [parse_value(item) for item in value[1:-1].split(",") if item.strip()]
+    if value in ("true", "false"):
+        return value == "true"
+    return value
+
+def parse_front_matter(lines):
+    # Parses the lines between the --- fences: "key: value" fields, where a
+    # value is a string, optionally quoted, true or false, or a [a, b] list.
+    # A field with no value takes the indented "- item" lines below it as a
+    # list. Blank lines and # comments are skipped.
+    fields = {}
+    list_key = None
+    for line in lines:
+        line = line.rstrip("\n")
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        item = LIST_ITEM_PATTERN.match(line)
+        if item is not None and list_key is not None:
+            fields[list_key].append(parse_value(item.group(1)))
+            continue
+        field = FIELD_PATTERN.match(line)
+        if field is None:
+            raise ValueError(f"Invalid front matter line: {line}")
+        key, value = field.group(1), field.group(2)
+        if value == "":
+            fields[key] = []
+            list_key = key
+            continue
+        list_key = None
+        fields[key] = parse_value(value)
+
+    for key in LIST_FIELDS:
+        if key not in fields:
+            continue
+        if isinstance(fields[key], str):
+            fields[key] = [item.strip() for item in fields[key].split(",") if item.strip()]
+        elif not isinstance(fields[key], list) or not all(isinstance(item, str) for item in fields[key]):
+            raise ValueError(f"Front matter {key} must be a list of strings: {fields[key]}")
+    for key, field_type in SCALAR_FIELDS.items():
+        if key in fields and not isinstance(fields[key], field_type):
+            raise ValueError(f"Front matter {key} must be {TYPE_NAMES[field_type]}: {fields[key]}")
+    if "date" in fields:
+        date = fields["date"]
+        try:
+            if not isinstance(date, str) or DATE_PATTERN.match(date) is None:
+                raise ValueError
+            # The pattern only checks the shape, this checks the values.
+            datetime.datetime.fromisoformat(date.replace("Z", "+00:00"))
+        except ValueError:
+            raise ValueError(f"Invalid front matter date: {date}") from None
+    return fields
+
+def read_front_matter(f):
+    # Reads the front matter at the start of a markdown file object and
+    # returns its fields, leaving f at the first line of the body. Without
+    # front matter f is left where it was and the fields are empty.
+    start = f.tell()
+    if f.readline().rstrip("\n") != FRONT_MATTER_FENCE:
+        f.seek(start)
+        return {}
+    lines = []
+    while True:
+        line = f.readline()
+        if not line:
+            raise ValueError("Front matter is missing its closing ---")
+        if line.rstrip("\n") == FRONT_MATTER_FENCE:
+            return parse_front_matter(lines)
+        lines.append(line)
+
+def split_front_matter(markdown):
+    f = io.StringIO(markdown)
+    fields = read_front_matter(f)
+    return fields, f.read()
+
+def page_title(front_matter, lines):
+    # A title in the front matter saves looking for the first h1.
+    title = front_matter.get("title")
+    if title:
+        return str(title)
+    return extract_title_from_lines(lines)
@@ -1,45 +1,143 @@
+import sys
+
+from minify import attribute_to_html, collapse_whitespace, PRESERVE_WHITESPACE_TAGS, VOID_TAGS
+
+# Attributes holding URLs. Root relative URLs in them are swapped for their
+# fingerprinted asset URL, if any, and prefixed with the basepath the site is
+# served from when the node is serialized.
+URL_ATTRIBUTES = frozenset(("href", "src"))
+
+def rebase_url(url, basepath, assets = None):
+    if not url.startswith("/"):
+        return url
+    if assets is not None:
+        url = assets.get(url, url)
+    if basepath == "/":
+        return url
+    return basepath + url[1:]
+
+def image_props_to_html(props, assets, minify = False):
+    # Extra attributes of an <img> when images are measured. Known dimensions
+    # let the browser reserve the space of the image before it loads, so the
+    # page does not shift, and images below the fold are fetched lazily.
+    extra = {}
+    size = assets.image_size(props.get("src", ""))
+    if size is not None:
+        extra["width"], extra["height"] = size
+    extra["loading"] = "lazy"
+    extra["decoding"] = "async"
+    return "".join(attribute_to_html(key, str(value), minify) for key, value in extra.items() if key not in props)
+
 class HTMLNode:
+    # Pages create a very large number of nodes, so they use slots instead of
+    # a per-instance __dict__. Tag names are interned so every node shares the
+    # same handful of strings, and empty props are stored as None rather than
+    # keeping an empty dict per node.
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag = None, value = None, children = None, props = None):
-        self.tag = tag
+        self.tag = sys.intern(tag) if tag else tag
         self.value = value
         self.children = children
-        self.props = props
+        self.props = props or None
 
-    def to_html(self):
+    def to_html(self, basepath = '/', assets = None, minify = False):
         raise NotImplementedError
-    
-    def props_to_html(self):
+
+    def iter_html(self, basepath = '/', assets = None, minify = False):
+        raise NotImplementedError
+
+    def write_to(self, fp, basepath = '/', assets = None, minify = False):
+        # Streams the serialized node into a file object chunk by chunk
+        # without ever building the whole document as one string.
+        fp.writelines(self.iter_html(basepath, assets, minify))
+
+    def props_to_html(self, basepath = '/', assets = None, minify = False):
         if not self.props:
             return ""
-        html_props = ""
-        for key, value in self.props.items():
-            html_props += f" {key}=\"{value}\""
-        return html_props
-    
+        if basepath == "/" and assets is None and not minify:
+            return "".join(f" {key}=\"{value}\"" for key, value in self.props.items())
+        html = "".join(
+            attribute_to_html(key, rebase_url(value, basepath, assets) if key in URL_ATTRIBUTES else value, minify)
+            for key, value in self.props.items()
+        )
+        if self.tag == "img" and assets is not None and assets.sizes is not None:
+            html += image_props_to_html(self.props, assets, minify)
+        return html
+
     def __repr__(self):
-        print(f"HTMLNode({self.tag}, {self.value}, {self.children}, {self.props})")
+        return f"HTMLNode({self.tag}, {self.value}, {self.children}, {self.props})"
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props = None):
         super().__init__(tag, value, None, props)
 
-    def to_html(self):
+    def to_html(self, basepath = '/', assets = None, minify = False):
         if self.value is None:
             raise ValueError("Missing \"value\" argument.")
+        # Whitespace runs in text render as a single space, except in
+        # elements such as <code> that keep it.
+        value = collapse_whitespace(self.value) if minify and self.tag not in PRESERVE_WHITESPACE_TAGS else self.value
         if self.tag is None:
-            return self.value
-        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
-        
+            return value
+        if minify and self.tag in VOID_TAGS and not value:
+            return f"<{self.tag}{self.props_to_html(basepath, assets, minify)}>"
+        return f"<{self.tag}{self.props_to_html(basepath, assets, minify)}>{value}</{self.tag}>"
+
+    def iter_html(self, basepath = '/', assets = None, minify = False):
+        yield self.to_html(basepath, assets, minify)
+
+class RawNode(LeafNode):
+    # Markup that is already serialized, such as a cached block, written out
+    # as is whatever the serialization options.
+    __slots__ = ()
+
+    def __init__(self, html):
+        super().__init__(None, html)
+
+    def to_html(self, basepath = '/', assets = None, minify = False):
+        return self.value
+
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props = None):
         super().__init__(tag, None, children, props)
-    
-    def to_html(self):
+
+    def validate(self):
         if not self.tag:
             raise ValueError("Missing \"tag\" argument.")
         if not self.children:
             raise ValueError("Missing \"children\" argument.")
-        html_string = ""
-        for child in self.children:
-            html_string += child.to_html()
-        return f"<{self.tag}{self.props_to_html()}>{html_string}</{self.tag}>"        
+
+    def to_html(self, basepath = '/', assets = None, minify = False):
+        return "".join(self.iter_html(basepath, assets, minify))
+
+    def iter_html(self, basepath = '/', assets = None, minify = False):
+        # Walk the tree with an explicit stack rather than nested generators,
+        # so the cost of yielding a chunk does not grow with the tree depth
+        # and deep documents cannot hit the recursion limit.
+        self.validate()
+        if self.tag in PRESERVE_WHITESPACE_TAGS:
+            minify = False
+        yield f"<{self.tag}{self.props_to_html(basepath, assets, minify)}>"
+        stack = [(self, iter(self.children))]
+        while stack:
+            node, children = stack[-1]
+            for child in children:
+                if isinstance(child, ParentNode):
+                    if minify and child.tag in PRESERVE_WHITESPACE_TAGS:
+                        # Everything inside <pre> and the like is written
+                        # exactly, so it is serialized without minifying.
+                        yield from child.iter_html(basepath, assets)
+                        continue
+                    child.validate()
+                    yield f"<{child.tag}{child.props_to_html(basepath, assets, minify)}>"
+                    stack.append((child, iter(child.children)))
+                    break
+                yield from child.iter_html(basepath, assets, minify)
+            else:
+                stack.pop()
+                yield f"</{node.tag}>"
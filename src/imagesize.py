@@ -0,0 +1,136 @@
+import os
+import struct
+
+from manifest import hash_file, load_json, save_json
+
+IMAGE_EXTENSIONS = frozenset((".png", ".jpg", ".jpeg", ".gif", ".webp"))
+IMAGE_SIZES_VERSION = 1
+
+# JPEG start of frame markers, the segments holding the image dimensions.
+# 0xC4, 0xC8 and 0xCC share the range but are other segment types.
+JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+def _png_size(f, header):
+    if header[12:16] != b"IHDR":
+        return None
+    return struct.unpack(">II", header[16:24])
+
+def _gif_size(f, header):
+    return struct.unpack("<HH", header[6:10])
+
+def _webp_size(f, header):
+    chunk = header[12:16]
+    if chunk == b"VP8 ":
+        width, height = struct.unpack("<HH", header[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L":
+        bits = int.from_bytes(header[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X":
+        return int.from_bytes(header[24:27], "little") + 1, int.from_bytes(header[27:30], "little") + 1
+    return None
+
+def _jpeg_size(f, header):
+    # Walks the segment headers up to the first start of frame, seeking over
+    # segment bodies so the compressed image data is never read.
+    f.seek(2)
+    while True:
+        byte = f.read(1)
+        while byte and byte != b"\xff":
+            byte = f.read(1)
+        while byte == b"\xff":
+            byte = f.read(1)
+        if not byte:
+            return None
+        marker = byte[0]
+        if marker == 0x01 or 0xD0 <= marker <= 0xD9:
+            # Markers without a length or body.
+            continue
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = struct.unpack(">H", length_bytes)[0]
+        if marker in JPEG_SOF_MARKERS:
+            frame = f.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack(">HH", frame[1:5])
+            return width, height
+        f.seek(length - 2, os.SEEK_CUR)
+
+def image_size(path):
+    # Returns (width, height) read from the file header of a PNG, GIF, JPEG
+    # or WebP image without decoding any pixels, or None for anything else.
+    with open(path, 'rb') as f:
+        header = f.read(30)
+        try:
+            if header.startswith(b"\x89PNG\r\n\x1a\n"):
+                size = _png_size(f, header)
+            elif header[:6] in (b"GIF87a", b"GIF89a"):
+                size = _gif_size(f, header)
+            elif header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+                size = _webp_size(f, header)
+            elif header[:2] == b"\xff\xd8":
+                size = _jpeg_size(f, header)
+            else:
+                size = None
+        except struct.error:
+            # Truncated header.
+            return None
+    return tuple(size) if size is not None else None
+
+class ImageSizeCache:
+    # Image dimensions by file content hash, persisted between builds. Each
+    # path also remembers the size, mtime and hash it had last time, so
+    # unmodified images are neither hashed nor read again.
+    def __init__(self, path = None, sizes = None, files = None):
+        self.path = path
+        self.sizes = sizes if sizes is not None else {}
+        self.files = files if files is not None else {}
+
+    @classmethod
+    def load(cls, path):
+        data = load_json(path, "Image size cache", "measuring every image again", IMAGE_SIZES_VERSION)
+        if data is None:
+            return cls(path)
+        return cls(path, data.get("sizes", {}), data.get("files", {}))
+
+    def save(self):
+        if self.path is None:
+            return
+        save_json(self.path, {"version": IMAGE_SIZES_VERSION, "sizes": self.sizes, "files": self.files}, indent=2)
+
+    def size_of(self, file_path):
+        stat = os.stat(file_path)
+        known = self.files.get(file_path)
+        if known is not None and known[:2] == [stat.st_size, stat.st_mtime_ns]:
+            digest = known[2]
+        else:
+            digest = hash_file(file_path)
+            self.files[file_path] = [stat.st_size, stat.st_mtime_ns, digest]
+        if digest not in self.sizes:
+            self.sizes[digest] = image_size(file_path)
+        size = self.sizes[digest]
+        return tuple(size) if size is not None else None
+
+    def measure(self, source, relative_paths):
+        # Maps the root relative URL of every image among relative_paths to
+        # its (width, height), dropping cache entries of files that are gone.
+        sizes = {}
+        file_paths = set()
+        for relative_path in relative_paths:
+            if os.path.splitext(relative_path)[1].lower() not in IMAGE_EXTENSIONS:
+                continue
+            file_path = os.path.join(source, relative_path)
+            file_paths.add(file_path)
+            size = self.size_of(file_path)
+            if size is not None:
+                sizes["/" + relative_path.replace(os.sep, "/")] = size
+        for file_path in list(self.files):
+            if file_path not in file_paths:
+                del self.files[file_path]
+        live_hashes = {digest for _, _, digest in self.files.values()}
+        for digest in list(self.sizes):
+            if digest not in live_hashes:
+                del self.sizes[digest]
+        return sizes
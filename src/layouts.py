@@ -0,0 +1,47 @@
+import os
+
+from template import load_template
+
+LAYOUT_EXTENSION = ".html"
+
+class Layouts:
+    # Picks the template of every page: the layout named by the page's
+    # layout front matter field, otherwise the layout of the nearest
+    # directory that has one, layouts/blog.html for the pages below
+    # content/blog for instance, and default for the rest.
+    def __init__(self, content_dir, layouts_dir, default):
+        self.content_dir = content_dir
+        self.layouts_dir = layouts_dir
+        self.default = default
+
+    def select(self, source_path, front_matter = None):
+        # Returns the template path and every path that was looked at for
+        # it, found or not, since adding or removing any of them changes
+        # what the page is rendered with.
+        name = (front_matter or {}).get("layout")
+        if name:
+            path = os.path.join(self.layouts_dir, f"{name}{LAYOUT_EXTENSION}")
+            if not os.path.exists(path):
+                raise ValueError(f"Unknown layout {name}, {path} does not exist")
+            return path, [path]
+        relative_dir = os.path.relpath(os.path.dirname(source_path), self.content_dir)
+        parts = [] if relative_dir == os.curdir else relative_dir.split(os.sep)
+        checked = []
+        for count in range(len(parts), 0, -1):
+            path = os.path.join(self.layouts_dir, *parts[:count - 1], f"{parts[count - 1]}{LAYOUT_EXTENSION}")
+            checked.append(path)
+            if os.path.exists(path):
+                return path, checked
+        return self.default, checked
+
+def page_template(source_path, front_matter, settings, page_info = None):
+    # Loads the template the page renders with, its layout when the
+    # RenderSettings have layouts and their template_path otherwise, and
+    # records in page_info the files and URLs the page depends on through it.
+    template_path, checked = settings.template_path, []
+    if settings.layouts is not None:
+        template_path, checked = settings.layouts.select(source_path, front_matter)
+    template = load_template(template_path, settings.basepath, settings.assets, settings.minify)
+    if page_info is not None:
+        page_info.add_template(list(dict.fromkeys([*checked, *template.dependencies])), template.urls)
+    return template
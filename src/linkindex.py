@@ -0,0 +1,86 @@
+import os
+import posixpath
+from urllib.parse import unquote, urlsplit
+
+from manifest import save_json
+
+def page_url(dest_path, dest_root):
+    # The URL a generated page is served at, directory index pages by their
+    # directory with a trailing slash.
+    relative_path = os.path.relpath(dest_path, dest_root).replace(os.sep, "/")
+    if relative_path == "index.html":
+        return "/"
+    if relative_path.endswith("/index.html"):
+        return "/" + relative_path[:-len("index.html")]
+    return "/" + relative_path
+
+def resolve_link(url, page):
+    # The site path url points at when it appears on page, or None for links
+    # leaving the site and links within the same page.
+    parts = urlsplit(url)
+    if parts.scheme or parts.netloc or not parts.path:
+        return None
+    path = unquote(parts.path)
+    if not path.startswith("/"):
+        path = posixpath.join(posixpath.dirname(page), path)
+    resolved = posixpath.normpath(path)
+    if resolved.startswith("//"):
+        resolved = resolved[1:]
+    if path.endswith("/") and resolved != "/":
+        resolved += "/"
+    return resolved
+
+class LinkReport:
+    def __init__(self, broken, orphans):
+        # (source path, url, suggested url or None) for every broken link.
+        self.broken = broken
+        # Source paths of the pages no other page links to.
+        self.orphans = orphans
+
+    def to_dict(self):
+        return {
+            "broken": [{"source": source, "url": url, "suggestion": suggestion} for source, url, suggestion in self.broken],
+            "orphans": self.orphans,
+        }
+
+    def save(self, path):
+        save_json(path, self.to_dict(), indent=2)
+
+class LinkIndex:
+    # Every link of every generated page, collected from the parsed markdown
+    # while the pages render, and every URL the site serves. Checking a link
+    # is a single lookup in targets.
+    def __init__(self):
+        # page URL -> (source path, links)
+        self.pages = {}
+        # Served URL -> URL of the page it serves, None for static files.
+        self.targets = {}
+
+    def add_page(self, url, source, links):
+        self.pages[url] = (source, links)
+        self.targets[url] = url
+        if url.endswith("/"):
+            self.targets[url + "index.html"] = url
+
+    def add_asset(self, url):
+        self.targets[url] = None
+
+    def check(self):
+        broken = []
+        linked = set()
+        for page, (source, links) in self.pages.items():
+            for url in links:
+                resolved = resolve_link(url, page)
+                if resolved is None:
+                    continue
+                if resolved in self.targets:
+                    target = self.targets[resolved]
+                    if target != page:
+                        linked.add(target)
+                    continue
+                # The usual mistake is a directory page linked without its
+                # trailing slash, which only works where the server redirects.
+                suggestion = resolved + "/" if resolved + "/" in self.targets else None
+                broken.append((source, url, suggestion))
+        orphans = sorted(source for page, (source, _) in self.pages.items() if page != "/" and page not in linked)
+        return LinkReport(broken, orphans)
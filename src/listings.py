@@ -0,0 +1,201 @@
+import datetime
+import hashlib
+import html
+import json
+import os
+
+from assetsync import remove_empty_dirs
+from htmlnode import LeafNode, ParentNode, rebase_url
+from output import write_output, REMOVED
+from pageinfo import slugify
+from manifest import hash_file
+from template import load_template, template_dependencies
+
+BLOG_PREFIX = "/blog/"
+POSTS_PER_PAGE = 10
+FEED_ENTRIES = 20
+FEED_NAME = "atom.xml"
+TAGS_DIR = "tags"
+
+def listing_url(base_url, number):
+    # The first page of a listing is served at its base URL, the others
+    # under page/<number>/.
+    return base_url if number == 1 else f"{base_url}page/{number}/"
+
+def url_dest_path(url, dest_root):
+    return os.path.join(dest_root, *url.strip("/").split("/"), "index.html")
+
+def atom_date(date):
+    # Front matter dates are full ISO dates or datetimes, with or without
+    # seconds and a UTC offset. Atom wants RFC 3339 timestamps, which have
+    # both, so they are given in UTC, which dates without an offset are
+    # taken to be in, and in one format so they also sort as strings.
+    moment = datetime.datetime.fromisoformat(date.replace("Z", "+00:00"))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=datetime.timezone.utc)
+    return moment.astimezone(datetime.timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
+
+def listing_entry(url, metadata):
+    # The metadata a listing shows, all a listing page depends on.
+    return [url, metadata["title"] or url, metadata["date"], metadata["summary"], metadata["tags"]]
+
+def blog_posts(index, prefix = BLOG_PREFIX):
+    # The entries of the published posts below prefix, newest first. Posts
+    # with draft: true in their front matter are left out.
+    return [listing_entry(url, metadata) for url, metadata in index.listing(prefix) if metadata.get("draft") is not True]
+
+def paginate(title, base_url, entries, per_page = POSTS_PER_PAGE):
+    # Splits entries into (URL, title, entries, newer page URL, older page
+    # URL) listing pages. A listing without entries still gets its first page.
+    count = max(1, -(-len(entries) // per_page))
+    pages = []
+    for number in range(1, count + 1):
+        newer = listing_url(base_url, number - 1) if number > 1 else None
+        older = listing_url(base_url, number + 1) if number < count else None
+        page_title = title if number == 1 else f"{title}, page {number}"
+        pages.append((listing_url(base_url, number), page_title, entries[(number - 1) * per_page:number * per_page], newer, older))
+    return pages
+
+def plan_listings(index, prefix = BLOG_PREFIX, per_page = POSTS_PER_PAGE):
+    # Every listing page of the blog below prefix: the blog index and one
+    # listing per tag its posts use. Tags with the same URL, such as C++ and
+    # c, share one listing of the posts tagged with either.
+    posts = blog_posts(index, prefix)
+    pages = paginate("Blog", prefix, posts, per_page)
+    tags_by_url = {}
+    for tag in sorted({tag for entry in posts for tag in entry[4]}):
+        tags_by_url.setdefault(tag_url(tag, prefix), []).append(tag)
+    for url, tags in sorted(tags_by_url.items()):
+        tagged = [entry for entry in posts if any(tag in entry[4] for tag in tags)]
+        pages.extend(paginate(f"Posts tagged {', '.join(tags)}", url, tagged, per_page))
+    return posts, pages
+
+def tag_url(tag, prefix = BLOG_PREFIX):
+    return f"{prefix}{TAGS_DIR}/{slugify(tag) or 'tag'}/"
+
+def listing_node(title, entries, newer, older, prefix = BLOG_PREFIX):
+    items = []
+    for url, entry_title, date, summary, tags in entries:
+        children = [LeafNode("a", html.escape(entry_title, False), {"href": url})]
+        if date:
+            children.append(LeafNode("time", date[:10], {"datetime": date}))
+        if summary:
+            children.append(LeafNode("p", html.escape(summary, False)))
+        if tags:
+            children.append(ParentNode("p", [LeafNode("a", html.escape(tag, False), {"href": tag_url(tag, prefix)}) for tag in tags]))
+        items.append(ParentNode("li", children))
+    children = [LeafNode("h1", html.escape(title, False))]
+    children.append(ParentNode("ul", items) if items else LeafNode("p", "No posts yet."))
+    nav = []
+    if newer:
+        nav.append(LeafNode("a", "Newer posts", {"href": newer, "rel": "prev"}))
+    if older:
+        nav.append(LeafNode("a", "Older posts", {"href": older, "rel": "next"}))
+    if nav:
+        children.append(ParentNode("nav", nav))
+    return ParentNode("div", children)
+
+def listing_links(entries, newer, older, prefix = BLOG_PREFIX):
+    links = [url for url, *_ in entries]
+    links.extend(tag_url(tag, prefix) for entry in entries for tag in entry[4])
+    links.extend(url for url in (newer, older) if url)
+    return list(dict.fromkeys(links))
+
+def atom_feed(title, feed_url, site_url, entries):
+    # site_url, such as https://example.com, plus the rebased root relative
+    # URL makes the absolute URLs Atom requires. Undated posts have no
+    # entry, Atom needs a date, so at least one entry has to be dated.
+    def absolute(url):
+        return html.escape(site_url.rstrip("/") + url)
+    dated = [entry for entry in entries if entry[2]]
+    lines = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        '<feed xmlns="http://www.w3.org/2005/Atom">',
+        f"  <title>{html.escape(title)}</title>",
+        f'  <link href="{absolute(feed_url.rsplit("/", 1)[0] + "/")}"/>',
+        f'  <link rel="self" href="{absolute(feed_url)}"/>',
+        f"  <id>{absolute(feed_url)}</id>",
+        f"  <updated>{max(atom_date(entry[2]) for entry in dated)}</updated>",
+    ]
+    for url, entry_title, date, summary, tags in dated:
+        lines.append("  <entry>")
+        lines.append(f"    <title>{html.escape(entry_title)}</title>")
+        lines.append(f'    <link href="{absolute(url)}"/>')
+        lines.append(f"    <id>{absolute(url)}</id>")
+        lines.append(f"    <updated>{atom_date(date)}</updated>")
+        if summary:
+            lines.append(f"    <summary>{html.escape(summary)}</summary>")
+        lines.extend(f'    <category term="{html.escape(tag)}"/>' for tag in tags)
+        lines.append("  </entry>")
+    lines.append("</feed>")
+    return "\n".join(lines) + "\n"
+
+def listing_hash(*parts):
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+def generate_listings(index, dest_root, settings, generated, prefix = BLOG_PREFIX, per_page = POSTS_PER_PAGE, site_url = "", changes = None, reserved = ()):
+    # Writes the blog listing pages, rendered with the template_path of the
+    # RenderSettings, and the Atom feed of the posts in the metadata index,
+    # and returns what the manifest keeps of them, by output
+    # path. Every output is hashed with the metadata it shows, and only
+    # written when that hash differs from the one in generated, so a build
+    # after editing one post only writes the listings that post is on.
+    # Listings that would overwrite a page output in reserved are left to
+    # that page, and outputs in generated no longer made are removed.
+    reserved = {os.path.normpath(dest_path) for dest_path in reserved}
+    posts, pages = plan_listings(index, prefix, per_page)
+    outputs = {}
+    # Listing pages also depend on the template and the partials it
+    # includes, and on the assets their URLs resolve to.
+    template_state = [[path, hash_file(path)] for path in template_dependencies(settings.template_path)]
+    if settings.assets is not None:
+        template_state.append(settings.assets.version)
+
+    def write(dest_path, digest, content, links = ()):
+        outputs[dest_path] = {"hash": digest, "links": list(links)}
+        if generated.get(dest_path, {}).get("hash") == digest and os.path.exists(dest_path):
+            return
+        print(f"Generating listing {dest_path}")
+        status = write_output(dest_path, content)
+        if changes is not None:
+            changes.record(dest_path, status)
+
+    for url, title, entries, newer, older in pages:
+        dest_path = url_dest_path(url, dest_root)
+        if os.path.normpath(dest_path) in reserved:
+            print(f"Skipping listing {url}, a page is already served there")
+            continue
+        links = listing_links(entries, newer, older, prefix)
+        def content(fp, title = title, entries = entries, newer = newer, older = older):
+            template = load_template(settings.template_path, settings.basepath, settings.assets, settings.minify)
+            node = listing_node(title, entries, newer, older, prefix)
+            template.write_to(fp, {"Title": html.escape(title, False), "Content": node.iter_html(settings.basepath, settings.assets, settings.minify)})
+        write(dest_path, listing_hash(template_state, title, entries, newer, older), content, links)
+
+    # Atom ids and links have to be absolute, so there is no feed without
+    # the URL the site is served from, nor without a dated post for its
+    # updated time. Undated posts come last, after the dated ones.
+    feed_url = prefix + FEED_NAME
+    feed_posts = posts[:FEED_ENTRIES]
+    if not site_url:
+        print(f"Not writing the {feed_url} feed, it needs --site-url for its absolute URLs")
+    elif not any(date for _, _, date, *_ in feed_posts):
+        print(f"Not writing the {feed_url} feed, none of the posts is dated")
+    else:
+        feed = atom_feed("Blog", rebase_url(feed_url, settings.basepath), site_url, [[rebase_url(url, settings.basepath), *rest] for url, *rest in feed_posts])
+        write(os.path.join(dest_root, *feed_url.strip("/").split("/")), listing_hash(feed), lambda fp: fp.write(feed))
+
+    remove_listings(generated, dest_root, outputs, reserved, changes)
+    return outputs
+
+def remove_listings(generated, dest_root, keep = (), reserved = (), changes = None):
+    # Removes the outputs in generated other than those in keep, leaving
+    # the ones a page in reserved has written over since.
+    reserved = {os.path.normpath(dest_path) for dest_path in reserved}
+    for dest_path in generated:
+        if dest_path not in keep and os.path.normpath(dest_path) not in reserved and os.path.exists(dest_path):
+            print(f"Removing stale listing {dest_path}")
+            os.remove(dest_path)
+            remove_empty_dirs(os.path.dirname(dest_path), dest_root)
+            if changes is not None:
+                changes.record(dest_path, REMOVED)
@@ -1,87 +1,433 @@
 from textnode import TextNode, TextType
 from htmlnode import HTMLNode, LeafNode, ParentNode    
-from markdownnode import extract_title
-from convertnode import markdown_to_html_node
+from frontmatter import page_title, read_front_matter
+from convertnode import iter_markdown_html
+from manifest import BuildManifest, DependencyState, hash_file, save_json
+from assetsync import sync_dir, remove_empty_dirs, AssetUrls
+from imagesize import ImageSizeCache
+from precompress import available_codecs, precompress_dir, MIN_COMPRESS_SIZE
+from stylesheets import CssCache, StylesheetResult, linked_stylesheets, prepare_stylesheets, stage_css_urls
+from layouts import Layouts, page_template
+from template import expand_includes
+from profiler import BuildProfiler
+from blockcache import BlockCache
+from pipeline import generate_pages_pipelined
+from rendersettings import RenderSettings
+from output import ChangeSet, write_output, ADDED, CHANGED, REMOVED
+from linkindex import LinkIndex, page_url
+from metadataindex import MetadataIndex
+from pageinfo import PageInfo
+from searchindex import SEARCH_INDEX_DIR, build_search_index, remove_search_index, write_search_index
+from listings import BLOG_PREFIX, POSTS_PER_PAGE, generate_listings, remove_listings
 
+import argparse
+import concurrent.futures
+import cProfile
+import functools
 import os
 import shutil
 import sys
 
 PUBLIC_PATH = './docs'
 STATIC_CONTENT_PATH = './static'
+CONTENT_PATH = './content'
+TEMPLATE_PATH = 'template.html'
+LAYOUTS_PATH = './layouts'
+PARTIALS_PATH = './partials'
+MANIFEST_PATH = './.build/manifest.json'
+PROFILE_PATH = './.build/profile.json'
+BLOCK_CACHE_PATH = './.build/block_cache.json'
+ASSET_MANIFEST_PATH = './.build/assets.json'
+IMAGE_SIZES_PATH = './.build/image_sizes.json'
+CSS_CACHE_PATH = './.build/css_cache.json'
+CSS_STAGE_PATH = './.build/css'
+CSS_URLS_STAGE_PATH = './.build/css-urls'
+CHANGES_PATH = './.build/changes.json'
+LINK_REPORT_PATH = './.build/links.json'
+METADATA_INDEX_PATH = './.build/metadata.json'
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Build the static site into ./docs")
+    parser.add_argument("basepath", nargs="?", default="/", help="URL prefix the site is served from")
+    parser.add_argument("--full", action="store_true", help="ignore the build manifest and rebuild everything")
+    parser.add_argument("--checksum", action="store_true", help="compare static files by content hash instead of size and mtime")
+    parser.add_argument("--fingerprint", action="store_true", help="copy static files under content hashed names and point URLs at them")
+    parser.add_argument("--no-image-sizes", dest="image_sizes", action="store_false", help="do not add width, height and lazy loading attributes to images")
+    parser.add_argument("--minify", action="store_true", help="strip insignificant whitespace and attribute quotes from the generated HTML")
+    parser.add_argument("--minify-css", action="store_true", help="minify the stylesheets in ./static")
+    parser.add_argument("--bundle-css", action="store_true", help="merge the stylesheets linked from the template into one bundle.css")
+    parser.add_argument("--precompress", action="store_true", help="write .gz (and .br/.zst when available) sidecars of HTML, CSS, SVG and XML outputs")
+    parser.add_argument("--precompress-min-size", type=int, default=MIN_COMPRESS_SIZE, metavar="BYTES", help="smallest output that gets precompressed sidecars")
+    parser.add_argument("--changes-file", default=CHANGES_PATH, metavar="PATH", help="where to write the list of added, changed and removed output files")
+    parser.add_argument("--check-links", action="store_true", help="report broken internal links and orphan pages")
+    parser.add_argument("--link-report", default=LINK_REPORT_PATH, metavar="PATH", help="where to write the JSON link report")
+    parser.add_argument("--search-index", action="store_true", help=f"write a sharded full text search index to {PUBLIC_PATH}/{SEARCH_INDEX_DIR} and give headings ids")
+    parser.add_argument("--blog", action="store_true", help=f"generate paginated listings, tag pages and an Atom feed of the posts in {BLOG_PREFIX}")
+    parser.add_argument("--posts-per-page", type=int, default=POSTS_PER_PAGE, metavar="N", help="number of posts on each --blog listing page")
+    parser.add_argument("--site-url", default="", metavar="URL", help="scheme and host the site is served from, the --blog Atom feed is only written when it is set")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="number of worker processes rendering pages, 0 uses every CPU")
+    parser.add_argument("--pipeline", action="store_true", help="overlap reading, rendering and writing pages using asyncio")
+    parser.add_argument("--io-threads", type=int, default=8, metavar="N", help="threads reading and writing files in --pipeline mode")
+    parser.add_argument("--block-cache", type=int, default=0, metavar="SIZE", help="cache the HTML of up to SIZE rendered blocks, reused by identical blocks")
+    parser.add_argument("--persist-block-cache", action="store_true", help=f"keep the block cache between builds in {BLOCK_CACHE_PATH}")
+    parser.add_argument("--profile", action="store_true", help="time and measure allocations of every stage of each generated page")
+    parser.add_argument("--profile-top", type=int, default=10, metavar="N", help="number of slowest pages to list in the profile report")
+    parser.add_argument("--profile-output", default=PROFILE_PATH, metavar="PATH", help="where to write the JSON profile report")
+    parser.add_argument("--cprofile", metavar="PATH", help="dump cProfile stats of page generation to PATH")
+    return parser.parse_args(argv)
 
 def main():
-    basepath = "/"
-    if len(sys.argv) >= 2:
-        basepath = sys.argv[1]
-    copy_source(STATIC_CONTENT_PATH, PUBLIC_PATH)
-    generate_pages_recursive('./content', 'template.html', PUBLIC_PATH, basepath)
+    if sys.argv[1:2] == ["serve"]:
+        # Imported here because the dev server is built on top of this module.
+        from devserver import serve_main
+        serve_main(sys.argv[2:])
+        return
+    args = parse_args(sys.argv[1:])
+    failures = build(args)
+    if failures:
+        print(f"{len(failures)} page(s) failed to generate:")
+        for source_path, error in failures:
+            print(f"  {source_path}: {error}")
+        sys.exit(1)
 
-def clear_dir(dir):
-    shutil.rmtree(dir)
-    os.mkdir(dir)
-    
-def recursive_copy(source, dest):
-    current_items = os.listdir(source)
-    for item in current_items:
-        old_path = os.path.join(source, item)
-        new_path = os.path.join(dest, item)
-        if os.path.isdir(old_path):
-            print(f"Making new dir {new_path}")
-            os.mkdir(new_path)
-            recursive_copy(old_path, new_path)
-        else:
-            print(f"Copying {old_path} to {new_path}")
-            shutil.copy(old_path, new_path)
+def build(args):
+    if args.full:
+        if os.path.exists(MANIFEST_PATH):
+            os.remove(MANIFEST_PATH)
+        if os.path.exists(PUBLIC_PATH):
+            print(f"Found {PUBLIC_PATH}, clearing contents...")
+            clear_dir(PUBLIC_PATH)
+    if not os.path.exists(PUBLIC_PATH):
+        os.mkdir(PUBLIC_PATH)
+    manifest = BuildManifest.load(MANIFEST_PATH)
+    changes = ChangeSet(PUBLIC_PATH)
+    stylesheets = prepare_static_stylesheets(args)
+    rewrite_css = functools.partial(stage_css_urls, CSS_URLS_STAGE_PATH)
+    sync = sync_dir(STATIC_CONTENT_PATH, PUBLIC_PATH, manifest.assets, args.checksum, fingerprint=args.fingerprint, prepared=stylesheets.prepared, rewrite_css=rewrite_css)
+    manifest.assets = sync.assets
+    assets = load_assets(args, sync.assets, stylesheets.aliases)
+    if args.fingerprint:
+        write_asset_manifest(ASSET_MANIFEST_PATH, assets)
+    for relative_path in sync.copied:
+        changes.record(os.path.join(PUBLIC_PATH, sync.assets[relative_path]), ADDED if relative_path in sync.added else CHANGED)
+    for dest_relative_path in sync.removed:
+        changes.record(os.path.join(PUBLIC_PATH, dest_relative_path), REMOVED)
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count()
 
-def copy_source(source, dest):
-    if os.path.exists(dest):
-        print(f"Found {dest}, clearing contents...")
-        clear_dir(dest)
-    else:
-        os.mkdir(dest)
-    recursive_copy(source, dest)
+    block_cache = None
+    if args.block_cache > 0:
+        block_cache = BlockCache.load(args.block_cache, BLOCK_CACHE_PATH if args.persist_block_cache else None)
 
-def generate_page(from_path, template_path, dest_path, basepath = '/'):
-    content = ""
-    html_content = ""
-    template = ""
-    updated_template = ""
+    profiler = None
+    if args.profile:
+        if jobs > 1:
+            print("Profiling renders pages serially, ignoring --jobs")
+            jobs = 1
+        profiler = BuildProfiler()
+        profiler.begin()
+    hot_path = cProfile.Profile() if args.cprofile else None
+    if hot_path:
+        hot_path.enable()
+    try:
+        io_threads = args.io_threads if args.pipeline else 0
+        failures = generate_pages_incremental(CONTENT_PATH, PUBLIC_PATH, manifest, render_settings(args, assets), jobs, profiler, block_cache, io_threads, changes)
+    finally:
+        if hot_path:
+            hot_path.disable()
+            hot_path.dump_stats(args.cprofile)
+            print(f"Wrote cProfile stats to {args.cprofile}")
+        if profiler:
+            profiler.finish()
+    if profiler:
+        profiler.print_report(args.profile_top)
+        profiler.write_report(args.profile_output, args.profile_top)
+        print(f"Wrote profile report to {args.profile_output}")
+    if block_cache:
+        stats = block_cache.stats()
+        print(f"Block cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate), {stats['entries']}/{stats['maxsize']} entries")
+        block_cache.save()
 
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
-    
-    with open(from_path) as f:
-        content = f.read()
-        f.close()
-    with open(template_path) as f:
-        template = f.read()
-        f.close()
-    
-    html_nodes = markdown_to_html_node(content)
-    html_content = html_nodes.to_html()
-    title = extract_title(content)
+    metadata_index = load_metadata_index(manifest)
+    metadata_index.save(METADATA_INDEX_PATH)
+    update_listings(args, manifest, metadata_index, assets, changes)
+
+    # Without --precompress this removes the sidecars of an earlier build,
+    # which would otherwise be served with outdated content.
+    codecs = available_codecs() if args.precompress else {}
+    keep = {os.path.join(PUBLIC_PATH, dest_relative_path) for dest_relative_path in sync.assets.values()}
+    precompressed = precompress_dir(PUBLIC_PATH, codecs, args.precompress_min_size, keep=keep)
+    for sidecar_path, status in precompressed.changes:
+        changes.record(sidecar_path, status)
+    if args.precompress:
+        print(f"Precompressed outputs with {', '.join(codecs)}")
+
+    if args.check_links:
+        check_links(manifest, list(sync.assets) + list(stylesheets.aliases), args.link_report)
+    update_search_index(args, manifest, changes)
+
+    manifest.save()
+    changes.save(args.changes_file)
+    print(f"Output changes: {changes.summary()}, listed in {args.changes_file}")
+    return failures
+
+def prepare_static_stylesheets(args):
+    # Minifies and bundles the stylesheets in ./static ahead of the sync,
+    # which then copies the processed files instead. The bundle holds the
+    # stylesheets the template links to, in the same order, and the template
+    # links are pointed at it through the asset URLs.
+    if not args.minify_css and not args.bundle_css:
+        return StylesheetResult()
+    bundled = []
+    if args.bundle_css:
+        bundled = [path.replace("/", os.sep) for path in linked_stylesheets(expand_includes(TEMPLATE_PATH))]
+    cache = CssCache.load(CSS_CACHE_PATH)
+    result = prepare_stylesheets(STATIC_CONTENT_PATH, CSS_STAGE_PATH, bundled, args.minify_css, cache)
+    cache.save()
+    return result
+
+def load_assets(args, synced_assets, aliases = None):
+    # What pages need to know about the synced static files, or None when
+    # they need nothing. Image dimensions are read from the file headers and
+    # cached by content hash between builds.
+    sizes = None
+    if args.image_sizes:
+        image_sizes = ImageSizeCache.load(IMAGE_SIZES_PATH)
+        sizes = image_sizes.measure(STATIC_CONTENT_PATH, synced_assets)
+        image_sizes.save()
+    if sizes is None and not args.fingerprint and not aliases:
+        return None
+    return AssetUrls.from_assets(synced_assets, sizes, aliases)
+
+def page_layouts():
+    return Layouts(CONTENT_PATH, LAYOUTS_PATH, TEMPLATE_PATH)
+
+def render_settings(args, assets = None):
+    # What every page is rendered with. Metadata is always collected, links
+    # and search sections only when they are used.
+    return RenderSettings(TEMPLATE_PATH, args.basepath, assets, args.minify, PageInfo(args.check_links, args.search_index), page_layouts())
+
+def load_metadata_index(manifest):
+    return MetadataIndex.from_manifest(manifest, lambda dest_path: page_url(dest_path, PUBLIC_PATH))
+
+def update_listings(args, manifest, metadata_index, assets = None, changes = None):
+    # Listings are made from the page metadata in the manifest, so they are
+    # up to date without reading any page back. Without --blog the listings
+    # of an earlier build are removed.
+    reserved = [entry["output"] for entry in manifest.pages.values()]
+    if not args.blog:
+        remove_listings(manifest.generated, PUBLIC_PATH, reserved=reserved, changes=changes)
+        manifest.generated = {}
+        return
+    # Listings use the layout of a page in the blog directory.
+    template_path, _ = page_layouts().select(os.path.join(CONTENT_PATH, *BLOG_PREFIX.strip("/").split("/"), "index.md"))
+    settings = RenderSettings(template_path, args.basepath, assets, args.minify)
+    manifest.generated = generate_listings(metadata_index, PUBLIC_PATH, settings, manifest.generated, BLOG_PREFIX, args.posts_per_page, args.site_url, changes, reserved)
+
+def update_search_index(args, manifest, changes = None):
+    # Built from the term counts the manifest keeps for every page, so only
+    # the pages rebuilt this time were tokenized. Without --search-index the
+    # index files of an earlier build are removed.
+    if not args.search_index:
+        remove_search_index(manifest.search_index, PUBLIC_PATH, changes=changes)
+        manifest.search_index = []
+        return
+    pages = [(page_url(entry["output"], PUBLIC_PATH), entry.get("sections", [])) for entry in manifest.pages.values()]
+    documents, shards = build_search_index(pages, args.basepath)
+    manifest.search_index = write_search_index(os.path.join(PUBLIC_PATH, SEARCH_INDEX_DIR), documents, shards, changes, manifest.search_index)
+    print(f"Search index: {len(documents)} sections, {sum(len(terms) for terms in shards.values())} terms in {len(shards)} shards")
+
+def check_links(manifest, static_paths, report_path):
+    # The links of unchanged pages come from the manifest, so only the pages
+    # rebuilt this time were parsed, and no HTML is read back.
+    index = LinkIndex()
+    for source_path, entry in manifest.pages.items():
+        index.add_page(page_url(entry["output"], PUBLIC_PATH), source_path, entry.get("links", []))
+    for dest_path, entry in manifest.generated.items():
+        if dest_path.endswith(".html"):
+            index.add_page(page_url(dest_path, PUBLIC_PATH), dest_path, entry["links"])
+        else:
+            index.add_asset(page_url(dest_path, PUBLIC_PATH))
+    for relative_path in static_paths:
+        index.add_asset("/" + relative_path.replace(os.sep, "/"))
+    report = index.check()
+    for source_path, url, suggestion in report.broken:
+        hint = f", did you mean {suggestion}?" if suggestion else ""
+        print(f"Broken link in {source_path}: {url}{hint}")
+    for source_path in report.orphans:
+        print(f"Orphan page, nothing links to {source_path}")
+    report.save(report_path)
+    print(f"Links: {len(report.broken)} broken, {len(report.orphans)} orphan page(s), listed in {report_path}")
+    return report
+
+def write_asset_manifest(path, assets):
+    # Lists every fingerprinted URL so deploy tooling can serve them with a
+    # long lived, immutable Cache-Control header.
+    save_json(path, assets.urls, indent=2, sort_keys=True)
+
+def clear_dir(dir):
+    shutil.rmtree(dir)
+    os.mkdir(dir)
     
-    updated_template = template.replace('{{ Title }}', title)
-    updated_template = updated_template.replace('{{ Content }}', html_content)
-    updated_template = updated_template.replace('href=\"/', f"href=\"{basepath}")
-    updated_template = updated_template.replace('src=\"/', f"src=\"{basepath}")
+def generate_page(from_path, dest_path, settings, block_cache = None, page_info = None):
+    # The markdown is streamed block by block straight into the output, so
+    # memory use does not grow with the size of the page. The output is only
+    # replaced when its content actually changed. Templates use the title
+    # before the content, so without a front matter title the lines up to
+    # the first h1 are read ahead for it, and read again by the parse.
+    with open(from_path) as source:
+        front_matter = read_front_matter(source)
+        template = page_template(from_path, front_matter, settings, page_info)
+        print(f"Generating page from {from_path} to {dest_path} using {template.dependencies[0]}")
+        body = source.tell()
+        title = page_title(front_matter, source)
+        source.seek(body)
+        if page_info is not None:
+            page_info.front_matter, page_info.title = front_matter, title
+        html_chunks = iter_markdown_html(source, block_cache, settings.basepath, settings.assets, settings.minify, page_info)
+        return write_output(dest_path, lambda f: template.write_to(f, {"Title": title, "Content": html_chunks}))
 
-    if not os.path.exists(os.path.dirname(dest_path)):
-        os.makedirs(os.path.dirname(dest_path))
-    with open(dest_path, 'w') as f:
-        f.write(updated_template)
-        f.close()
+def page_dest_path(source_path, dir_path_content, dest_dir_path):
+    relative_path = os.path.relpath(source_path, dir_path_content)
+    dest_item_basename, _ = os.path.splitext(os.path.join(dest_dir_path, relative_path))
+    return f"{dest_item_basename}.html"
 
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath = '/'):
+def find_pages(dir_path_content, dest_dir_path):
+    pages = []
     current_items = os.listdir(dir_path_content)
     for item in current_items:
         source_item_path = os.path.join(dir_path_content, item)
         dest_item_path = os.path.join(dest_dir_path, item)
-        dest_item_basename, dest_item_ext = os.path.splitext(dest_item_path)
         if os.path.isdir(source_item_path):
-            generate_pages_recursive(source_item_path, template_path, dest_item_path, basepath)
-        elif dest_item_ext == ".md":
-            generate_page(source_item_path, template_path, f"{dest_item_basename}.html", basepath)
+            pages.extend(find_pages(source_item_path, dest_item_path))
+        elif source_item_path.endswith(".md"):
+            pages.append((source_item_path, page_dest_path(source_item_path, dir_path_content, dest_dir_path)))
+    return pages
+
+def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath = '/'):
+    settings = RenderSettings(template_path, basepath)
+    for source_path, dest_path in find_pages(dir_path_content, dest_dir_path):
+        generate_page(source_path, dest_path, settings)
+
+def remove_output(dest_path, dest_root):
+    if os.path.exists(dest_path):
+        print(f"Removing {dest_path}, its source was deleted")
+        os.remove(dest_path)
+    remove_empty_dirs(os.path.dirname(dest_path), dest_root)
+
+# Block cache of a worker process, set up by init_worker_block_cache.
+worker_block_cache = None
+
+def init_worker_block_cache(maxsize, path):
+    global worker_block_cache
+    worker_block_cache = BlockCache.load(maxsize, path, track_new=True)
+
+def generate_page_in_worker(from_path, dest_path, settings):
+    # Hands the page's PageInfo and the worker's new cache entries and
+    # counters back to the parent, which merges them into its own cache so
+    # they can be persisted.
+    page_info = settings.fresh_page_info()
+    if worker_block_cache is None:
+        status = generate_page(from_path, dest_path, settings, None, page_info)
+        return status, page_info, {}, 0, 0
+    hits, misses = worker_block_cache.hits, worker_block_cache.misses
+    status = generate_page(from_path, dest_path, settings, worker_block_cache, page_info)
+    return status, page_info, worker_block_cache.take_new_entries(), worker_block_cache.hits - hits, worker_block_cache.misses - misses
+
+def generate_pages(pages, settings, jobs = 1, profiler = None, block_cache = None, io_threads = 0):
+    # Renders every (source, dest) pair and yields (source, error, status,
+    # page_info) as each page finishes, error being None on success and
+    # status telling whether the output was added, changed or left
+    # unchanged. When the RenderSettings collect a PageInfo, page_info is a
+    # fresh copy of it filled in while the page rendered, otherwise None. A
+    # failing page never stops the others from being generated. A non zero
+    # io_threads runs the asyncio pipeline that overlaps file I/O with
+    # rendering.
+    if io_threads and not profiler:
+        yield from generate_pages_pipelined(pages, settings, jobs, block_cache, io_threads)
+        return
+    if jobs <= 1 or len(pages) <= 1 or profiler:
+        render_page = profiler.generate_page if profiler else generate_page
+        for source_path, dest_path in pages:
+            page_info = settings.fresh_page_info()
+            try:
+                status = render_page(source_path, dest_path, settings, block_cache, page_info)
+            except Exception as e:
+                yield source_path, e, None, None
+            else:
+                yield source_path, None, status, page_info
+        return
+
+    if block_cache is None:
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=jobs)
+    else:
+        executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=jobs, initializer=init_worker_block_cache, initargs=(block_cache.maxsize, block_cache.path),
+        )
+    with executor:
+        futures = {}
+        for source_path, dest_path in pages:
+            future = executor.submit(generate_page_in_worker, source_path, dest_path, settings)
+            futures[future] = source_path
+        for future in concurrent.futures.as_completed(futures):
+            error = future.exception()
+            if error is not None:
+                yield futures[future], error, None, None
+                continue
+            status, page_info, new_entries, hits, misses = future.result()
+            if block_cache is not None:
+                for key, entry in new_entries.items():
+                    block_cache.put(key, *entry)
+                block_cache.hits += hits
+                block_cache.misses += misses
+            yield futures[future], None, status, page_info
+
+def generate_pages_incremental(dir_path_content, dest_dir_path, manifest, settings, jobs = 1, profiler = None, block_cache = None, io_threads = 0, changes = None):
+    pages = find_pages(dir_path_content, dest_dir_path)
+    # The template files and assets each page was rendered with are recorded
+    # with it, from its PageInfo, so editing a layout or partial or changing
+    # an asset only rebuilds the pages that use it. Whether pages refer to
+    # assets at all is shared by every page.
+    if settings.collect is None:
+        settings = settings.collecting(PageInfo())
+    dependencies = DependencyState(settings.assets)
+    inputs = {"basepath": settings.basepath}
+    if settings.assets is not None:
+        inputs["assets"] = True
+    if settings.minify:
+        inputs["minify"] = True
+    # Pages recorded without what is now collected have to be parsed again,
+    # and collecting search sections adds heading ids.
+    inputs.update({name: True for name, value in settings.collect.to_dict().items()})
+    if manifest.update_inputs(inputs):
+        print("Basepath, assets, minification or collected page info changed, rebuilding every page")
+    for dest_path in manifest.remove_missing_pages([source_path for source_path, _ in pages]):
+        remove_output(dest_path, dest_dir_path)
+        if changes is not None:
+            changes.record(dest_path, REMOVED)
+
+    stale_pages = []
+    source_hashes = {}
+    for source_path, dest_path in pages:
+        source_hash = hash_file(source_path)
+        if not manifest.page_is_stale(source_path, dest_path, source_hash, dependencies):
+            print(f"Skipping {source_path}, unchanged since last build")
+            continue
+        stale_pages.append((source_path, dest_path))
+        source_hashes[source_path] = source_hash
+
+    dest_paths = dict(stale_pages)
+    failures = []
+    for source_path, error, status, page_info in generate_pages(stale_pages, settings, jobs, profiler, block_cache, io_threads):
+        if error is not None:
+            print(f"Failed to generate page from {source_path}: {error}")
+            failures.append((source_path, error))
+            continue
+        if changes is not None:
+            changes.record(dest_paths[source_path], status)
+        info = page_info.to_dict()
+        info["dependencies"] = dependencies.record(page_info.dependencies, page_info.urls)
+        manifest.record_page(source_path, dest_paths[source_path], source_hashes[source_path], info)
+    return failures
 
     
 if __name__ == "__main__":
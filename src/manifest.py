@@ -0,0 +1,149 @@
+import hashlib
+import json
+import os
+
+MANIFEST_VERSION = 1
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_json(path, description, fallback, version = None):
+    # The data saved at path, or None when there is none, it is corrupt or,
+    # when version is set, it was saved by a different version and so is
+    # treated like a missing file. fallback says what the build does instead.
+    if path is None or not os.path.exists(path):
+        return None
+    with open(path) as f:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError:
+            print(f"{description} {path} is corrupt, {fallback}")
+            return None
+    if version is not None and data.get("version") != version:
+        return None
+    return data
+
+def save_json(path, data, **dump_args):
+    # Written to a temporary file first so an interrupted build never leaves
+    # a half written file behind.
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, **dump_args)
+    os.replace(tmp_path, path)
+
+class DependencyState:
+    # What pages depend on besides their source, as it is now: the hash of
+    # every template, layout and partial file, None for missing ones, and
+    # what each asset URL resolves to. Files are hashed once per build.
+    def __init__(self, assets = None):
+        self.assets = assets
+        self.hashes = {}
+
+    def file_hash(self, path):
+        if path not in self.hashes:
+            self.hashes[path] = hash_file(path) if os.path.exists(path) else None
+        return self.hashes[path]
+
+    def asset_state(self, url):
+        size = self.assets.image_size(url)
+        return [self.assets.get(url), list(size) if size is not None else None]
+
+    def record(self, files, urls):
+        # The dependencies the manifest keeps of a page rendered with the
+        # template files in files and linking to urls.
+        dependencies = {"files": {path: self.file_hash(path) for path in files}}
+        if self.assets is not None:
+            dependencies["assets"] = {url: self.asset_state(url) for url in sorted(urls)}
+        return dependencies
+
+    def changed(self, dependencies):
+        if dependencies is None:
+            return True
+        if any(self.file_hash(path) != digest for path, digest in dependencies["files"].items()):
+            return True
+        if self.assets is None:
+            return False
+        return any(self.asset_state(url) != state for url, state in dependencies.get("assets", {}).items())
+
+class BuildManifest:
+    def __init__(self, path, inputs = None, pages = None, assets = None, generated = None, search_index = None):
+        self.path = path
+        self.inputs = inputs if inputs is not None else {}
+        self.pages = pages if pages is not None else {}
+        self.assets = assets if assets is not None else {}
+        # Outputs made from the pages rather than from a source file, such as
+        # blog listings, by output path -> {"hash": hash of what they were
+        # made from, ...}.
+        self.generated = generated if generated is not None else {}
+        # The search index files the last build wrote, the only files under
+        # the search directory it may remove.
+        self.search_index = search_index if search_index is not None else []
+
+    @classmethod
+    def load(cls, path):
+        # A manifest written by a different version is treated like a missing
+        # one so that every page gets rebuilt.
+        data = load_json(path, "Build manifest", "starting a full build", MANIFEST_VERSION)
+        if data is None:
+            return cls(path)
+        return cls(path, data.get("inputs", {}), data.get("pages", {}), data.get("assets", {}), data.get("generated", {}), data.get("search_index", []))
+
+    def save(self):
+        save_json(self.path, {
+            "version": MANIFEST_VERSION,
+            "inputs": self.inputs,
+            "pages": self.pages,
+            "assets": self.assets,
+            "generated": self.generated,
+            "search_index": self.search_index,
+        }, indent=2, sort_keys=True)
+
+    def update_inputs(self, inputs):
+        # Inputs shared by every page (basepath, minification, ...). If any
+        # of them changed then no recorded page can be trusted.
+        if inputs == self.inputs:
+            return False
+        self.inputs = dict(inputs)
+        # Only the output of every page is kept, so pages whose source is
+        # gone can still have their output removed, and the rest are stale.
+        self.pages = {source: {"output": entry["output"]} for source, entry in self.pages.items()}
+        # Generated outputs are still known, so they can be removed when no
+        # longer made, but lose their hash so they are all made again.
+        self.generated = {dest_path: {} for dest_path in self.generated}
+        return True
+
+    def page_is_stale(self, source, dest, source_hash, dependencies = None):
+        # dependencies, a DependencyState, also makes pages stale when a
+        # template file or asset they were rendered with changed.
+        entry = self.pages.get(source)
+        if entry is None:
+            return True
+        if entry.get("hash") != source_hash or entry["output"] != dest:
+            return True
+        if dependencies is not None and dependencies.changed(entry.get("dependencies")):
+            return True
+        return not os.path.exists(dest)
+
+    def record_page(self, source, dest, source_hash, info = None):
+        # info, what PageInfo collected about the page, is kept for the site
+        # wide link and search indexes.
+        self.pages[source] = {"hash": source_hash, "output": dest}
+        if info:
+            self.pages[source].update(info)
+
+    def remove_page(self, source):
+        entry = self.pages.pop(source, None)
+        return entry["output"] if entry else None
+
+    def remove_missing_pages(self, sources):
+        sources = set(sources)
+        removed = []
+        for source in list(self.pages):
+            if source not in sources:
+                removed.append(self.pages.pop(source)["output"])
+        return removed
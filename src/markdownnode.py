@@ -9,33 +9,66 @@ class BlockType(Enum):
     UNORDERED_LIST = "ulist"
     ORDERED_LIST = "olist"
 
+def iter_blocks(lines):
+    # Reads markdown one line at a time from any iterable of lines (a file
+    # object, a list from str.split) and yields (block_type, lines) for each
+    # block as soon as it ends, so only one block is ever held in memory.
+    # Blocks are separated by blank lines, except inside a ``` fence which
+    # runs until its closing fence.
+    block_lines = []
+    in_fence = False
+    for line in lines:
+        line = line.rstrip("\n")
+        if in_fence:
+            block_lines.append(line)
+            if line.startswith("```"):
+                in_fence = False
+                yield typed_block(block_lines)
+                block_lines = []
+            continue
+        if line.strip() == "":
+            if block_lines:
+                yield typed_block(block_lines)
+                block_lines = []
+            continue
+        if not block_lines:
+            line = line.lstrip()
+            in_fence = line.startswith("```") and "```" not in line[3:]
+        block_lines.append(line)
+    if block_lines:
+        yield typed_block(block_lines)
+
+def typed_block(lines):
+    lines[-1] = lines[-1].rstrip()
+    return lines_to_block_type(lines), lines
+
 def markdown_to_blocks(markdown):
-    split_markdown = markdown.split("\n\n")
     blocks = []
-    for block in split_markdown:
-        if block == "":
-            continue
-        blocks.append(block.strip())
+    for _, lines in iter_blocks(markdown.split("\n")):
+        blocks.append("\n".join(lines))
     return blocks
 
 def block_to_block_type(block):
-    lines = block.split("\n")
+    return lines_to_block_type(block.split("\n"))
 
-    if block.startswith(("# ", "## ", "### ", "#### ", "##### ", "###### ")):
+def lines_to_block_type(lines):
+    first_line = lines[0]
+
+    if first_line.startswith(("# ", "## ", "### ", "#### ", "##### ", "###### ")):
         return BlockType.HEADING
-    if len(lines) > 1 and lines[0].startswith("```") and lines[-1].startswith("```"):
+    if len(lines) > 1 and first_line.startswith("```") and lines[-1].startswith("```"):
         return BlockType.CODE
-    if block.startswith(">"):
+    if first_line.startswith(">"):
         for line in lines:
             if not line.startswith(">"):
                 return BlockType.PARAGRAPH
         return BlockType.QUOTE
-    if block.startswith("- "):
+    if first_line.startswith("- "):
         for line in lines:
             if not line.startswith("- "):
                 return BlockType.PARAGRAPH
         return BlockType.UNORDERED_LIST
-    if block.startswith("1. "):
+    if first_line.startswith("1. "):
         i = 1
         for line in lines:
             if not line.startswith(f"{i}. "):
@@ -45,7 +78,11 @@ def block_to_block_type(block):
     return BlockType.PARAGRAPH
 
 def extract_title(markdown):
-    lines = markdown.split('\n')
+    return extract_title_from_lines(markdown.split('\n'))
+
+def extract_title_from_lines(lines):
+    # Stops at the first h1, so on a file object only the lines up to the
+    # title are read.
     for line in lines:
         if re.match(r"# .+", line):
             return(re.sub(r'^# ', '', line).strip())
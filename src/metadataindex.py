@@ -0,0 +1,33 @@
+from manifest import save_json
+
+class MetadataIndex:
+    # The metadata of every page (title, date, tags, summary, word count and
+    # any other front matter fields) by page URL, kept in the build manifest
+    # so listings can be made without reading or parsing any page again.
+    def __init__(self, pages = None):
+        self.pages = pages if pages is not None else {}
+
+    @classmethod
+    def from_manifest(cls, manifest, url_of):
+        # url_of maps a page's output path to its URL.
+        return cls({url_of(entry["output"]): entry["metadata"] for entry in manifest.pages.values() if "metadata" in entry})
+
+    def listing(self, prefix = "/", tag = None):
+        # (URL, metadata) of the pages below prefix, itself excluded, newest
+        # first and undated pages last, optionally only those tagged tag.
+        pages = [
+            (url, metadata) for url, metadata in self.pages.items()
+            if url.startswith(prefix) and url != prefix and (tag is None or tag in metadata["tags"])
+        ]
+        pages.sort(key=lambda page: page[1]["title"] or "")
+        pages.sort(key=lambda page: page[1]["date"] or "", reverse=True)
+        return pages
+
+    def tags(self):
+        tags = set()
+        for metadata in self.pages.values():
+            tags.update(metadata["tags"])
+        return sorted(tags)
+
+    def save(self, path):
+        save_json(path, self.pages, indent=2, sort_keys=True)
@@ -0,0 +1,78 @@
+import re
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+# Attribute values made only of these characters need no quotes.
+UNQUOTED_VALUE_PATTERN = re.compile(r"[^\s\"'=<>`]+")
+TAG_PATTERN = re.compile(r"(<!--.*?-->|<[^>]*>)", re.DOTALL)
+TAG_NAME_PATTERN = re.compile(r"<\s*(/?)\s*([!\w-]+)")
+QUOTED_ATTRIBUTE_PATTERN = re.compile(r"(\s[\w:-]+)=\"([^\s\"'=<>`]+)\"")
+
+# Whitespace inside these elements is significant and kept exactly.
+PRESERVE_WHITESPACE_TAGS = frozenset(("pre", "code", "textarea", "script", "style"))
+# Elements that never have content, so their end tag can be left out.
+VOID_TAGS = frozenset(("area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"))
+# Whitespace next to these is never rendered, so it is dropped entirely
+# rather than collapsed to a single space.
+BLOCK_TAGS = frozenset((
+    "!doctype", "html", "head", "body", "meta", "link", "title", "script", "style", "base",
+    "article", "aside", "blockquote", "div", "footer", "h1", "h2", "h3", "h4", "h5", "h6",
+    "header", "hr", "li", "main", "nav", "ol", "p", "pre", "section", "table", "tbody",
+    "td", "th", "thead", "tr", "ul",
+))
+
+def collapse_whitespace(text):
+    return WHITESPACE_PATTERN.sub(" ", text)
+
+def attribute_to_html(key, value, minify = False):
+    if minify and UNQUOTED_VALUE_PATTERN.fullmatch(value):
+        return f" {key}={value}"
+    return f" {key}=\"{value}\""
+
+def _tag_name(tag):
+    match = TAG_NAME_PATTERN.match(tag)
+    if match is None:
+        return None, False
+    return match.group(2).lower(), match.group(1) == "/"
+
+def _minify_tag(tag):
+    if tag.startswith("<!--"):
+        return tag
+    tag = QUOTED_ATTRIBUTE_PATTERN.sub(r"\1=\2", tag)
+    if tag.endswith("/>"):
+        # Void elements need no self closing slash in HTML.
+        tag = tag[:-2].rstrip() + ">"
+    return tag
+
+def _minify_text(text, previous_name, next_name):
+    text = collapse_whitespace(text)
+    if previous_name in BLOCK_TAGS:
+        text = text.lstrip()
+    if next_name in BLOCK_TAGS:
+        text = text.rstrip()
+    return text
+
+def minify_html_text(html):
+    # Minifies hand written markup such as the page template: drops
+    # whitespace next to block level tags, collapses the rest to single
+    # spaces and unquotes attribute values that do not need quotes. The
+    # content of pre, code, textarea, script and style is copied as is up to
+    # its end tag. The edges of html keep a single space, since they may sit
+    # next to a placeholder.
+    minified = []
+    position = 0
+    previous_name = None
+    while True:
+        match = TAG_PATTERN.search(html, position)
+        if match is None:
+            minified.append(_minify_text(html[position:], previous_name, None))
+            return "".join(minified)
+        name, closing = _tag_name(match.group(0))
+        minified.append(_minify_text(html[position:match.start()], previous_name, name))
+        minified.append(_minify_tag(match.group(0)))
+        position = match.end()
+        previous_name = name
+        if name in PRESERVE_WHITESPACE_TAGS and not closing:
+            end = re.compile(rf"</\s*{name}\b", re.IGNORECASE).search(html, position)
+            end_position = end.start() if end else len(html)
+            minified.append(html[position:end_position])
+            position = end_position
@@ -1,6 +1,25 @@
+import re
+
 from textnode import TextNode, TextType
 from extract_markdown_uris import extract_markdown_images, extract_markdown_links
 
+# Images, links and the simple delimiters in one alternation, so a single
+# scan over the text finds every inline token in order. Images and links
+# match what the patterns in extract_markdown_uris match and are tried first,
+# which means delimiters inside a URL or alt text are never treated as
+# markup. Their text is captured in a lookahead, which the regex engine never
+# backtracks into, so only the first ]( after an opener is tried: when that
+# has no closing ) a later one has none either, and trying each of them made
+# unclosed links cubic in the length of the line. The leading lookahead lets
+# the regex engine skip quickly over plain text.
+INLINE_TOKEN_PATTERN = re.compile(r"(?=[!\[*_`])(?:!\[(?=(.*?)\]\()\1\]\((.*?)\)|(?<!\!)\[(?=(.*?)\]\()\3\]\((.*?)\)|\*\*|_|`)")
+IMAGE_PATTERN = re.compile(r"!\[(?=(.*?)\]\()\1\]\((.*?)\)")
+INLINE_DELIMITERS = {
+    "**": TextType.BOLD,
+    "_": TextType.ITALIC,
+    "`": TextType.CODE,
+}
+
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
     new_nodes = []
     for old_node in old_nodes:
@@ -69,4 +88,56 @@ def split_nodes_link(old_nodes):
             new_nodes.append(TextNode(text, TextType.LINK, url))
         if remaining_text != "":
             new_nodes.append(TextNode(remaining_text, TextType.TEXT))
-    return new_nodes
\ No newline at end of file
+    return new_nodes
+
+def split_text_inline(text):
+    # Single pass equivalent of running split_nodes_image, split_nodes_link
+    # and split_nodes_delimiter for each delimiter in turn. Once a delimiter
+    # is opened everything up to the matching closing delimiter is taken
+    # literally, we don't process nested nodes. The multi pass splitter takes
+    # out images before looking for links, so a link that has an image start
+    # inside it, as in [![alt](img.png)](url), is not a link: its [ is plain
+    # text and the scan goes on from the next character, so the image wins.
+    nodes = []
+    position = 0
+    search_from = 0
+    open_delimiter = None
+    open_end = 0
+    images = IMAGE_PATTERN.finditer(text)
+    next_image = next(images, None)
+    while (match := INLINE_TOKEN_PATTERN.search(text, search_from)) is not None:
+        if match.group(3) is not None:
+            while next_image is not None and next_image.start() < match.start():
+                next_image = next(images, None)
+            if next_image is not None and next_image.start() < match.end():
+                search_from = match.start() + 1
+                continue
+        search_from = match.end()
+        token = match.group(0)
+        if open_delimiter is not None:
+            if token == open_delimiter:
+                inner_text = text[open_end:match.start()]
+                if inner_text != "":
+                    nodes.append(TextNode(inner_text, INLINE_DELIMITERS[token]))
+                position = match.end()
+                open_delimiter = None
+            continue
+
+        preceding_text = text[position:match.start()]
+        if preceding_text != "":
+            nodes.append(TextNode(preceding_text, TextType.TEXT))
+        position = match.end()
+        if token in INLINE_DELIMITERS:
+            open_delimiter = token
+            open_end = match.end()
+        elif match.group(1) is not None:
+            nodes.append(TextNode(match.group(1), TextType.IMAGE, match.group(2)))
+        else:
+            nodes.append(TextNode(match.group(3), TextType.LINK, match.group(4)))
+
+    if open_delimiter is not None:
+        raise ValueError(f"Missing closing delimiter: {text}")
+    remaining_text = text[position:]
+    if remaining_text != "":
+        nodes.append(TextNode(remaining_text, TextType.TEXT))
+    return nodes
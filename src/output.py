@@ -0,0 +1,75 @@
+import hashlib
+import os
+
+from manifest import hash_file, save_json
+
+ADDED = "added"
+CHANGED = "changed"
+UNCHANGED = "unchanged"
+REMOVED = "removed"
+
+class HashingWriter:
+    # Text file wrapper that hashes everything written through it, so the
+    # digest of a streamed page is known without reading it back.
+    def __init__(self, fp):
+        self.fp = fp
+        self.digest = hashlib.sha256()
+
+    def write(self, text):
+        self.digest.update(text.encode())
+        return self.fp.write(text)
+
+    def writelines(self, chunks):
+        for chunk in chunks:
+            self.write(chunk)
+
+    def hexdigest(self):
+        return self.digest.hexdigest()
+
+def write_output(dest_path, write):
+    # Calls write(fp) to produce the output into a temporary file and only
+    # moves it over dest_path when the content differs, so unchanged outputs
+    # keep their mtime. Returns ADDED, CHANGED or UNCHANGED. A write that
+    # fails halfway never replaces the previous output.
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    tmp_path = f"{dest_path}.tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            writer = HashingWriter(f)
+            write(writer)
+        if not os.path.exists(dest_path):
+            os.replace(tmp_path, dest_path)
+            return ADDED
+        # Only outputs of the same size can be identical, which saves hashing
+        # the previous output in the common case of an edited page.
+        if os.path.getsize(tmp_path) == os.path.getsize(dest_path) and hash_file(dest_path) == writer.hexdigest():
+            return UNCHANGED
+        os.replace(tmp_path, dest_path)
+        return CHANGED
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+class ChangeSet:
+    # Output files added, changed and removed by a build, relative to the
+    # output directory, for deploy steps that only upload the delta.
+    def __init__(self, dest_root):
+        self.dest_root = dest_root
+        self.changes = {ADDED: set(), CHANGED: set(), REMOVED: set()}
+
+    def record(self, dest_path, status):
+        if status == UNCHANGED:
+            return
+        relative_path = os.path.relpath(dest_path, self.dest_root)
+        for paths in self.changes.values():
+            paths.discard(relative_path)
+        self.changes[status].add(relative_path)
+
+    def to_dict(self):
+        return {status: sorted(paths) for status, paths in self.changes.items()}
+
+    def summary(self):
+        return ", ".join(f"{len(paths)} {status}" for status, paths in self.changes.items())
+
+    def save(self, path):
+        save_json(path, self.to_dict(), indent=2)
@@ -0,0 +1,108 @@
+import re
+
+from markdownnode import BlockType
+from searchindex import term_counts
+
+SLUG_STRIP_PATTERN = re.compile(r"[^\w\s-]")
+SLUG_SEPARATOR_PATTERN = re.compile(r"[\s_-]+")
+HEADING_PREFIX_PATTERN = re.compile(r"^#+ ")
+SUMMARY_LENGTH = 200
+# Shorter paragraphs, such as a lone "Back home" link, are passed over for
+# the summary unless the page has nothing longer.
+SUMMARY_MIN_WORDS = 5
+
+def slugify(text):
+    return SLUG_SEPARATOR_PATTERN.sub("-", SLUG_STRIP_PATTERN.sub("", text.lower())).strip("-")
+
+def summarize(text, length = SUMMARY_LENGTH):
+    if len(text) <= length:
+        return text
+    return text[:length].rsplit(" ", 1)[0] + "..."
+
+class PageInfo:
+    # The metadata of a page, what it links to and its searchable text,
+    # gathered from the front matter and the parsed blocks while the page
+    # renders so nothing has to read the source or output back. The title is
+    # the exception, the renderer finds it before the content is parsed.
+    # links and sections stay None unless they are collected. Collecting
+    # sections also gives every heading an id to link search results to.
+    def __init__(self, links = False, search = False):
+        self.links = [] if links else None
+        # [anchor, heading text, [text of the blocks below it]], the first
+        # one having an empty anchor when the page starts without a heading.
+        self.sections = [] if search else None
+        self.anchors = set()
+        self.front_matter = {}
+        self.title = None
+        self.summary = None
+        self.short_summary = None
+        self.word_count = 0
+        # The template files the page was rendered with, and the root
+        # relative URLs of the page and its template, which the build
+        # manifest records as the page's dependencies.
+        self.dependencies = []
+        self.urls = set()
+
+    def fresh(self):
+        # An empty PageInfo collecting the same things, for the next page.
+        return PageInfo(self.links is not None, self.sections is not None)
+
+    def heading_anchor(self, lines):
+        # Unique id for the heading block lines, or None when headings get
+        # no ids. It is worked out from the markdown, before the block is
+        # parsed, so it can be part of the block cache key.
+        if self.sections is None:
+            return None
+        slug = slugify(HEADING_PREFIX_PATTERN.sub("", lines[0])) or "section"
+        anchor = slug
+        count = 1
+        while anchor in self.anchors:
+            anchor = f"{slug}-{count}"
+            count += 1
+        self.anchors.add(anchor)
+        return anchor
+
+    def add_block(self, block_type, anchor, links, text):
+        word_count = len(text.split())
+        self.word_count += word_count
+        if self.summary is None and block_type == BlockType.PARAGRAPH and text:
+            if word_count >= SUMMARY_MIN_WORDS:
+                self.summary = summarize(text)
+            elif self.short_summary is None:
+                self.short_summary = text
+        self.urls.update(url for url in links if url.startswith("/"))
+        if self.links is not None:
+            self.links.extend(links)
+        if self.sections is None:
+            return
+        if anchor is not None:
+            self.sections.append([anchor, text, []])
+        elif text:
+            if not self.sections:
+                self.sections.append(["", "", []])
+            self.sections[-1][2].append(text)
+
+    def add_template(self, dependencies, urls):
+        self.dependencies = dependencies
+        self.urls.update(urls)
+
+    def metadata(self):
+        # The front matter fields, plus the title, summary and word count
+        # worked out from the page where the front matter has none.
+        metadata = dict(self.front_matter)
+        metadata["title"] = self.title
+        metadata["date"] = str(metadata["date"]) if "date" in metadata else None
+        metadata["tags"] = metadata.get("tags", [])
+        metadata["summary"] = metadata.get("summary") or metadata.get("description") or self.summary or self.short_summary or ""
+        metadata["word_count"] = self.word_count
+        return metadata
+
+    def to_dict(self):
+        # What the build manifest keeps of the page, sections reduced to the
+        # term counts the search index is built from.
+        info = {"metadata": self.metadata()}
+        if self.links is not None:
+            info["links"] = self.links
+        if self.sections is not None:
+            info["sections"] = [[anchor, title, term_counts(" ".join([title, *texts]))] for anchor, title, texts in self.sections]
+        return info
@@ -0,0 +1,100 @@
+import asyncio
+import concurrent.futures
+
+from convertnode import iter_markdown_html
+from frontmatter import page_title, split_front_matter
+from output import write_output
+from layouts import page_template
+
+def read_page(source_path):
+    with open(source_path) as f:
+        return f.read()
+
+def render_page(source_path, content, settings, block_cache = None):
+    # Returns the page and, when the RenderSettings collect a PageInfo, a
+    # fresh one filled in for this page.
+    front_matter, body = split_front_matter(content)
+    lines = body.split("\n")
+    title = page_title(front_matter, lines)
+    page_info = settings.fresh_page_info()
+    template = page_template(source_path, front_matter, settings, page_info)
+    print(f"Generating page from {source_path} using {template.dependencies[0]}")
+    if page_info is not None:
+        page_info.front_matter, page_info.title = front_matter, title
+    html_chunks = iter_markdown_html(lines, block_cache, settings.basepath, settings.assets, settings.minify, page_info)
+    return template.render({"Title": title, "Content": html_chunks}), page_info
+
+def write_page(dest_path, page):
+    return write_output(dest_path, lambda f: f.write(page))
+
+async def run_pipeline(pages, settings, jobs = 1, block_cache = None, io_threads = 8, queue_size = 32):
+    # Reads, renders and writes pages as three concurrent stages connected by
+    # bounded queues. Reads and writes run on a thread pool so that while one
+    # page renders the next ones are already being read and the previous
+    # ones written, hiding the I/O latency behind rendering. The queues
+    # bound how far reading can run ahead of rendering, and rendering ahead
+    # of writing, so memory stays limited to queue_size pages per stage.
+    loop = asyncio.get_running_loop()
+    pending = asyncio.Queue()
+    for page in pages:
+        pending.put_nowait(page)
+    rendered_queue = asyncio.Queue(queue_size)
+    read_queue = asyncio.Queue(queue_size)
+    results = []
+
+    if jobs > 1:
+        # Rendering is CPU bound, so it only runs in parallel across processes.
+        # Worker processes have no access to the parent's block cache.
+        render_executor = concurrent.futures.ProcessPoolExecutor(max_workers=jobs)
+        render_cache = None
+    else:
+        render_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        render_cache = block_cache
+    io_executor = concurrent.futures.ThreadPoolExecutor(max_workers=io_threads)
+
+    async def reader():
+        while not pending.empty():
+            source_path, dest_path = pending.get_nowait()
+            try:
+                content = await loop.run_in_executor(io_executor, read_page, source_path)
+            except Exception as e:
+                results.append((source_path, e, None, None))
+                continue
+            await read_queue.put((source_path, dest_path, content))
+
+    async def renderer():
+        while (item := await read_queue.get()) is not None:
+            source_path, dest_path, content = item
+            try:
+                page, page_info = await loop.run_in_executor(render_executor, render_page, source_path, content, settings, render_cache)
+            except Exception as e:
+                results.append((source_path, e, None, None))
+                continue
+            await rendered_queue.put((source_path, dest_path, page, page_info))
+
+    async def writer():
+        while (item := await rendered_queue.get()) is not None:
+            source_path, dest_path, page, page_info = item
+            try:
+                status = await loop.run_in_executor(io_executor, write_page, dest_path, page)
+            except Exception as e:
+                results.append((source_path, e, None, None))
+                continue
+            results.append((source_path, None, status, page_info))
+
+    renderer_count = max(1, jobs)
+    writer_count = max(1, io_threads // 2)
+    with render_executor, io_executor:
+        writers = [asyncio.create_task(writer()) for _ in range(writer_count)]
+        renderers = [asyncio.create_task(renderer()) for _ in range(renderer_count)]
+        await asyncio.gather(*(reader() for _ in range(io_threads)))
+        for _ in renderers:
+            await read_queue.put(None)
+        await asyncio.gather(*renderers)
+        for _ in writers:
+            await rendered_queue.put(None)
+        await asyncio.gather(*writers)
+    return results
+
+def generate_pages_pipelined(pages, settings, jobs = 1, block_cache = None, io_threads = 8):
+    return asyncio.run(run_pipeline(pages, settings, jobs, block_cache, io_threads))
@@ -0,0 +1,124 @@
+import concurrent.futures
+import gzip
+import os
+
+from output import ADDED, CHANGED, REMOVED
+
+# brotli and zstd sidecars are only written when their modules are installed.
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSIBLE_EXTENSIONS = frozenset((".html", ".css", ".svg", ".xml"))
+SIDECAR_EXTENSIONS = (".gz", ".br", ".zst")
+# Below this many bytes a file fits in a packet or two either way, so
+# compressing it gains nothing.
+MIN_COMPRESS_SIZE = 1024
+
+def gzip_compress(data):
+    # mtime=0 keeps the output reproducible.
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+def brotli_compress(data):
+    return brotli.compress(data, quality=11)
+
+def zstd_compress(data):
+    return zstandard.ZstdCompressor(level=19).compress(data)
+
+def available_codecs():
+    codecs = {".gz": gzip_compress}
+    if brotli is not None:
+        codecs[".br"] = brotli_compress
+    if zstandard is not None:
+        codecs[".zst"] = zstd_compress
+    return codecs
+
+class PrecompressResult:
+    def __init__(self):
+        # (sidecar path, ADDED, CHANGED or REMOVED) for every sidecar touched.
+        self.changes = []
+
+def sidecar_is_stale(path, sidecar_path):
+    # A sidecar is given the mtime of the file it was compressed from, and
+    # unchanged outputs keep their mtime, so a matching mtime means the
+    # sidecar is still up to date.
+    try:
+        sidecar_stat = os.stat(sidecar_path)
+    except FileNotFoundError:
+        return True
+    return sidecar_stat.st_mtime_ns != os.stat(path).st_mtime_ns
+
+def remove_sidecar(sidecar_path, changes):
+    os.remove(sidecar_path)
+    changes.append((sidecar_path, REMOVED))
+
+def compress_file(path, codecs):
+    # Writes every stale sidecar of path and returns the changes. A sidecar
+    # that would not be smaller than the file is dropped, servers then send
+    # the file as is.
+    changes = []
+    stale = {extension: compress for extension, compress in codecs.items() if sidecar_is_stale(path, path + extension)}
+    if not stale:
+        return changes
+    stat = os.stat(path)
+    with open(path, 'rb') as f:
+        data = f.read()
+    for extension, compress in stale.items():
+        sidecar_path = path + extension
+        existed = os.path.exists(sidecar_path)
+        compressed = compress(data)
+        if len(compressed) >= len(data):
+            if existed:
+                remove_sidecar(sidecar_path, changes)
+            continue
+        tmp_path = f"{sidecar_path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(compressed)
+        os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(tmp_path, sidecar_path)
+        changes.append((sidecar_path, CHANGED if existed else ADDED))
+    return changes
+
+def precompress_dir(root, codecs = None, min_size = MIN_COMPRESS_SIZE, threads = None, keep = ()):
+    # Writes sidecars for every compressible file under root of at least
+    # min_size bytes, recompressing only files whose content changed, and
+    # removes the sidecars no longer wanted: those of deleted or too small
+    # files and of codecs not in codecs. An empty codecs removes them all.
+    # Files in keep (synced static files) are never treated as sidecars.
+    codecs = available_codecs() if codecs is None else codecs
+    result = PrecompressResult()
+    to_compress = []
+    for dir_path, _, file_names in os.walk(root):
+        for file_name in file_names:
+            path = os.path.join(dir_path, file_name)
+            base_path, extension = os.path.splitext(path)
+            if extension in SIDECAR_EXTENSIONS:
+                if path in keep or os.path.splitext(base_path)[1] not in COMPRESSIBLE_EXTENSIONS:
+                    continue
+                if extension not in codecs or not os.path.exists(base_path) or os.path.getsize(base_path) < min_size:
+                    remove_sidecar(path, result.changes)
+                continue
+            if extension in COMPRESSIBLE_EXTENSIONS and codecs and os.path.getsize(path) >= min_size:
+                to_compress.append(path)
+
+    # zlib, brotli and zstd all release the GIL while compressing, so a
+    # thread pool compresses files in parallel without copying them into
+    # worker processes.
+    if len(to_compress) > 1:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
+            for changes in executor.map(compress_file, to_compress, [codecs] * len(to_compress)):
+                result.changes.extend(changes)
+    else:
+        for path in to_compress:
+            result.changes.extend(compress_file(path, codecs))
+    for sidecar_path, status in result.changes:
+        if status == REMOVED:
+            print(f"Removing stale sidecar {sidecar_path}")
+        else:
+            print(f"Compressing {os.path.splitext(sidecar_path)[0]} to {sidecar_path}")
+    return result
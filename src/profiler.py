@@ -0,0 +1,133 @@
+import contextlib
+import time
+import tracemalloc
+
+from convertnode import block_anchor, block_lines_to_html_node, cached_block_lines_to_html_node, html_node_links, html_node_text
+from htmlnode import ParentNode
+from frontmatter import page_title, split_front_matter
+from markdownnode import iter_blocks
+from output import write_output
+from layouts import page_template
+from manifest import save_json
+
+PROFILE_STAGES = ["read", "block_parse", "inline_parse", "serialize", "template_fill", "write"]
+
+class PageProfile:
+    def __init__(self, source_path, dest_path):
+        self.source_path = source_path
+        self.dest_path = dest_path
+        self.seconds = dict.fromkeys(PROFILE_STAGES, 0.0)
+        self.allocated = dict.fromkeys(PROFILE_STAGES, 0)
+        self.bytes_written = 0
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        # Allocated bytes are the peak traced memory reached during the stage
+        # above what was already allocated when it started.
+        tracemalloc.reset_peak()
+        allocated_before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] += time.perf_counter() - start
+            self.allocated[name] += max(0, tracemalloc.get_traced_memory()[1] - allocated_before)
+
+    def total_seconds(self):
+        return sum(self.seconds.values())
+
+    def to_dict(self):
+        return {
+            "source": self.source_path,
+            "output": self.dest_path,
+            "seconds": self.total_seconds(),
+            "allocated_bytes": sum(self.allocated.values()),
+            "bytes_written": self.bytes_written,
+            "stages": {name: {"seconds": self.seconds[name], "allocated_bytes": self.allocated[name]} for name in PROFILE_STAGES},
+        }
+
+class BuildProfiler:
+    def __init__(self):
+        self.pages = []
+        self.start = None
+        self.end = None
+
+    def begin(self):
+        tracemalloc.start()
+        self.start = time.perf_counter()
+
+    def finish(self):
+        self.end = time.perf_counter()
+        tracemalloc.stop()
+
+    def generate_page(self, from_path, dest_path, settings, block_cache = None, page_info = None):
+        # Same output as main.generate_page, but each stage runs to completion
+        # before the next so it can be timed on its own, instead of being
+        # interleaved block by block by the streaming renderer.
+        print(f"Profiling page from {from_path} to {dest_path} using {settings.template_path}")
+        profile = PageProfile(from_path, dest_path)
+        self.pages.append(profile)
+
+        with profile.stage("read"):
+            with open(from_path) as f:
+                content = f.read()
+        with profile.stage("block_parse"):
+            front_matter, body = split_front_matter(content)
+            lines = body.split("\n")
+            title = page_title(front_matter, lines)
+            if page_info is not None:
+                page_info.front_matter, page_info.title = front_matter, title
+            blocks = list(iter_blocks(lines))
+        with profile.stage("inline_parse"):
+            if block_cache is None:
+                children = []
+                for block_type, lines in blocks:
+                    anchor = block_anchor(block_type, lines, page_info)
+                    child = block_lines_to_html_node(block_type, lines, anchor)
+                    if page_info is not None:
+                        page_info.add_block(block_type, anchor, html_node_links(child), html_node_text(child))
+                    children.append(child)
+            else:
+                children = [cached_block_lines_to_html_node(block_type, lines, block_cache, settings.basepath, settings.assets, settings.minify, page_info) for block_type, lines in blocks]
+            html_node = ParentNode("div", children)
+        with profile.stage("serialize"):
+            html_content = html_node.to_html(settings.basepath, settings.assets, settings.minify)
+        with profile.stage("template_fill"):
+            template = page_template(from_path, front_matter, settings, page_info)
+            page = template.render({"Title": title, "Content": html_content})
+        with profile.stage("write"):
+            status = write_output(dest_path, lambda f: f.write(page))
+        profile.bytes_written = len(page.encode())
+        return status
+
+    def report(self, top = 10):
+        elapsed = (self.end or time.perf_counter()) - self.start
+        bytes_written = sum(page.bytes_written for page in self.pages)
+        stage_totals = {name: sum(page.seconds[name] for page in self.pages) for name in PROFILE_STAGES}
+        return {
+            "pages": len(self.pages),
+            "seconds": elapsed,
+            "pages_per_second": len(self.pages) / elapsed if elapsed else None,
+            "bytes_written": bytes_written,
+            "stages": stage_totals,
+            "slowest": [page.to_dict() for page in self.slowest(top)],
+            "page_profiles": [page.to_dict() for page in self.pages],
+        }
+
+    def slowest(self, top):
+        return sorted(self.pages, key=lambda page: page.total_seconds(), reverse=True)[:top]
+
+    def print_report(self, top = 10):
+        report = self.report(top)
+        print(f"Profiled {report['pages']} page(s) in {report['seconds']:.3f}s, "
+              f"{report['pages_per_second'] or 0:.1f} pages/s, {report['bytes_written']} bytes written")
+        print("Time per stage: " + ", ".join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in report["stages"].items()))
+        print(f"Slowest {len(report['slowest'])} page(s):")
+        header = "".join(f"{name:>14}" for name in PROFILE_STAGES)
+        print(f"{'total ms':>10}{'alloc KiB':>11}{header}  page")
+        for page in report["slowest"]:
+            stages = "".join(f"{page['stages'][name]['seconds'] * 1000:14.2f}" for name in PROFILE_STAGES)
+            print(f"{page['seconds'] * 1000:10.2f}{page['allocated_bytes'] / 1024:11.1f}{stages}  {page['source']}")
+
+    def write_report(self, path, top = 10):
+        save_json(path, self.report(top), indent=2)
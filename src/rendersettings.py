@@ -0,0 +1,21 @@
+class RenderSettings:
+    # What every page of a build is rendered with, passed as one value
+    # through the page renderers. It is pickled for worker processes, so the
+    # block cache, which every process keeps its own of, is passed
+    # separately. collect is the PageInfo every page fills in a fresh copy
+    # of, None to collect nothing, and layouts, when set, picks a template
+    # other than template_path per page.
+    def __init__(self, template_path, basepath = '/', assets = None, minify = False, collect = None, layouts = None):
+        self.template_path = template_path
+        self.basepath = basepath
+        self.assets = assets
+        self.minify = minify
+        self.collect = collect
+        self.layouts = layouts
+
+    def fresh_page_info(self):
+        return self.collect.fresh() if self.collect is not None else None
+
+    def collecting(self, collect):
+        # The same settings collecting into collect instead.
+        return RenderSettings(self.template_path, self.basepath, self.assets, self.minify, collect, self.layouts)
@@ -0,0 +1,74 @@
+import collections
+import json
+import os
+import re
+
+from assetsync import remove_empty_dirs
+from htmlnode import rebase_url
+from output import write_output, REMOVED
+
+SEARCH_INDEX_DIR = "search"
+TOKEN_PATTERN = re.compile(r"\w+")
+MIN_TOKEN_LENGTH = 2
+
+def tokenize(text):
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if len(token) >= MIN_TOKEN_LENGTH]
+
+def term_counts(text):
+    return dict(collections.Counter(tokenize(text)))
+
+def shard_name(term):
+    # Terms are sharded by their first character, so a query only fetches
+    # the shards of the characters its terms start with.
+    first = term[0]
+    return first if first.isascii() and first.isalnum() else "_"
+
+def build_search_index(pages, basepath = '/'):
+    # pages holds (page URL, sections) pairs, sections being the
+    # [anchor, title, term counts] lists a PageInfo collected. Returns the
+    # documents, every heading section by its URL mapped to [page title,
+    # section title], and the shards mapping each term to its
+    # [document URL, count] postings.
+    documents = {}
+    shards = {}
+    for url, sections in sorted(pages):
+        page_title = next((title for anchor, title, _ in sections if anchor), "")
+        for anchor, title, counts in sections:
+            document = rebase_url(url, basepath) + (f"#{anchor}" if anchor else "")
+            documents[document] = [page_title, title]
+            for term, count in counts.items():
+                shards.setdefault(shard_name(term), {}).setdefault(term, []).append([document, count])
+    return documents, shards
+
+def write_search_index(dest_dir, documents, shards, changes = None, previous = ()):
+    # Writes documents.json and one <shard>.json per shard as compact JSON,
+    # and returns the paths written, for the manifest to keep. Files are only
+    # replaced when their content changed, so editing a page only touches the
+    # shards of the terms it gained or lost. Of the files in previous, the
+    # paths written last time, those no longer needed are removed; anything
+    # else in dest_dir, a page served under it for instance, is left alone.
+    written = []
+
+    def write(name, data):
+        path = os.path.join(dest_dir, f"{name}.json")
+        text = json.dumps(data, separators=(",", ":"), sort_keys=True, ensure_ascii=False)
+        status = write_output(path, lambda f: f.write(text))
+        written.append(path)
+        if changes is not None:
+            changes.record(path, status)
+
+    write("documents", documents)
+    for name, postings in sorted(shards.items()):
+        write(name, postings)
+    remove_search_index(previous, os.path.dirname(dest_dir), written, changes)
+    return written
+
+def remove_search_index(paths, dest_root, keep = (), changes = None):
+    # Removes the search index files in paths other than those in keep.
+    for path in paths:
+        if path not in keep and os.path.exists(path):
+            print(f"Removing stale search shard {path}")
+            os.remove(path)
+            remove_empty_dirs(os.path.dirname(path), dest_root)
+            if changes is not None:
+                changes.record(path, REMOVED)
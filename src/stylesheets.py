@@ -0,0 +1,177 @@
+import hashlib
+import os
+import posixpath
+import re
+
+from assetsync import list_files
+from manifest import load_json, save_json
+from output import write_output
+
+CSS_CACHE_VERSION = 1
+BUNDLE_PATH = "bundle.css"
+
+CSS_TOKEN_PATTERN = re.compile(r"""/\*.*?(?:\*/|$)|"(?:\\.|[^"\\])*"?|'(?:\\.|[^'\\])*'?|\s+|[{};,>:()]|[^\s"'/{};,>:()]+|/""", re.DOTALL)
+CSS_URL_PATTERN = re.compile(r"""url\(\s*(["']?)([^"')\s]+)\1\s*\)""")
+# URLs with a scheme, root relative URLs and fragments point at the same
+# place from any stylesheet.
+ABSOLUTE_URL_PATTERN = re.compile(r"^(?:[a-zA-Z][a-zA-Z0-9+.-]*:|/|#)")
+LINK_TAG_PATTERN = re.compile(r"<link\b[^>]*>", re.IGNORECASE)
+# Where the query or fragment of a URL starts.
+URL_SUFFIX_PATTERN = re.compile(r"[?#]")
+STYLESHEET_HREF_PATTERN = re.compile(r"\bhref=\"/([^\"]+\.css)\"")
+STYLESHEET_REL_PATTERN = re.compile(r"\brel=\"?stylesheet\b", re.IGNORECASE)
+
+# No space is needed on this side of these characters. The space before "("
+# and ":" is kept, it matters in "and (min-width: ...)" and "a :hover".
+NO_SPACE_BEFORE = frozenset("{};,>)")
+NO_SPACE_AFTER = frozenset("{};,>:(")
+
+def minify_css(text):
+    # Drops comments (except /*! license comments) and insignificant
+    # whitespace, collapses the rest to single spaces and drops the last
+    # semicolon of every block. Strings are copied as is.
+    minified = []
+    space = False
+    for match in CSS_TOKEN_PATTERN.finditer(text):
+        token = match.group(0)
+        if token.isspace() or (token.startswith("/*") and not token.startswith("/*!")):
+            space = True
+            continue
+        if token == "}" and minified and minified[-1] == ";":
+            minified.pop()
+        if space and minified and minified[-1][-1] not in NO_SPACE_AFTER and token[0] not in NO_SPACE_BEFORE and not minified[-1].endswith("*/"):
+            minified.append(" ")
+        minified.append(token)
+        space = False
+    return "".join(minified)
+
+def rebase_css_urls(text, from_dir, to_dir):
+    # Rewrites the relative url() references of a stylesheet in from_dir so
+    # they still resolve when it is served from to_dir.
+    if from_dir == to_dir:
+        return text
+    def rebase(match):
+        url = match.group(2)
+        if ABSOLUTE_URL_PATTERN.match(url):
+            return match.group(0)
+        url = posixpath.relpath(posixpath.normpath(posixpath.join(from_dir or ".", url)), to_dir or ".")
+        return f"url({match.group(1)}{url}{match.group(1)})"
+    return CSS_URL_PATTERN.sub(rebase, text)
+
+def point_css_urls(text, css_dir, urls):
+    # Points the url() references of a stylesheet served from css_dir at the
+    # URLs in urls, which maps root relative URLs to the ones to use instead,
+    # such as fingerprinted URLs. Relative references stay relative.
+    def point(match):
+        url = match.group(2)
+        if url.startswith("//") or (ABSOLUTE_URL_PATTERN.match(url) and not url.startswith("/")):
+            return match.group(0)
+        query = URL_SUFFIX_PATTERN.search(url)
+        path, suffix = (url[:query.start()], url[query.start():]) if query else (url, "")
+        root_url = path if path.startswith("/") else posixpath.normpath(posixpath.join("/" + css_dir, path))
+        target = urls.get(root_url)
+        if target is None:
+            return match.group(0)
+        if not path.startswith("/"):
+            target = posixpath.relpath(target, "/" + css_dir)
+        return f"url({match.group(1)}{target}{suffix}{match.group(1)})"
+    return CSS_URL_PATTERN.sub(point, text)
+
+def stage_css_urls(stage, relative_path, source_path, urls):
+    # The stylesheet to copy for relative_path: source_path itself when none
+    # of its url() references change, otherwise a copy in stage with them
+    # pointed at urls.
+    text = _read(source_path)
+    pointed = point_css_urls(text, os.path.dirname(relative_path).replace(os.sep, "/"), urls)
+    if pointed == text:
+        return source_path
+    stage_path = os.path.join(stage, relative_path)
+    write_output(stage_path, lambda fp: fp.write(pointed))
+    return stage_path
+
+def linked_stylesheets(html):
+    # Paths relative to the site root of the local stylesheets html links
+    # to, in the order they are linked.
+    paths = []
+    for tag in LINK_TAG_PATTERN.findall(html):
+        href = STYLESHEET_HREF_PATTERN.search(tag)
+        if href is not None and STYLESHEET_REL_PATTERN.search(tag) and href.group(1) not in paths:
+            paths.append(href.group(1))
+    return paths
+
+class CssCache:
+    # Minified stylesheets by hash of their source text, persisted between
+    # builds so unchanged stylesheets are not minified again.
+    def __init__(self, path = None, outputs = None):
+        self.path = path
+        self.outputs = outputs if outputs is not None else {}
+        self.used = set()
+
+    @classmethod
+    def load(cls, path):
+        data = load_json(path, "CSS cache", "minifying every stylesheet again", CSS_CACHE_VERSION)
+        if data is None:
+            return cls(path)
+        return cls(path, data.get("outputs", {}))
+
+    def save(self):
+        # Only the entries used by this build are kept.
+        if self.path is None:
+            return
+        outputs = {digest: css for digest, css in self.outputs.items() if digest in self.used}
+        save_json(self.path, {"version": CSS_CACHE_VERSION, "outputs": outputs}, indent=2)
+
+    def minify(self, text):
+        digest = hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+        if digest not in self.outputs:
+            self.outputs[digest] = minify_css(text)
+        self.used.add(digest)
+        return self.outputs[digest]
+
+class StylesheetResult:
+    def __init__(self):
+        # Passed to sync_dir: the staged file to copy for every processed
+        # stylesheet, None for the stylesheets merged into the bundle.
+        self.prepared = {}
+        # Bundled stylesheet -> bundle, for AssetUrls.from_assets.
+        self.aliases = {}
+
+def _read(path):
+    with open(path) as f:
+        return f.read()
+
+def prepare_stylesheets(source, stage, bundled = (), minify = False, cache = None, bundle_path = BUNDLE_PATH):
+    # Writes the stylesheets the static sync should copy instead of the ones
+    # in source into stage: every .css minified when minify is set, and the
+    # stylesheets in bundled merged into bundle_path in that order. Staged
+    # files are only rewritten when their content changes, so the sync skips
+    # them otherwise. Staged files no longer produced are removed.
+    cache = cache or CssCache()
+    result = StylesheetResult()
+    relative_paths = [relative_path for relative_path in list_files(source) if relative_path.endswith(".css")]
+    bundled = [relative_path for relative_path in bundled if relative_path in relative_paths]
+
+    def stage_file(relative_path, css):
+        stage_path = os.path.join(stage, relative_path)
+        write_output(stage_path, lambda fp: fp.write(css))
+        result.prepared[relative_path] = stage_path
+
+    if minify:
+        for relative_path in relative_paths:
+            if relative_path not in bundled:
+                stage_file(relative_path, cache.minify(_read(os.path.join(source, relative_path))))
+    if bundled:
+        parts = []
+        for relative_path in bundled:
+            css = rebase_css_urls(_read(os.path.join(source, relative_path)), os.path.dirname(relative_path), os.path.dirname(bundle_path))
+            parts.append(cache.minify(css) if minify else css)
+            result.prepared[relative_path] = None
+            result.aliases[relative_path] = bundle_path
+        stage_file(bundle_path, "\n".join(parts))
+
+    staged = {stage_path for stage_path in result.prepared.values() if stage_path is not None}
+    if os.path.isdir(stage):
+        for relative_path in list_files(stage):
+            if os.path.join(stage, relative_path) not in staged:
+                os.remove(os.path.join(stage, relative_path))
+    return result
@@ -0,0 +1,127 @@
+import functools
+import os
+import re
+
+from htmlnode import rebase_url
+from minify import minify_html_text
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+ROOT_URL_PATTERN = re.compile(r'((?:href|src)=")(/[^"]*)')
+LINK_TAG_PATTERN = re.compile(r"(\s*)(<link\b[^>]*>)", re.IGNORECASE)
+INCLUDE_PATTERN = re.compile(r"""\{%\s*include\s+["']([^"']+)["']\s*%\}""")
+
+def rewrite_root_urls(html, basepath, assets = None):
+    if basepath == "/" and assets is None:
+        return html
+    return ROOT_URL_PATTERN.sub(lambda match: match.group(1) + rebase_url(match.group(2), basepath, assets), html)
+
+def drop_duplicate_links(literals):
+    # Stylesheets merged into a bundle all end up linking to the bundle,
+    # which only needs linking once.
+    seen = set()
+    def drop(match):
+        if match.group(2) in seen:
+            return ""
+        seen.add(match.group(2))
+        return match.group(0)
+    return [LINK_TAG_PATTERN.sub(drop, literal) for literal in literals]
+
+class Template:
+    def __init__(self, literals, slots, urls = (), dependencies = ()):
+        # literals always has exactly one more entry than slots; rendering
+        # interleaves them as literal, slot, literal, ..., literal.
+        self.literals = literals
+        self.slots = slots
+        # The root relative URLs in the template, before they were rebased.
+        self.urls = urls
+        # The template file and the partials it includes.
+        self.dependencies = dependencies
+
+    def iter_render(self, values):
+        # A value is either a string or an iterable of string chunks, such as
+        # HTMLNode.iter_html(), which is streamed through without joining it.
+        yield self.literals[0]
+        for (name, placeholder), literal in zip(self.slots, self.literals[1:]):
+            # Unknown placeholders are left in place, the same as when they
+            # were substituted with str.replace.
+            value = values.get(name, placeholder)
+            if isinstance(value, str):
+                yield value
+            else:
+                yield from value
+            yield literal
+
+    def render(self, values):
+        return "".join(self.iter_render(values))
+
+    def write_to(self, fp, values):
+        fp.writelines(self.iter_render(values))
+
+    def __repr__(self):
+        return f"Template({self.literals}, {self.slots})"
+
+def compile_template(text, basepath = '/', assets = None, minify = False):
+    literals = []
+    slots = []
+    position = 0
+    for match in PLACEHOLDER_PATTERN.finditer(text):
+        literals.append(rewrite_root_urls(text[position:match.start()], basepath, assets))
+        slots.append((match.group(1), match.group(0)))
+        position = match.end()
+    literals.append(rewrite_root_urls(text[position:], basepath, assets))
+    if assets is not None:
+        literals = drop_duplicate_links(literals)
+    if minify:
+        literals = [minify_html_text(literal) for literal in literals]
+    urls = tuple(dict.fromkeys(match.group(2) for match in ROOT_URL_PATTERN.finditer(text)))
+    return Template(literals, slots, urls)
+
+@functools.lru_cache(maxsize=64)
+def _parse_partial(path, mtime_ns):
+    # Splits a template or partial into text, include path, text, ..., text,
+    # include paths resolved against the directory of the including file.
+    # Every version of a file is only read and parsed once, however many
+    # templates include it.
+    with open(path) as f:
+        parts = INCLUDE_PATTERN.split(f.read())
+    return tuple(part if i % 2 == 0 else os.path.normpath(os.path.join(os.path.dirname(path), part)) for i, part in enumerate(parts))
+
+def parse_partial(path, included_from = None):
+    try:
+        return _parse_partial(path, os.stat(path).st_mtime_ns)
+    except FileNotFoundError:
+        if included_from is None:
+            raise
+        raise ValueError(f"Missing partial {path} included from {included_from}") from None
+
+def template_dependencies(template_path):
+    # template_path followed by every partial it includes, directly or
+    # through other partials, each listed once.
+    dependencies = [template_path]
+    for path in dependencies:
+        for i, part in enumerate(parse_partial(path)):
+            if i % 2 and part not in dependencies:
+                parse_partial(part, path)
+                dependencies.append(part)
+    return dependencies
+
+def expand_includes(template_path, including = ()):
+    # The text of template_path with every {% include "path" %} replaced by
+    # the expanded text of the partial.
+    if template_path in including:
+        raise ValueError(f"Partial {template_path} includes itself through {' -> '.join(including)}")
+    parts = parse_partial(template_path, including[-1] if including else None)
+    return "".join(part if i % 2 == 0 else expand_includes(part, (*including, template_path)) for i, part in enumerate(parts))
+
+@functools.lru_cache(maxsize=16)
+def _load_template(template_path, stamps, basepath, assets, minify):
+    template = compile_template(expand_includes(template_path), basepath, assets, minify)
+    template.dependencies = tuple(path for path, _ in stamps)
+    return template
+
+def load_template(template_path, basepath = '/', assets = None, minify = False):
+    # The mtimes of the template and of every partial it includes are part
+    # of the cache key so an edit to any of them is picked up by long running
+    # processes, while a single build only compiles each template once.
+    stamps = tuple((path, os.stat(path).st_mtime_ns) for path in template_dependencies(template_path))
+    return _load_template(template_path, stamps, basepath, assets, minify)
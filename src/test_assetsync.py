@@ -0,0 +1,133 @@
+import os
+import unittest
+
+from fixtures import TempDirTestCase
+from assetsync import copy_file, file_changed, fingerprinted_path, list_files, sync_dir, AssetUrls
+from stylesheets import stage_css_urls
+
+class TestAssetSync(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.source = os.path.join(self.tmp.name, "static")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        os.makedirs(self.dest)
+        self.write("index.css", "body { color: red; }", self.source)
+        self.write(os.path.join("images", "a.png"), "png bytes", self.source)
+        self.write(os.path.join("images", "b.png"), "more png bytes", self.source)
+
+    def test_list_files(self):
+        self.assertEqual(
+            list_files(self.source),
+            [os.path.join("images", "a.png"), os.path.join("images", "b.png"), "index.css"],
+        )
+
+    def test_copy_file_keeps_content_and_mtime(self):
+        source_path = os.path.join(self.source, "index.css")
+        dest_path = os.path.join(self.dest, "index.css")
+        copy_file(source_path, dest_path)
+        self.assertEqual(self.read("index.css", self.dest), "body { color: red; }")
+        self.assertEqual(os.stat(source_path).st_mtime_ns, os.stat(dest_path).st_mtime_ns)
+        self.assertFalse(file_changed(source_path, dest_path))
+
+    def test_first_sync_copies_everything(self):
+        result = sync_dir(self.source, self.dest)
+        self.assertEqual(sorted(result.copied), sorted(list_files(self.source)))
+        self.assertEqual(self.read(os.path.join("images", "b.png"), self.dest), "more png bytes")
+
+    def test_second_sync_copies_nothing(self):
+        first = sync_dir(self.source, self.dest)
+        second = sync_dir(self.source, self.dest, first.assets)
+        self.assertEqual(second.copied, [])
+        self.assertEqual(second.removed, [])
+
+    def test_changed_file_is_copied(self):
+        first = sync_dir(self.source, self.dest)
+        self.write("index.css", "body { color: blue; }", self.source)
+        second = sync_dir(self.source, self.dest, first.assets)
+        self.assertEqual(second.copied, ["index.css"])
+        self.assertEqual(self.read("index.css", self.dest), "body { color: blue; }")
+
+    def test_checksum_detects_same_size_change(self):
+        first = sync_dir(self.source, self.dest)
+        dest_path = self.write("index.css", "body { color: rod; }", self.dest)
+        source_stat = os.stat(os.path.join(self.source, "index.css"))
+        os.utime(dest_path, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+        self.assertEqual(sync_dir(self.source, self.dest, first.assets).copied, [])
+        self.assertEqual(sync_dir(self.source, self.dest, first.assets, checksum=True).copied, ["index.css"])
+
+    def test_stale_files_removed(self):
+        first = sync_dir(self.source, self.dest)
+        self.write("index.html", "generated page", self.dest)
+        os.remove(os.path.join(self.source, "images", "a.png"))
+        os.remove(os.path.join(self.source, "images", "b.png"))
+        second = sync_dir(self.source, self.dest, first.assets)
+        self.assertEqual(sorted(second.removed), [os.path.join("images", "a.png"), os.path.join("images", "b.png")])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images")))
+        # Files the sync did not create are never touched.
+        self.assertEqual(self.read("index.html", self.dest), "generated page")
+
+    def test_fingerprinted_path(self):
+        self.assertEqual(fingerprinted_path(os.path.join("images", "a.png"), "3f9a1c2b77"), os.path.join("images", "a.3f9a1c2b.png"))
+        self.assertEqual(fingerprinted_path("LICENSE", "3f9a1c2b77"), "LICENSE.3f9a1c2b")
+
+    def test_fingerprint(self):
+        first = sync_dir(self.source, self.dest, fingerprint=True)
+        css_path = first.assets["index.css"]
+        self.assertRegex(css_path, r"^index\.[0-9a-f]{8}\.css$")
+        self.assertEqual(self.read(css_path, self.dest), "body { color: red; }")
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "index.css")))
+        self.assertEqual(sync_dir(self.source, self.dest, first.assets, fingerprint=True).copied, [])
+
+        self.write("index.css", "body { color: blue; }", self.source)
+        second = sync_dir(self.source, self.dest, first.assets, fingerprint=True)
+        self.assertNotEqual(second.assets["index.css"], css_path)
+        self.assertEqual(second.added, ["index.css"])
+        self.assertEqual(second.removed, [css_path])
+        self.assertEqual(sorted(os.listdir(self.dest)), ["images", second.assets["index.css"]])
+
+    def test_fingerprint_points_stylesheets_at_fingerprinted_files(self):
+        stage = os.path.join(self.tmp.name, "stage")
+        rewrite_css = lambda relative_path, source_path, urls: stage_css_urls(stage, relative_path, source_path, urls)
+        self.write("index.css", "body { background: url(images/a.png); }", self.source)
+        first = sync_dir(self.source, self.dest, fingerprint=True, rewrite_css=rewrite_css)
+        self.assertEqual(self.read(first.assets["index.css"], self.dest), f"body {{ background: url({first.assets[os.path.join('images', 'a.png')].replace(os.sep, '/')}); }}")
+        self.assertEqual(sync_dir(self.source, self.dest, first.assets, fingerprint=True, rewrite_css=rewrite_css).copied, [])
+
+        # A new image fingerprint gives the stylesheet a new one as well.
+        self.write(os.path.join("images", "a.png"), "new png bytes", self.source)
+        second = sync_dir(self.source, self.dest, first.assets, fingerprint=True, rewrite_css=rewrite_css)
+        self.assertEqual(sorted(second.copied), [os.path.join("images", "a.png"), "index.css"])
+        self.assertNotEqual(second.assets["index.css"], first.assets["index.css"])
+
+    def test_fingerprint_turned_off(self):
+        first = sync_dir(self.source, self.dest, fingerprint=True)
+        second = sync_dir(self.source, self.dest, first.assets)
+        self.assertEqual(sorted(second.removed), sorted(first.assets.values()))
+        self.assertEqual(sorted(os.listdir(self.dest)), ["images", "index.css"])
+
+    def test_prepared_files(self):
+        bundle = self.write("bundle.css", "body{color:red}")
+        result = sync_dir(self.source, self.dest, prepared={"index.css": None, "bundle.css": bundle})
+        self.assertNotIn("index.css", result.assets)
+        self.assertEqual(self.read("bundle.css", self.dest), "body{color:red}")
+        second = sync_dir(self.source, self.dest, result.assets)
+        self.assertEqual(second.removed, ["bundle.css"])
+        self.assertEqual(sorted(os.listdir(self.dest)), ["images", "index.css"])
+
+    def test_asset_urls(self):
+        assets = AssetUrls.from_assets({
+            "index.css": "index.3f9a1c2b.css",
+            os.path.join("images", "a.png"): os.path.join("images", "a.77aa0f01.png"),
+            "robots.txt": "robots.txt",
+        })
+        self.assertEqual(assets.urls, {"/index.css": "/index.3f9a1c2b.css", "/images/a.png": "/images/a.77aa0f01.png"})
+        self.assertEqual(assets, AssetUrls(dict(assets.urls)))
+        self.assertEqual(hash(assets), hash(AssetUrls(dict(assets.urls))))
+        self.assertNotEqual(assets, AssetUrls({}))
+
+    def test_asset_url_aliases(self):
+        assets = AssetUrls.from_assets({"bundle.css": "bundle.3f9a1c2b.css"}, aliases={"index.css": "bundle.css"})
+        self.assertEqual(assets.urls, {"/bundle.css": "/bundle.3f9a1c2b.css", "/index.css": "/bundle.3f9a1c2b.css"})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import unittest
+
+from blockcache import BlockCache
+from convertnode import markdown_to_html_node
+from markdownnode import BlockType
+from fixtures import TempDirTestCase
+
+MARKDOWN = """# Title
+
+A shared **disclaimer** paragraph.
+
+- a standard
+- list
+
+A shared **disclaimer** paragraph.
+"""
+
+class TestBlockCache(TempDirTestCase):
+    def test_key_depends_on_type_and_text(self):
+        paragraph = BlockCache.key(BlockType.PARAGRAPH, ["- a"])
+        self.assertEqual(paragraph, BlockCache.key(BlockType.PARAGRAPH, ["- a"]))
+        self.assertNotEqual(paragraph, BlockCache.key(BlockType.UNORDERED_LIST, ["- a"]))
+        self.assertNotEqual(paragraph, BlockCache.key(BlockType.PARAGRAPH, ["- b"]))
+        self.assertNotEqual(paragraph, BlockCache.key(BlockType.PARAGRAPH, ["- a"], "/site/"))
+
+    def test_hits_and_misses(self):
+        cache = BlockCache()
+        self.assertIsNone(cache.get("a"))
+        cache.put("a", "<p><a href=\"/x\">x</a></p>", ["/x"])
+        self.assertEqual(cache.get("a"), ("<p><a href=\"/x\">x</a></p>", ("/x",), ""))
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+        self.assertEqual(cache.stats()["hit_rate"], 0.5)
+
+    def test_lru_eviction(self):
+        cache = BlockCache(maxsize=2)
+        cache.put("a", "A")
+        cache.put("b", "B")
+        cache.get("a")
+        cache.put("c", "C")
+        self.assertEqual(list(cache.entries), ["a", "c"])
+        self.assertIsNone(cache.get("b"))
+
+    def test_persistence(self):
+        path = os.path.join(self.tmp.name, ".build", "block_cache.json")
+        cache = BlockCache.load(3, path)
+        for key in ("a", "b", "c", "d"):
+            cache.put(key, key.upper())
+        cache.save()
+
+        loaded = BlockCache.load(2, path)
+        self.assertEqual(list(loaded.entries.items()), [("c", ("C", (), "")), ("d", ("D", (), ""))])
+
+    def test_take_new_entries(self):
+        cache = BlockCache(track_new=True)
+        cache.put("a", "A")
+        self.assertEqual(cache.take_new_entries(), {"a": ("A", (), "")})
+        self.assertEqual(cache.take_new_entries(), {})
+
+    def test_bounded_without_tracking(self):
+        cache = BlockCache(10)
+        for i in range(10_000):
+            cache.put(str(i), "html")
+        self.assertEqual(len(cache.entries), 10)
+        self.assertEqual(cache.new_entries, {})
+
+class TestCachedRendering(unittest.TestCase):
+    def test_same_html_as_uncached(self):
+        cache = BlockCache()
+        self.assertEqual(
+            markdown_to_html_node(MARKDOWN, cache).to_html(),
+            markdown_to_html_node(MARKDOWN).to_html(),
+        )
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 3)
+
+        self.assertEqual(
+            markdown_to_html_node(MARKDOWN, cache).to_html(),
+            markdown_to_html_node(MARKDOWN).to_html(),
+        )
+        self.assertEqual(cache.hits, 5)
+
+if __name__ == "__main__":
+    unittest.main()
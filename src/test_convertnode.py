@@ -3,7 +3,9 @@ import unittest
 from htmlnode import HTMLNode, LeafNode, ParentNode
 from textnode import TextNode, TextType
 
-from convertnode import text_node_to_html_node, text_to_text_nodes, markdown_to_html_node
+from blockcache import BlockCache
+from pageinfo import PageInfo
+from convertnode import text_node_to_html_node, text_to_text_nodes, markdown_to_html_node, iter_markdown_html
 
 class TestConvertNode(unittest.TestCase):
     def test_invalid_type_error(self):
@@ -185,4 +187,73 @@ the **same** even with inline stuff
         self.assertEqual(
             html,
             "<div><p>This is <b>bolded</b> paragraph text in a p tag here</p><p>This is another paragraph with <i>italic</i> text and <code>code</code> here</p><pre><code>This is text that _should_ remain\nthe **same** even with inline stuff\n</code></pre><h3>This is an h3 heading</h3><blockquote>This is a quote block\nwith two lines</blockquote><ol><li>This is olist item 1</li><li>item 2</li><li>item 3</li></ol><ul><li>This is ulist item 1</li><li>item 2</li><li>item 3</li></ul></div>",
-        )
\ No newline at end of file
+        )
+
+    def test_codeblock_with_blank_line(self):
+        md = """
+```
+first line
+
+after a blank line
+```
+"""
+        node = markdown_to_html_node(md)
+        self.assertEqual(
+            node.to_html(),
+            "<div><pre><code>first line\n\nafter a blank line\n</code></pre></div>",
+        )
+
+class TestIterMarkdownHTML(unittest.TestCase):
+    def test_matches_markdown_to_html_node(self):
+        md = """# Title
+
+Some **bold** text
+on two lines
+
+```
+code
+
+block
+```
+
+> a quote
+
+1. one
+2. two
+"""
+        self.assertEqual(
+            "".join(iter_markdown_html(md.split("\n"))),
+            markdown_to_html_node(md).to_html(),
+        )
+
+    def test_basepath_skips_code(self):
+        md = 'See [the docs](/docs/) and ![logo](/logo.png)\n\n```\n<a href="/docs/">docs</a>\n```'
+        self.assertEqual(
+            "".join(iter_markdown_html(md.split("\n"), basepath="/site/")),
+            '<div><p>See <a href="/site/docs/">the docs</a> and <img src="/site/logo.png" alt="logo"></img></p>'
+            '<pre><code><a href="/docs/">docs</a>\n</code></pre></div>',
+        )
+
+    def test_links_collected(self):
+        md = 'See [the docs](/docs/) and ![logo](/logo.png)\n\n- [a](a.html)\n\n```\n[not](/a/link)\n```\n\nSee [the docs](/docs/) and ![logo](/logo.png)'
+        expected = ["/docs/", "/logo.png", "a.html", "/docs/", "/logo.png"]
+        page_info = PageInfo(links=True)
+        "".join(iter_markdown_html(md.split("\n"), page_info=page_info))
+        self.assertEqual(page_info.links, expected)
+        self.assertIsNone(page_info.sections)
+        block_cache = BlockCache()
+        for _ in range(2):
+            page_info = PageInfo(links=True)
+            "".join(iter_markdown_html(md.split("\n"), block_cache, page_info=page_info))
+            self.assertEqual(page_info.links, expected)
+        self.assertEqual(block_cache.stats()["hits"], 5)
+
+    def test_search_sections_collected(self):
+        md = "Intro **text**\n\n# Title\n\nSome _words_ and `code`, [a link](/x)\n\n## Title\n\n```\nskipped\n```\n\n- item\n- two"
+        expected_html = '<div><p>Intro <b>text</b></p><h1 id="title">Title</h1><p>Some <i>words</i> and <code>code</code>, <a href="/x">a link</a></p><h2 id="title-1">Title</h2><pre><code>skipped\n</code></pre><ul><li>item</li><li>two</li></ul></div>'
+        expected_sections = [["", "", ["Intro text"]], ["title", "Title", ["Some words and , a link"]], ["title-1", "Title", ["item two"]]]
+        for block_cache in (None, BlockCache(), BlockCache()):
+            page_info = PageInfo(search=True)
+            self.assertEqual("".join(iter_markdown_html(md.split("\n"), block_cache, page_info=page_info)), expected_html)
+            self.assertEqual(page_info.sections, expected_sections)
+        self.assertEqual("".join(iter_markdown_html(md.split("\n"))).count(" id="), 0)
@@ -0,0 +1,117 @@
+import os
+import threading
+import unittest
+
+from devserver import ReloadBroker, SiteWatcher, diff_snapshots, snapshot
+from main import build, parse_args
+from fixtures import TempDirTestCase
+
+class TestSnapshot(TempDirTestCase):
+    def test_snapshot_and_diff(self):
+        content = os.path.join(self.tmp.name, "content")
+        template = self.write("template.html", "before")
+        for relative_path in ("index.md", os.path.join("blog", "post.md")):
+            self.write(relative_path, "before", content)
+        before = snapshot([content, template])
+        self.assertEqual(len(before), 3)
+
+        self.write("index.md", "after, and longer", content)
+        os.remove(os.path.join(content, "blog", "post.md"))
+        self.write("new.md", "new", content)
+        changed, removed = diff_snapshots(before, snapshot([content, template]))
+        self.assertEqual(changed, {os.path.join(content, "index.md"), os.path.join(content, "new.md")})
+        self.assertEqual(removed, {os.path.join(content, "blog", "post.md")})
+
+    def test_no_changes(self):
+        self.write("index.md", "text")
+        files = snapshot([self.tmp.name])
+        self.assertEqual(diff_snapshots(files, snapshot([self.tmp.name])), (set(), set()))
+
+class TestReloadBroker(unittest.TestCase):
+    def test_wait_times_out_without_notify(self):
+        broker = ReloadBroker()
+        self.assertEqual(broker.wait(broker.version, 0.01), 0)
+
+    def test_notify_wakes_waiters(self):
+        broker = ReloadBroker()
+        versions = []
+        waiter = threading.Thread(target=lambda: versions.append(broker.wait(0, 5)))
+        waiter.start()
+        broker.notify()
+        waiter.join()
+        self.assertEqual(versions, [1])
+
+class TestSiteWatcher(TempDirTestCase):
+    # Builds a small site in the temporary directory, the working directory
+    # for the test since the build paths are relative to it, and watches it.
+    def setUp(self):
+        super().setUp()
+        self.mtime_ns = 1_000_000_000
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.tmp.name)
+        self.edit("template.html", "<title>{{ Title }}</title><main>{{ Content }}</main>")
+        self.edit(os.path.join("content", "index.md"), "# Home\n\nWelcome")
+        self.edit(os.path.join("content", "blog", "tom", "index.md"), "---\ndate: 2024-01-02\n---\n# Tom\n\nOld Tom Bombadil")
+        self.edit(os.path.join("static", "index.css"), "body { color: red; }")
+        self.args = parse_args(["--no-image-sizes", "--blog"])
+        build(self.args)
+        self.watcher = SiteWatcher(self.args)
+
+    def edit(self, relative_path, text):
+        path = self.write(relative_path, text)
+        # Every edit gets a new mtime, however coarse the file system's, so
+        # the watcher and the template cache both see it.
+        self.mtime_ns += 1_000_000_000
+        os.utime(path, ns=(self.mtime_ns, self.mtime_ns))
+        return path
+
+    def output(self, *parts):
+        return self.read(os.path.join("docs", *parts))
+
+    def test_no_changes(self):
+        self.assertFalse(self.watcher.poll())
+
+    def test_edit_add_and_delete_pages(self):
+        self.edit(os.path.join("content", "index.md"), "# Home\n\nWelcome back")
+        self.assertTrue(self.watcher.poll())
+        self.assertIn("<p>Welcome back</p>", self.output("index.html"))
+        self.assertFalse(self.watcher.poll())
+
+        self.edit(os.path.join("content", "blog", "glorfindel", "index.md"), "---\ndate: 2024-02-03\n---\n# Glorfindel\n\nBalrog slayer")
+        self.assertTrue(self.watcher.poll())
+        self.assertIn("<h1>Glorfindel</h1>", self.output("blog", "glorfindel", "index.html"))
+        self.assertIn("/blog/glorfindel/", self.output("blog", "index.html"))
+
+        os.remove(os.path.join("content", "blog", "tom", "index.md"))
+        self.assertTrue(self.watcher.poll())
+        self.assertFalse(os.path.exists(os.path.join("docs", "blog", "tom")))
+        self.assertNotIn("/blog/tom/", self.output("blog", "index.html"))
+        self.assertEqual(sorted(self.watcher.manifest.pages), [os.path.join(".", "content", "blog", "glorfindel", "index.md"), os.path.join(".", "content", "index.md")])
+
+    def test_static_files(self):
+        self.edit(os.path.join("static", "images", "tom.png"), "png bytes")
+        self.edit(os.path.join("static", "index.css"), "body { color: blue; }")
+        self.assertTrue(self.watcher.poll())
+        self.assertEqual(self.output("images", "tom.png"), "png bytes")
+        self.assertEqual(self.output("index.css"), "body { color: blue; }")
+
+        os.remove(os.path.join("static", "images", "tom.png"))
+        self.assertTrue(self.watcher.poll())
+        self.assertFalse(os.path.exists(os.path.join("docs", "images")))
+        self.assertNotIn(os.path.join("images", "tom.png"), self.watcher.manifest.assets)
+
+    def test_template_changes(self):
+        self.edit("template.html", "<title>{{ Title }}</title><article>{{ Content }}</article>")
+        self.assertTrue(self.watcher.poll())
+        self.assertIn("<article>", self.output("index.html"))
+        self.assertIn("<article>", self.output("blog", "tom", "index.html"))
+
+        # A new layout for the blog only changes the pages below it.
+        self.edit(os.path.join("layouts", "blog.html"), "<section>{{ Content }}</section>")
+        self.assertTrue(self.watcher.poll())
+        self.assertIn("<section>", self.output("blog", "tom", "index.html"))
+        self.assertIn("<section>", self.output("blog", "index.html"))
+        self.assertIn("<article>", self.output("index.html"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import io
+import unittest
+
+from frontmatter import page_title, parse_front_matter, read_front_matter, split_front_matter
+
+MARKDOWN = """---
+title: "Why Tom Bombadil Was a Mistake"
+date: 2024-05-01
+tags: [tolkien, opinion]
+# a comment
+draft: false
+authors:
+  - Archmage
+  - 'Apprentice'
+---
+# Tom
+
+Body
+"""
+
+class TestFrontMatter(unittest.TestCase):
+    def test_parse(self):
+        fields, body = split_front_matter(MARKDOWN)
+        self.assertEqual(fields, {
+            "title": "Why Tom Bombadil Was a Mistake",
+            "date": "2024-05-01",
+            "tags": ["tolkien", "opinion"],
+            "draft": False,
+            "authors": ["Archmage", "Apprentice"],
+        })
+        self.assertEqual(body, "# Tom\n\nBody\n")
+
+    def test_comma_separated_tags(self):
+        self.assertEqual(parse_front_matter(["tags: a, b c\n"]), {"tags": ["a", "b c"]})
+
+    def test_no_front_matter(self):
+        self.assertEqual(split_front_matter("# Title\n---\n"), ({}, "# Title\n---\n"))
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            parse_front_matter(["not a field"])
+        with self.assertRaises(ValueError):
+            parse_front_matter(["date: yesterday"])
+        with self.assertRaises(ValueError):
+            split_front_matter("---\ntitle: x\n# Title")
+        for tags in ("true", "[a, false]"):
+            with self.assertRaisesRegex(ValueError, "tags must be a list"):
+                parse_front_matter([f"tags: {tags}"])
+        for line in ("title: [a, b]", "summary: true", "description: [a, b]", "layout: false", "draft: yes", "draft:"):
+            with self.assertRaisesRegex(ValueError, "must be"):
+                parse_front_matter([line])
+        for date in ("2024-01-01garbage", "2024-02-30", "2024-1-1", "20240101", "2024-01-01 10:00", "2024-01-01T25:00", "true"):
+            with self.assertRaisesRegex(ValueError, "Invalid front matter date"):
+                parse_front_matter([f"date: {date}"])
+
+    def test_dates(self):
+        for date in ("2024-01-01", "2024-01-01T10:00", "2024-01-01T10:00:30.500Z", "2024-01-01T10:00:30-05:00"):
+            self.assertEqual(parse_front_matter([f"date: {date}"]), {"date": date})
+
+    def test_read_leaves_file_at_body(self):
+        f = io.StringIO(MARKDOWN)
+        fields = read_front_matter(f)
+        body = f.tell()
+        self.assertEqual(page_title(fields, f), "Why Tom Bombadil Was a Mistake")
+        f.seek(body)
+        self.assertEqual(f.readline(), "# Tom\n")
+
+    def test_title_falls_back_to_h1(self):
+        f = io.StringIO("Intro\n\n# Heading\n")
+        self.assertEqual(page_title(read_front_matter(f), f), "Heading")
+
+if __name__ == "__main__":
+    unittest.main()
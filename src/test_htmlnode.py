@@ -1,6 +1,8 @@
+import io
 import unittest
 
-from htmlnode import HTMLNode, LeafNode, ParentNode
+from assetsync import AssetUrls
+from htmlnode import HTMLNode, LeafNode, ParentNode, RawNode
 
 TEST_PROPS = [
     ("href", "https://www.google.com"),
@@ -57,6 +59,24 @@ class TestHTMLNode(unittest.TestCase):
         node = HTMLNode(props=test_props)
         self.assertEqual(node.props_to_html(), test_output)
 
+    def test_repr(self):
+        node = HTMLNode("a", "link", None, {"href": "/"})
+        self.assertEqual(repr(node), "HTMLNode(a, link, None, {'href': '/'})")
+
+    def test_no_instance_dict(self):
+        for node in (HTMLNode(), LeafNode("b", "bold"), ParentNode("p", [])):
+            self.assertFalse(hasattr(node, "__dict__"))
+
+    def test_tags_are_interned(self):
+        first = LeafNode("".join(["s", "pan"]), "a")
+        second = LeafNode("".join(["sp", "an"]), "b")
+        self.assertIs(first.tag, second.tag)
+
+    def test_empty_props_not_kept(self):
+        node = LeafNode("b", "bold", {})
+        self.assertIsNone(node.props)
+        self.assertEqual(node.to_html(), "<b>bold</b>")
+
 class TestLeafNode(unittest.TestCase):
     def test_no_children(self):
         node = LeafNode(TEST_TAGS[0], TEST_VALUES[0])
@@ -108,5 +128,123 @@ class TestParentNode(unittest.TestCase):
             "<div><span><b>grandchild</b></span></div>",
         )
 
+class TestStreamingHTML(unittest.TestCase):
+    def build_tree(self):
+        return ParentNode("div", [
+            ParentNode("p", [
+                LeafNode(None, "Some "),
+                LeafNode("b", "bold"),
+                LeafNode("a", "link", {"href": "/blog"}),
+            ], {"class": "intro"}),
+            ParentNode("ul", [
+                ParentNode("li", [LeafNode(None, "one")]),
+                ParentNode("li", [LeafNode(None, "two")]),
+            ]),
+        ])
+
+    def test_iter_html_matches_to_html(self):
+        node = self.build_tree()
+        self.assertEqual(
+            "".join(node.iter_html()),
+            "<div><p class=\"intro\">Some <b>bold</b><a href=\"/blog\">link</a></p><ul><li>one</li><li>two</li></ul></div>",
+        )
+        self.assertEqual(node.to_html(), "".join(node.iter_html()))
+
+    def test_iter_html_yields_chunks(self):
+        chunks = list(self.build_tree().iter_html())
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(chunks[0], "<div>")
+        self.assertEqual(chunks[-1], "</div>")
+
+    def test_leaf_iter_html(self):
+        self.assertEqual(list(LeafNode("b", "bold").iter_html()), ["<b>bold</b>"])
+        self.assertEqual(list(LeafNode(None, "text").iter_html()), ["text"])
+
+    def test_write_to(self):
+        node = self.build_tree()
+        fp = io.StringIO()
+        node.write_to(fp)
+        self.assertEqual(fp.getvalue(), node.to_html())
+
+    def test_deep_tree(self):
+        node = LeafNode(None, "x")
+        for _ in range(5000):
+            node = ParentNode("span", [node])
+        html = node.to_html()
+        self.assertTrue(html.startswith("<span><span>"))
+        self.assertEqual(len(html), 5000 * len("<span></span>") + 1)
+
+    def test_nested_errors(self):
+        node = ParentNode("div", [ParentNode("p", None)])
+        with self.assertRaises(ValueError):
+            node.to_html()
+        node = ParentNode("div", [LeafNode("b", None)])
+        with self.assertRaises(ValueError):
+            list(node.iter_html())
+
+    def test_base_iter_html_error(self):
+        with self.assertRaises(NotImplementedError):
+            list(HTMLNode().iter_html())
+
+    def test_basepath_rebases_url_props(self):
+        node = ParentNode("p", [
+            LeafNode("a", "home", {"href": "/", "title": "/not-a-url"}),
+            LeafNode("img", "", {"src": "/images/a.png", "alt": "a"}),
+            LeafNode("a", "out", {"href": "https://example.com/"}),
+            LeafNode(None, 'href="/raw"'),
+        ])
+        self.assertEqual(
+            node.to_html("/site/"),
+            '<p><a href="/site/" title="/not-a-url">home</a><img src="/site/images/a.png" alt="a"></img>'
+            '<a href="https://example.com/">out</a>href="/raw"</p>',
+        )
+        self.assertEqual("".join(node.iter_html("/site/")), node.to_html("/site/"))
+        self.assertIn('href="/"', node.to_html())
+
+    def test_fingerprinted_asset_urls(self):
+        assets = AssetUrls({"/images/a.png": "/images/a.3f9a1c2b.png"})
+        node = ParentNode("p", [
+            LeafNode("img", "", {"src": "/images/a.png", "alt": "/images/a.png"}),
+            LeafNode("a", "b", {"href": "/images/b.png"}),
+        ])
+        self.assertEqual(
+            node.to_html("/site/", assets),
+            '<p><img src="/site/images/a.3f9a1c2b.png" alt="/images/a.png"></img><a href="/site/images/b.png">b</a></p>',
+        )
+        self.assertIn('src="/images/a.3f9a1c2b.png"', node.to_html("/", assets))
+
+    def test_image_size_attributes(self):
+        assets = AssetUrls({}, {"/images/a.png": (640, 480)})
+        node = ParentNode("p", [
+            LeafNode("img", "", {"src": "/images/a.png", "alt": "a"}),
+            LeafNode("img", "", {"src": "https://example.com/b.png", "alt": "b"}),
+        ])
+        self.assertEqual(
+            node.to_html("/site/", assets),
+            '<p><img src="/site/images/a.png" alt="a" width="640" height="480" loading="lazy" decoding="async"></img>'
+            '<img src="https://example.com/b.png" alt="b" loading="lazy" decoding="async"></img></p>',
+        )
+        self.assertNotIn("width", node.to_html("/site/", AssetUrls({})))
+
+    def test_minify(self):
+        node = ParentNode("div", [
+            ParentNode("p", [
+                LeafNode(None, "Some\n  text "),
+                LeafNode("a", "a  link", {"href": "/blog/", "title": "two words"}),
+                LeafNode("code", "x  =  1"),
+            ]),
+            LeafNode("img", "", {"src": "/a.png", "alt": ""}),
+            ParentNode("pre", [LeafNode("code", "  keep\n    this ")]),
+            RawNode('<p class="cached">  as   is</p>'),
+        ])
+        self.assertEqual(
+            node.to_html("/site/", None, True),
+            '<div><p>Some text <a href=/site/blog/ title="two words">a link</a><code>x  =  1</code></p>'
+            '<img src=/site/a.png alt=""><pre><code>  keep\n    this </code></pre>'
+            '<p class="cached">  as   is</p></div>',
+        )
+        self.assertEqual("".join(node.iter_html("/site/", None, True)), node.to_html("/site/", None, True))
+        self.assertIn("<p>Some\n  text <a href=\"/site/blog/\"", node.to_html("/site/"))
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
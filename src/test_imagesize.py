@@ -0,0 +1,59 @@
+import os
+import struct
+import unittest
+
+from imagesize import image_size, ImageSizeCache
+from fixtures import TempDirTestCase
+
+PNG = b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + struct.pack(">II", 640, 480) + b"\x08\x06\x00\x00\x00" + b"\x00" * 64
+GIF = b"GIF89a" + struct.pack("<HH", 32, 16) + b"\x00" * 64
+# SOI, an APP0 segment to skip, then a baseline start of frame.
+JPEG = (
+    b"\xff\xd8"
+    + b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9
+    + b"\xff\xc0" + struct.pack(">HBHH", 17, 8, 300, 400) + b"\x03" + b"\x00" * 9
+    + b"\xff\xd9"
+)
+WEBP_LOSSY = b"RIFF\x00\x00\x00\x00WEBPVP8 \x00\x00\x00\x00" + b"\x00" * 3 + b"\x9d\x01\x2a" + struct.pack("<HH", 250, 125) + b"\x00" * 32
+WEBP_LOSSLESS = b"RIFF\x00\x00\x00\x00WEBPVP8L\x00\x00\x00\x00\x2f" + ((199) | (99 << 14)).to_bytes(4, "little") + b"\x00" * 32
+WEBP_EXTENDED = b"RIFF\x00\x00\x00\x00WEBPVP8X\x0a\x00\x00\x00" + b"\x00" * 4 + (1999).to_bytes(3, "little") + (999).to_bytes(3, "little") + b"\x00" * 32
+
+class TestImageSize(TempDirTestCase):
+    def test_formats(self):
+        self.assertEqual(image_size(self.write("a.png", PNG)), (640, 480))
+        self.assertEqual(image_size(self.write("a.gif", GIF)), (32, 16))
+        self.assertEqual(image_size(self.write("a.jpg", JPEG)), (400, 300))
+        self.assertEqual(image_size(self.write("a.webp", WEBP_LOSSY)), (250, 125))
+        self.assertEqual(image_size(self.write("b.webp", WEBP_LOSSLESS)), (200, 100))
+        self.assertEqual(image_size(self.write("c.webp", WEBP_EXTENDED)), (2000, 1000))
+
+    def test_unknown_or_truncated(self):
+        self.assertIsNone(image_size(self.write("a.css", b"body { color: red; }")))
+        self.assertIsNone(image_size(self.write("short.png", PNG[:20])))
+        self.assertIsNone(image_size(self.write("short.jpg", JPEG[:24])))
+
+    def test_cache(self):
+        self.write(os.path.join("static", "images", "a.png"), PNG)
+        self.write(os.path.join("static", "images", "b.png"), PNG)
+        self.write(os.path.join("static", "index.css"), b"body {}")
+        source = os.path.join(self.tmp.name, "static")
+        path = os.path.join(self.tmp.name, ".build", "image_sizes.json")
+        relative_paths = [os.path.join("images", "a.png"), os.path.join("images", "b.png"), "index.css"]
+
+        cache = ImageSizeCache.load(path)
+        sizes = cache.measure(source, relative_paths)
+        self.assertEqual(sizes, {"/images/a.png": (640, 480), "/images/b.png": (640, 480)})
+        # Both images have the same content, so they share one entry.
+        self.assertEqual(len(cache.sizes), 1)
+        cache.save()
+
+        loaded = ImageSizeCache.load(path)
+        self.assertEqual(loaded.measure(source, relative_paths), sizes)
+
+        self.write(os.path.join("static", "images", "a.png"), GIF)
+        self.assertEqual(loaded.measure(source, relative_paths[:1]), {"/images/a.png": (32, 16)})
+        self.assertEqual(list(loaded.files), [os.path.join(source, "images", "a.png")])
+        self.assertEqual(len(loaded.sizes), 1)
+
+if __name__ == "__main__":
+    unittest.main()
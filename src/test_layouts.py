@@ -0,0 +1,48 @@
+import os
+import unittest
+
+from layouts import Layouts, page_template
+from pageinfo import PageInfo
+from rendersettings import RenderSettings
+from fixtures import TempDirTestCase
+
+class TestLayouts(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.layouts_dir = os.path.join(self.tmp.name, "layouts")
+        self.default = self.write("template.html", "<main>{{ Content }}</main>")
+        self.blog = self.write(os.path.join("layouts", "blog.html"), '{% include "../partials/nav.html" %}<article>{{ Content }}</article>')
+        self.nav = self.write(os.path.join("partials", "nav.html"), '<a href="/">Home</a>')
+        self.wide = self.write(os.path.join("layouts", "wide.html"), "<div>{{ Content }}</div>")
+        self.layouts = Layouts(self.content, self.layouts_dir, self.default)
+
+    def source(self, *parts):
+        return os.path.join(self.content, *parts, "index.md")
+
+    def test_nearest_directory_layout(self):
+        self.assertEqual(self.layouts.select(self.source("blog", "tom")), (self.blog, [
+            os.path.join(self.layouts_dir, "blog", "tom.html"),
+            self.blog,
+        ]))
+        self.assertEqual(self.layouts.select(self.source("contact")), (self.default, [os.path.join(self.layouts_dir, "contact.html")]))
+        self.assertEqual(self.layouts.select(self.source()), (self.default, []))
+
+    def test_front_matter_layout(self):
+        self.assertEqual(self.layouts.select(self.source("blog", "tom"), {"layout": "wide"}), (self.wide, [self.wide]))
+        with self.assertRaisesRegex(ValueError, "Unknown layout"):
+            self.layouts.select(self.source(), {"layout": "missing"})
+
+    def test_page_template_records_dependencies(self):
+        page_info = PageInfo()
+        template = page_template(self.source("blog", "tom"), {}, RenderSettings(self.default, layouts=self.layouts), page_info)
+        self.assertEqual(template.render({"Content": "c"}), '<a href="/">Home</a><article>c</article>')
+        self.assertEqual(page_info.dependencies, [os.path.join(self.layouts_dir, "blog", "tom.html"), self.blog, self.nav])
+        self.assertEqual(page_info.urls, {"/"})
+
+        page_info = PageInfo()
+        page_template(self.source("blog", "tom"), {}, RenderSettings(self.default), page_info)
+        self.assertEqual(page_info.dependencies, [self.default])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import os
+import unittest
+
+from linkindex import page_url, resolve_link, LinkIndex
+from fixtures import TempDirTestCase
+
+class TestLinkIndex(TempDirTestCase):
+    def test_page_url(self):
+        self.assertEqual(page_url(os.path.join("docs", "index.html"), "docs"), "/")
+        self.assertEqual(page_url(os.path.join("docs", "blog", "tom", "index.html"), "docs"), "/blog/tom/")
+        self.assertEqual(page_url(os.path.join("docs", "about.html"), "docs"), "/about.html")
+
+    def test_resolve_link(self):
+        self.assertEqual(resolve_link("/blog/tom/", "/"), "/blog/tom/")
+        self.assertEqual(resolve_link("../majesty/#top", "/blog/tom/"), "/blog/majesty/")
+        self.assertEqual(resolve_link("images/a%20b.png?v=1", "/blog/tom/"), "/blog/tom/images/a b.png")
+        self.assertEqual(resolve_link("../../../x", "/blog/tom/"), "/x")
+        self.assertIsNone(resolve_link("https://www.boot.dev", "/"))
+        self.assertIsNone(resolve_link("mailto:me@example.com", "/"))
+        self.assertIsNone(resolve_link("#section", "/"))
+
+    def test_check(self):
+        index = LinkIndex()
+        index.add_page("/", "index.md", ["/blog/tom", "/blog/majesty/", "/images/a.png", "https://example.com"])
+        index.add_page("/blog/tom/", "blog/tom.md", ["/", "/missing", "#top", "../majesty/index.html"])
+        index.add_page("/blog/majesty/", "blog/majesty.md", ["/blog/majesty/"])
+        index.add_page("/contact/", "contact.md", [])
+        index.add_asset("/images/a.png")
+        report = index.check()
+        self.assertEqual(report.broken, [("index.md", "/blog/tom", "/blog/tom/"), ("blog/tom.md", "/missing", None)])
+        self.assertEqual(report.orphans, ["blog/tom.md", "contact.md"])
+
+    def test_save(self):
+        index = LinkIndex()
+        index.add_page("/", "index.md", ["/gone"])
+        path = os.path.join(self.tmp.name, ".build", "links.json")
+        index.check().save(path)
+        self.assertIn('"url": "/gone"', self.read(path))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+import os
+import unittest
+
+from listings import atom_date, atom_feed, generate_listings, listing_url, paginate, plan_listings, tag_url
+from metadataindex import MetadataIndex
+from output import ChangeSet, ADDED, CHANGED, REMOVED
+from rendersettings import RenderSettings
+from fixtures import TempDirTestCase
+
+def metadata(title, date = None, tags = (), **fields):
+    return {"title": title, "date": date, "tags": list(tags), "summary": f"About {title}", "word_count": 1, **fields}
+
+def blog_index():
+    return MetadataIndex({
+        "/": metadata("Home"),
+        "/blog/tom/": metadata("Tom", "2024-01-02", ["tolkien"]),
+        "/blog/majesty/": metadata("Majesty", "2024-03-04", ["tolkien", "lotr"]),
+        "/blog/glorfindel/": metadata("Glorfindel", "2024-02-03", ["lotr"]),
+        "/blog/draft/": metadata("Draft", "2024-05-06", draft=True),
+    })
+
+class TestListings(unittest.TestCase):
+    def test_paginate(self):
+        self.assertEqual(listing_url("/blog/", 1), "/blog/")
+        self.assertEqual(listing_url("/blog/", 3), "/blog/page/3/")
+        pages = paginate("Blog", "/blog/", ["a", "b", "c"], 2)
+        self.assertEqual(pages, [
+            ("/blog/", "Blog", ["a", "b"], None, "/blog/page/2/"),
+            ("/blog/page/2/", "Blog, page 2", ["c"], "/blog/", None),
+        ])
+        self.assertEqual(paginate("Blog", "/blog/", [], 2), [("/blog/", "Blog", [], None, None)])
+
+    def test_plan_listings(self):
+        posts, pages = plan_listings(blog_index(), "/blog/", 2)
+        self.assertEqual([url for url, *_ in posts], ["/blog/majesty/", "/blog/glorfindel/", "/blog/tom/"])
+        self.assertEqual([url for url, *_ in pages], ["/blog/", "/blog/page/2/", "/blog/tags/lotr/", "/blog/tags/tolkien/"])
+        self.assertEqual(tag_url("Middle Earth"), "/blog/tags/middle-earth/")
+
+    def test_tags_sharing_a_url_share_a_listing(self):
+        index = blog_index()
+        index.pages["/blog/tom/"]["tags"] = ["Tolkien"]
+        _, pages = plan_listings(index, "/blog/", 2)
+        [(url, title, entries, _, _)] = [page for page in pages if page[0].startswith("/blog/tags/tolkien/")]
+        self.assertEqual((url, title), ("/blog/tags/tolkien/", "Posts tagged Tolkien, tolkien"))
+        self.assertEqual([url for url, *_ in entries], ["/blog/majesty/", "/blog/tom/"])
+
+    def test_atom_feed(self):
+        posts, _ = plan_listings(blog_index())
+        feed = atom_feed("Blog", "/blog/atom.xml", "https://example.com/", posts + [["/blog/undated/", "Undated", None, "", []]])
+        self.assertIn('<link rel="self" href="https://example.com/blog/atom.xml"/>', feed)
+        self.assertIn("<updated>2024-03-04T00:00:00Z</updated>", feed)
+        self.assertIn('<category term="lotr"/>', feed)
+        self.assertEqual(feed.count("<entry>"), 3)
+        self.assertNotIn("Undated", feed)
+
+    def test_atom_date(self):
+        self.assertEqual(atom_date("2024-01-01"), "2024-01-01T00:00:00Z")
+        self.assertEqual(atom_date("2024-01-01T10:00"), "2024-01-01T10:00:00Z")
+        self.assertEqual(atom_date("2024-01-01T10:00:30.500Z"), "2024-01-01T10:00:30Z")
+        self.assertEqual(atom_date("2024-01-01T01:00:00+02:00"), "2023-12-31T23:00:00Z")
+        self.assertEqual(atom_date("2024-01-01T20:00-05:00"), "2024-01-02T01:00:00Z")
+
+class TestGenerateListings(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dest = os.path.join(self.tmp.name, "docs")
+        self.template = self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+
+    def path(self, *parts):
+        return os.path.join(self.dest, *parts)
+
+    def generate(self, index, generated, changes = None, reserved = (), site_url = "https://example.com"):
+        return generate_listings(index, self.dest, RenderSettings(self.template, "/site/"), generated, per_page=2, site_url=site_url, changes=changes, reserved=reserved)
+
+    def test_writes_listings_and_feed(self):
+        generated = self.generate(blog_index(), {})
+        self.assertEqual(sorted(os.path.relpath(path, self.dest) for path in generated), sorted([
+            os.path.join("blog", "atom.xml"),
+            os.path.join("blog", "index.html"),
+            os.path.join("blog", "page", "2", "index.html"),
+            os.path.join("blog", "tags", "lotr", "index.html"),
+            os.path.join("blog", "tags", "tolkien", "index.html"),
+        ]))
+        html = self.read(self.path("blog", "index.html"))
+        self.assertIn("<title>Blog</title>", html)
+        self.assertIn('<a href="/site/blog/majesty/">Majesty</a><time datetime="2024-03-04">2024-03-04</time>', html)
+        self.assertIn('<a href="/site/blog/page/2/" rel="next">Older posts</a>', html)
+        self.assertNotIn("Draft", html)
+        self.assertEqual(generated[self.path("blog", "page", "2", "index.html")]["links"], ["/blog/tom/", "/blog/tags/tolkien/", "/blog/"])
+        self.assertIn("<id>https://example.com/site/blog/majesty/</id>", self.read(self.path("blog", "atom.xml")))
+
+    def test_only_affected_listings_are_written(self):
+        generated = self.generate(blog_index(), {})
+        changes = ChangeSet(self.dest)
+        self.assertEqual(self.generate(blog_index(), generated, changes), generated)
+        self.assertEqual(changes.to_dict(), {ADDED: [], CHANGED: [], REMOVED: []})
+
+        # Retitling the oldest post touches the listings it is on and the
+        # feed, but not the first page or the lotr tag page.
+        index = blog_index()
+        index.pages["/blog/tom/"]["title"] = "Tom Bombadil"
+        generated = self.generate(index, generated, changes)
+        self.assertEqual(changes.to_dict()[CHANGED], sorted([
+            os.path.join("blog", "atom.xml"),
+            os.path.join("blog", "page", "2", "index.html"),
+            os.path.join("blog", "tags", "tolkien", "index.html"),
+        ]))
+
+        # Dropping the last lotr post removes its tag page.
+        changes = ChangeSet(self.dest)
+        del index.pages["/blog/majesty/"]
+        del index.pages["/blog/glorfindel/"]
+        self.generate(index, generated, changes)
+        self.assertIn(os.path.join("blog", "tags", "lotr", "index.html"), changes.to_dict()[REMOVED])
+        self.assertFalse(os.path.exists(self.path("blog", "tags", "lotr")))
+        self.assertFalse(os.path.exists(self.path("blog", "page", "2", "index.html")))
+
+    def test_tags_sharing_a_url_are_written_once(self):
+        index = blog_index()
+        index.pages["/blog/tom/"]["tags"] = ["Tolkien"]
+        generated = self.generate(index, {})
+        html = self.read(self.path("blog", "tags", "tolkien", "index.html"))
+        self.assertIn("Posts tagged Tolkien, tolkien", html)
+        self.assertIn("Tom", html)
+        changes = ChangeSet(self.dest)
+        self.generate(index, generated, changes)
+        self.assertEqual(changes.to_dict(), {ADDED: [], CHANGED: [], REMOVED: []})
+
+    def test_no_feed_without_site_url(self):
+        generated = self.generate(blog_index(), {})
+        changes = ChangeSet(self.dest)
+        generated = self.generate(blog_index(), generated, changes, site_url="")
+        self.assertNotIn(self.path("blog", "atom.xml"), generated)
+        self.assertEqual(changes.to_dict()[REMOVED], [os.path.join("blog", "atom.xml")])
+        self.assertTrue(os.path.exists(self.path("blog", "index.html")))
+
+    def test_no_feed_without_dated_posts(self):
+        generated = self.generate(blog_index(), {})
+        index = blog_index()
+        for url in ("/blog/tom/", "/blog/majesty/", "/blog/glorfindel/"):
+            index.pages[url]["date"] = None
+        changes = ChangeSet(self.dest)
+        generated = self.generate(index, generated, changes)
+        self.assertNotIn(self.path("blog", "atom.xml"), generated)
+        self.assertEqual(changes.to_dict()[REMOVED], [os.path.join("blog", "atom.xml")])
+
+    def test_pages_take_precedence(self):
+        self.write(self.path("blog", "index.html"), "hand written")
+        generated = self.generate(blog_index(), {}, reserved=[self.path("blog", "index.html")])
+        self.assertNotIn(self.path("blog", "index.html"), generated)
+        self.assertEqual(self.read(self.path("blog", "index.html")), "hand written")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import os
+import unittest
+
+from layouts import Layouts
+from main import find_pages, generate_pages, generate_pages_incremental
+from manifest import BuildManifest
+from pageinfo import PageInfo
+from rendersettings import RenderSettings
+from output import ChangeSet, ADDED, CHANGED, REMOVED
+from fixtures import TempDirTestCase
+
+TEMPLATE = "<title>{{ Title }}</title><article>{{ Content }}</article>"
+
+class TestGeneratePages(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.template = self.write("template.html", TEMPLATE)
+        for i in range(6):
+            self.write(os.path.join("blog", f"post{i}", "index.md"), f"# Post {i}\n\nSome **bold** text [home](/)", self.content)
+        self.write("index.md", "# Home\n\n- item one\n- item two", self.content)
+
+    def read_outputs(self, pages):
+        outputs = {}
+        for _, dest_path in pages:
+            outputs[os.path.relpath(dest_path, self.tmp.name)] = self.read(dest_path)
+        return outputs
+
+    def build(self, dest_name, jobs):
+        pages = find_pages(self.content, os.path.join(self.tmp.name, dest_name))
+        results = list(generate_pages(pages, RenderSettings(self.template, "/site/"), jobs))
+        return pages, results
+
+    def test_find_pages(self):
+        pages = find_pages(self.content, "public")
+        self.assertEqual(len(pages), 7)
+        self.assertIn((os.path.join(self.content, "index.md"), os.path.join("public", "index.html")), pages)
+
+    def test_parallel_matches_serial(self):
+        serial_pages, serial_results = self.build("serial", 1)
+        parallel_pages, parallel_results = self.build("parallel", 3)
+        self.assertTrue(all(error is None for _, error, _, _ in serial_results + parallel_results))
+        self.assertTrue(all(status == ADDED for _, _, status, _ in serial_results + parallel_results))
+
+        serial = self.read_outputs(serial_pages)
+        parallel = self.read_outputs(parallel_pages)
+        self.assertEqual(
+            {os.path.relpath(path, "serial"): html for path, html in serial.items()},
+            {os.path.relpath(path, "parallel"): html for path, html in parallel.items()},
+        )
+
+    def test_links_collected(self):
+        for jobs in (1, 3):
+            pages = find_pages(self.content, os.path.join(self.tmp.name, f"links{jobs}"))
+            links = {source_path: page_info.links for source_path, _, _, page_info in generate_pages(pages, RenderSettings(self.template, collect=PageInfo(links=True)), jobs)}
+            self.assertEqual(links[os.path.join(self.content, "blog", "post0", "index.md")], ["/"])
+            self.assertEqual(links[os.path.join(self.content, "index.md")], [])
+
+    def test_front_matter(self):
+        self.write("about.md", "---\ntitle: About us\ntags: [team]\n---\n# About\n\nWe write.", self.content)
+        for jobs, io_threads in ((1, 0), (3, 0), (1, 2)):
+            pages = [page for page in find_pages(self.content, os.path.join(self.tmp.name, f"fm{jobs}{io_threads}")) if page[0].endswith("about.md")]
+            [(_, error, _, page_info)] = generate_pages(pages, RenderSettings(self.template, collect=PageInfo()), jobs, io_threads=io_threads)
+            self.assertIsNone(error)
+            self.assertEqual(self.read_outputs(pages).popitem()[1], "<title>About us</title><article><div><h1>About</h1><p>We write.</p></div></article>")
+            self.assertEqual(page_info.metadata()["tags"], ["team"])
+            self.assertEqual(page_info.metadata()["summary"], "We write.")
+
+    def test_invalid_front_matter_fails_the_page(self):
+        for field in ("tags: true", "summary: true", "description: [a, b]", "draft: no", "date: 2024-01-01garbage"):
+            self.write("about.md", f"---\n{field}\n---\n# About", self.content)
+            pages = [page for page in find_pages(self.content, os.path.join(self.tmp.name, "invalid")) if page[0].endswith("about.md")]
+            [(_, error, _, page_info)] = generate_pages(pages, RenderSettings(self.template, collect=PageInfo()))
+            self.assertIsInstance(error, ValueError, field)
+            self.assertIsNone(page_info)
+
+    def test_layout_changes_rebuild_dependent_pages(self):
+        partial = self.write(os.path.join("partials", "nav.html"), "<nav>Blog</nav>")
+        layout = self.write(os.path.join("layouts", "blog.html"), '{% include "../partials/nav.html" %}{{ Content }}')
+        dest = os.path.join(self.tmp.name, "layout_out")
+        manifest = BuildManifest(os.path.join(self.tmp.name, "manifest.json"))
+        settings = RenderSettings(self.template, layouts=Layouts(self.content, os.path.join(self.tmp.name, "layouts"), self.template))
+
+        def build(mtime_ns):
+            # Edited files get a later mtime so cached templates are dropped.
+            for path in (self.template, partial, layout):
+                os.utime(path, ns=(mtime_ns, mtime_ns))
+            changes = ChangeSet(dest)
+            self.assertEqual(generate_pages_incremental(self.content, dest, manifest, settings, changes=changes), [])
+            return changes.to_dict()
+
+        self.assertEqual(len(build(1_000_000_000)[ADDED]), 7)
+        self.assertTrue(self.read(os.path.join(dest, "blog", "post0", "index.html")).startswith("<nav>Blog</nav><div><h1>Post 0</h1>"))
+        self.write(partial, "<nav>Posts</nav>")
+        self.assertEqual(build(2_000_000_000)[CHANGED], sorted(os.path.join("blog", f"post{i}", "index.html") for i in range(6)))
+        self.write(self.template, "<main>{{ Content }}</main>")
+        self.assertEqual(build(3_000_000_000)[CHANGED], ["index.html"])
+        self.assertEqual(build(3_000_000_000), {ADDED: [], CHANGED: [], REMOVED: []})
+
+    def test_errors_reported_per_page(self):
+        self.write("broken.md", "No title here", self.content)
+        for jobs in (1, 3):
+            pages, results = self.build(f"out{jobs}", jobs)
+            errors = {source_path: error for source_path, error, _, _ in results if error is not None}
+            self.assertEqual(list(errors), [os.path.join(self.content, "broken.md")])
+            self.assertIsInstance(errors[os.path.join(self.content, "broken.md")], ValueError)
+            self.assertEqual(len(results), len(pages))
+
+if __name__ == "__main__":
+    unittest.main()
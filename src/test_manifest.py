@@ -0,0 +1,130 @@
+import os
+import unittest
+
+from assetsync import AssetUrls
+from manifest import BuildManifest, DependencyState, hash_file, load_json, save_json
+from fixtures import TempDirTestCase
+
+class TestHashFile(TempDirTestCase):
+    def test_same_content_same_hash(self):
+        first = self.write("first.md", "# Title")
+        second = self.write("second.md", "# Title")
+        self.assertEqual(hash_file(first), hash_file(second))
+
+    def test_different_content_different_hash(self):
+        path = self.write("page.md", "# Title")
+        before = hash_file(path)
+        self.write(path, "# Other title")
+        self.assertNotEqual(before, hash_file(path))
+
+class TestJsonFiles(TempDirTestCase):
+    def test_round_trip(self):
+        path = os.path.join(self.tmp.name, ".build", "cache.json")
+        self.assertIsNone(load_json(path, "Cache", "starting empty"))
+        save_json(path, {"version": 2, "entries": [1]})
+        self.assertEqual(os.listdir(os.path.dirname(path)), ["cache.json"])
+        self.assertEqual(load_json(path, "Cache", "starting empty", 2), {"version": 2, "entries": [1]})
+        self.assertIsNone(load_json(path, "Cache", "starting empty", 3))
+
+    def test_corrupt(self):
+        path = self.write("cache.json", "{not json")
+        self.assertIsNone(load_json(path, "Cache", "starting empty"))
+
+class TestDependencyState(TempDirTestCase):
+    def test_changed(self):
+        layout = self.write("blog.html", "{{ Content }}")
+        missing = os.path.join(self.tmp.name, "blog", "post.html")
+        assets = AssetUrls({"/index.css": "/index.abc.css"}, {"/tom.png": (10, 20)})
+        recorded = DependencyState(assets).record([missing, layout], {"/tom.png", "/index.css", "/"})
+        self.assertEqual(recorded["files"], {missing: None, layout: hash_file(layout)})
+        self.assertEqual(recorded["assets"]["/tom.png"], [None, [10, 20]])
+        self.assertFalse(DependencyState(assets).changed(recorded))
+        self.assertTrue(DependencyState(assets).changed(None))
+
+        # Images and fingerprints of assets the page does not use do not
+        # matter, those of the assets it uses do.
+        self.assertFalse(DependencyState(AssetUrls({"/index.css": "/index.abc.css"}, {"/tom.png": (10, 20), "/other.png": (1, 1)})).changed(recorded))
+        self.assertTrue(DependencyState(AssetUrls({"/index.css": "/index.def.css"}, {"/tom.png": (10, 20)})).changed(recorded))
+        self.assertTrue(DependencyState(AssetUrls({}, {"/tom.png": (10, 20), "/": (1, 1)})).changed(recorded))
+
+        # A layout appearing where none was found before changes the page.
+        self.write(missing, "{{ Content }}")
+        self.assertTrue(DependencyState(assets).changed(recorded))
+
+class TestBuildManifest(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.tmp.name, ".build", "manifest.json")
+        self.output = self.write("index.html", "<html></html>")
+
+    def test_load_missing(self):
+        manifest = BuildManifest.load(self.path)
+        self.assertEqual(manifest.pages, {})
+        self.assertEqual(manifest.inputs, {})
+
+    def test_round_trip(self):
+        manifest = BuildManifest.load(self.path)
+        manifest.update_inputs({"template": "abc", "basepath": "/"})
+        manifest.record_page("index.md", self.output, "123")
+        manifest.save()
+
+        loaded = BuildManifest.load(self.path)
+        self.assertEqual(loaded.inputs, {"template": "abc", "basepath": "/"})
+        self.assertFalse(loaded.page_is_stale("index.md", self.output, "123"))
+
+    def test_load_corrupt(self):
+        self.write(self.path, "{not json")
+        manifest = BuildManifest.load(self.path)
+        self.assertEqual(manifest.pages, {})
+
+    def test_stale_when_unrecorded(self):
+        manifest = BuildManifest(self.path)
+        self.assertTrue(manifest.page_is_stale("index.md", self.output, "123"))
+
+    def test_stale_when_hash_changes(self):
+        manifest = BuildManifest(self.path)
+        manifest.record_page("index.md", self.output, "123")
+        self.assertTrue(manifest.page_is_stale("index.md", self.output, "456"))
+
+    def test_stale_when_output_missing(self):
+        manifest = BuildManifest(self.path)
+        manifest.record_page("index.md", self.output, "123")
+        os.remove(self.output)
+        self.assertTrue(manifest.page_is_stale("index.md", self.output, "123"))
+
+    def test_inputs_change_invalidates_pages(self):
+        manifest = BuildManifest(self.path)
+        self.assertTrue(manifest.update_inputs({"template": "abc", "basepath": "/"}))
+        manifest.record_page("index.md", self.output, "123")
+        self.assertFalse(manifest.update_inputs({"template": "abc", "basepath": "/"}))
+        self.assertTrue(manifest.update_inputs({"template": "abc", "basepath": "/site/"}))
+        self.assertTrue(manifest.page_is_stale("index.md", self.output, "123"))
+
+    def test_inputs_change_keeps_outputs_of_missing_pages(self):
+        manifest = BuildManifest(self.path)
+        manifest.update_inputs({"basepath": "/"})
+        manifest.record_page("index.md", self.output, "123")
+        manifest.record_page("gone.md", "gone.html", "456", {"links": []})
+        manifest.update_inputs({"basepath": "/", "minify": True})
+        self.assertEqual(manifest.remove_missing_pages(["index.md"]), ["gone.html"])
+        self.assertEqual(manifest.pages, {"index.md": {"output": self.output}})
+
+    def test_inputs_change_forgets_generated_hashes(self):
+        manifest = BuildManifest(self.path)
+        manifest.generated = {"docs/blog/index.html": {"hash": "abc", "links": []}}
+        manifest.save()
+        manifest = BuildManifest.load(self.path)
+        self.assertEqual(manifest.generated["docs/blog/index.html"]["hash"], "abc")
+        manifest.update_inputs({"template": "abc", "basepath": "/"})
+        self.assertEqual(manifest.generated, {"docs/blog/index.html": {}})
+
+    def test_remove_missing_pages(self):
+        manifest = BuildManifest(self.path)
+        manifest.record_page("index.md", self.output, "123")
+        manifest.record_page("gone.md", "gone.html", "456")
+        removed = manifest.remove_missing_pages(["index.md"])
+        self.assertEqual(removed, ["gone.html"])
+        self.assertEqual(list(manifest.pages), ["index.md"])
+
+if __name__ == "__main__":
+    unittest.main()
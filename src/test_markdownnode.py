@@ -1,6 +1,7 @@
+import io
 import unittest
 
-from markdownnode import markdown_to_blocks, BlockType, block_to_block_type, extract_title
+from markdownnode import markdown_to_blocks, BlockType, block_to_block_type, extract_title, extract_title_from_lines, iter_blocks
 
 class TestConvertMarkdownToBlocks(unittest.TestCase):
     def test_markdown_to_blocks(self):
@@ -70,6 +71,65 @@ This is the same paragraph on a new line
             ],
         )
     
+    def test_markdown_to_blocks_keeps_fenced_code_together(self):
+        md = """
+Some text
+
+```
+first line
+
+after a blank line
+```
+
+More text
+"""
+        blocks = markdown_to_blocks(md)
+        self.assertEqual(
+            blocks,
+            [
+                "Some text",
+                "```\nfirst line\n\nafter a blank line\n```",
+                "More text",
+            ],
+        )
+
+class TestIterBlocks(unittest.TestCase):
+    def test_typed_blocks_from_file(self):
+        md = io.StringIO("# Title\n\nA paragraph\nover two lines\n\n- one\n- two\n\n```\ncode\n\nmore code\n```\n> quote\n")
+        self.assertEqual(
+            list(iter_blocks(md)),
+            [
+                (BlockType.HEADING, ["# Title"]),
+                (BlockType.PARAGRAPH, ["A paragraph", "over two lines"]),
+                (BlockType.UNORDERED_LIST, ["- one", "- two"]),
+                (BlockType.CODE, ["```", "code", "", "more code", "```"]),
+                (BlockType.QUOTE, ["> quote"]),
+            ],
+        )
+
+    def test_whitespace_only_lines_separate_blocks(self):
+        self.assertEqual(
+            list(iter_blocks(["  first  ", "   ", "second   "])),
+            [
+                (BlockType.PARAGRAPH, ["first"]),
+                (BlockType.PARAGRAPH, ["second"]),
+            ],
+        )
+
+    def test_is_lazy(self):
+        def lines():
+            yield "first block"
+            yield ""
+            raise AssertionError("read past the first block")
+        blocks = iter_blocks(lines())
+        self.assertEqual(next(blocks), (BlockType.PARAGRAPH, ["first block"]))
+
+    def test_unclosed_fence(self):
+        self.assertEqual(
+            list(iter_blocks(["```", "code", "", "more"])),
+            [(BlockType.PARAGRAPH, ["```", "code", "", "more"])],
+        )
+
 class TestBlockToBlockType(unittest.TestCase):
     # Heading Block Tests
 
@@ -215,4 +275,9 @@ Foo 2
     def test_exception_on_no_h1_header(self):
         markdown = "## Header1"
         with self.assertRaises(ValueError):
-            extract_title(markdown)
\ No newline at end of file
+            extract_title(markdown)
+
+    def test_from_lines_stops_at_title(self):
+        lines = iter(["intro", "# Header1", "# Header2"])
+        self.assertEqual(extract_title_from_lines(lines), "Header1")
+        self.assertEqual(next(lines), "# Header2")
@@ -0,0 +1,42 @@
+import json
+import os
+import unittest
+
+from manifest import BuildManifest
+from metadataindex import MetadataIndex
+from fixtures import TempDirTestCase
+
+def metadata(title, date = None, tags = ()):
+    return {"title": title, "date": date, "tags": list(tags), "summary": "", "word_count": 1}
+
+class TestMetadataIndex(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.index = MetadataIndex({
+            "/": metadata("Home"),
+            "/blog/": metadata("Blog"),
+            "/blog/tom/": metadata("Tom", "2024-01-02", ["tolkien"]),
+            "/blog/majesty/": metadata("Majesty", "2024-03-04", ["tolkien", "lotr"]),
+            "/blog/draft/": metadata("Draft"),
+            "/contact/": metadata("Contact"),
+        })
+
+    def test_listing(self):
+        self.assertEqual([url for url, _ in self.index.listing("/blog/")], ["/blog/majesty/", "/blog/tom/", "/blog/draft/"])
+        self.assertEqual([url for url, _ in self.index.listing("/blog/", "lotr")], ["/blog/majesty/"])
+
+    def test_tags(self):
+        self.assertEqual(self.index.tags(), ["lotr", "tolkien"])
+
+    def test_from_manifest_and_save(self):
+        manifest = BuildManifest(os.path.join(self.tmp.name, "manifest.json"))
+        manifest.record_page("a.md", "docs/a.html", "1", {"metadata": metadata("A")})
+        manifest.record_page("b.md", "docs/b.html", "2")
+        index = MetadataIndex.from_manifest(manifest, lambda dest_path: "/" + os.path.basename(dest_path))
+        self.assertEqual(list(index.pages), ["/a.html"])
+        path = os.path.join(self.tmp.name, "metadata.json")
+        index.save(path)
+        self.assertEqual(json.loads(self.read(path))["/a.html"]["title"], "A")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+from minify import attribute_to_html, collapse_whitespace, minify_html_text
+
+class TestMinify(unittest.TestCase):
+    def test_collapse_whitespace(self):
+        self.assertEqual(collapse_whitespace(" a \n\t b  "), " a b ")
+
+    def test_attribute_quoting(self):
+        self.assertEqual(attribute_to_html("href", "/blog/", True), " href=/blog/")
+        self.assertEqual(attribute_to_html("alt", "two words", True), " alt=\"two words\"")
+        self.assertEqual(attribute_to_html("alt", "", True), " alt=\"\"")
+        self.assertEqual(attribute_to_html("title", "a=b", True), " title=\"a=b\"")
+        self.assertEqual(attribute_to_html("href", "/blog/"), " href=\"/blog/\"")
+
+    def test_template(self):
+        template = """<!doctype html>
+<html>
+  <head>
+    <meta charset="utf-8" />
+    <meta name="viewport" content="width=device-width, initial-scale=1" />
+    <title>{{ Title }}</title>
+  </head>
+
+  <body>
+    <p>
+      Hello <b>there</b>   <i>you</i>
+    </p>
+  </body>
+</html>"""
+        self.assertEqual(
+            minify_html_text(template),
+            '<!doctype html><html><head><meta charset=utf-8>'
+            '<meta name=viewport content="width=device-width, initial-scale=1">'
+            '<title>{{ Title }}</title></head><body><p>Hello <b>there</b> <i>you</i></p></body></html>',
+        )
+
+    def test_preserved_elements(self):
+        html = '<div>\n  <pre class="x">  a\n    b </pre>\n  <script>if (a  <  b) {}\n</script>\n</div>'
+        self.assertEqual(
+            minify_html_text(html),
+            '<div><pre class=x>  a\n    b </pre><script>if (a  <  b) {}\n</script></div>',
+        )
+
+    def test_edges_keep_a_space(self):
+        self.assertEqual(minify_html_text("  Hello  "), " Hello ")
+        self.assertEqual(minify_html_text("</title>\n  "), "</title>")
+
+if __name__ == "__main__":
+    unittest.main()
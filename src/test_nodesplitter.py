@@ -1,7 +1,8 @@
+import time
 import unittest
 
 from textnode import TextNode, TextType
-from nodesplitter import split_nodes_delimiter, split_nodes_image, split_nodes_link
+from nodesplitter import split_nodes_delimiter, split_nodes_image, split_nodes_link, split_text_inline
 
 class TestNodeSplitter(unittest.TestCase):
     def test_code_delimeter(self):
@@ -150,4 +151,71 @@ class TestLinkSplitter(unittest.TestCase):
     def test_split_links_no_links(self):
         node = TextNode("This is text with no images", TextType.TEXT)
         new_nodes = split_nodes_link([node])
-        self.assertListEqual(new_nodes, [node])
\ No newline at end of file
+        self.assertListEqual(new_nodes, [node])
+
+def split_text_multi_pass(text):
+    nodes = split_nodes_image([TextNode(text, TextType.TEXT)])
+    nodes = split_nodes_link(nodes)
+    for delimiter, text_type in (("**", TextType.BOLD), ("_", TextType.ITALIC), ("`", TextType.CODE)):
+        nodes = split_nodes_delimiter(nodes, delimiter, text_type)
+    return nodes
+
+class TestSplitTextInline(unittest.TestCase):
+    def test_matches_multi_pass(self):
+        texts = [
+            "plain text",
+            "",
+            "This is **text** with an _italic_ word and a `code block` and an ![obi wan image](https://i.imgur.com/fJRm4Vk.jpeg) and a [link](https://boot.dev)",
+            "**bold** at the start and _italic_ at the end",
+            "**bold with _underscores_ inside**",
+            "[link](https://example.com/some_path_here) then _italic_",
+            "![image](https://example.com/a_b.png)![second](b.png)[link](c)",
+            "a**b**c_d_e`f`g",
+            "empty **** delimiters",
+            "***a***",
+            "! not an image [not a link]",
+            "multi\nline _italic_\n> quote",
+            "[![alt](img.png)](https://x)",
+            "[a](b![c](d))",
+            "[x ![y] z](u)",
+            "[](![])",
+        ]
+        for text in texts:
+            self.assertListEqual(split_text_inline(text), split_text_multi_pass(text), text)
+
+    def test_code_keeps_delimiters(self):
+        self.assertListEqual(
+            split_text_inline("call `snake_case_name` now"),
+            [
+                TextNode("call ", TextType.TEXT),
+                TextNode("snake_case_name", TextType.CODE),
+                TextNode(" now", TextType.TEXT),
+            ],
+        )
+
+    def test_missing_closing_delimiter(self):
+        for text in ("**bold", "an _italic", "`code", "**a** _b_ `c"):
+            with self.assertRaises(ValueError):
+                split_text_inline(text)
+
+    def test_unclosed_openers_are_fast(self):
+        # Link and image openers without a closing ]( or ) made the old pattern
+        # backtrack cubically, taking from seconds to minutes on these.
+        texts = {
+            "[x ![y " * 1000: [TextNode("[x ![y " * 1000, TextType.TEXT)],
+            "[x](" * 2000: [TextNode("[x](" * 2000, TextType.TEXT)],
+            "[a ![b](c)" * 1000: [TextNode("[a ", TextType.TEXT), TextNode("b", TextType.IMAGE, "c")] * 1000,
+        }
+        for text, nodes in texts.items():
+            start = time.perf_counter()
+            self.assertListEqual(split_text_inline(text), nodes)
+            self.assertLess(time.perf_counter() - start, 2, text[:20])
+
+    def test_image_before_link(self):
+        self.assertListEqual(
+            split_text_inline("![alt](a.png)[text](b)"),
+            [
+                TextNode("alt", TextType.IMAGE, "a.png"),
+                TextNode("text", TextType.LINK, "b"),
+            ],
+        )
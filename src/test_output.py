@@ -0,0 +1,53 @@
+import os
+import unittest
+
+from output import ChangeSet, write_output, ADDED, CHANGED, UNCHANGED, REMOVED
+from fixtures import TempDirTestCase
+
+class TestWriteOutput(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.dest = os.path.join(self.tmp.name, "docs", "blog", "index.html")
+
+    def test_statuses(self):
+        self.assertEqual(write_output(self.dest, lambda f: f.write("<p>one</p>")), ADDED)
+        self.assertEqual(write_output(self.dest, lambda f: f.writelines(["<p>", "one", "</p>"])), UNCHANGED)
+        self.assertEqual(write_output(self.dest, lambda f: f.write("<p>two</p>")), CHANGED)
+        self.assertEqual(self.read(self.dest), "<p>two</p>")
+        self.assertEqual(os.listdir(os.path.dirname(self.dest)), ["index.html"])
+
+    def test_unchanged_keeps_mtime(self):
+        write_output(self.dest, lambda f: f.write("<p>one</p>"))
+        os.utime(self.dest, ns=(1_000_000_000, 1_000_000_000))
+        write_output(self.dest, lambda f: f.write("<p>one</p>"))
+        self.assertEqual(os.stat(self.dest).st_mtime_ns, 1_000_000_000)
+
+    def test_failed_write_keeps_previous_output(self):
+        write_output(self.dest, lambda f: f.write("<p>one</p>"))
+
+        def fail(f):
+            f.write("<p>half")
+            raise ValueError("render failed")
+
+        with self.assertRaises(ValueError):
+            write_output(self.dest, fail)
+        self.assertEqual(self.read(self.dest), "<p>one</p>")
+        self.assertEqual(os.listdir(os.path.dirname(self.dest)), ["index.html"])
+
+class TestChangeSet(unittest.TestCase):
+    def test_record(self):
+        changes = ChangeSet("docs")
+        changes.record(os.path.join("docs", "index.html"), ADDED)
+        changes.record(os.path.join("docs", "blog", "index.html"), CHANGED)
+        changes.record(os.path.join("docs", "about.html"), UNCHANGED)
+        changes.record(os.path.join("docs", "old.html"), CHANGED)
+        changes.record(os.path.join("docs", "old.html"), REMOVED)
+        self.assertEqual(changes.to_dict(), {
+            ADDED: ["index.html"],
+            CHANGED: [os.path.join("blog", "index.html")],
+            REMOVED: ["old.html"],
+        })
+        self.assertEqual(changes.summary(), "1 added, 1 changed, 1 removed")
+
+if __name__ == "__main__":
+    unittest.main()
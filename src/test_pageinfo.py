@@ -0,0 +1,54 @@
+import unittest
+
+from markdownnode import BlockType
+from pageinfo import slugify, summarize, PageInfo
+
+class TestPageInfo(unittest.TestCase):
+    def test_slugify(self):
+        self.assertEqual(slugify("Why Tom Bombadil Was a **Mistake**?"), "why-tom-bombadil-was-a-mistake")
+        self.assertEqual(slugify("_A_ `code` heading"), "a-code-heading")
+
+    def test_heading_anchors_unique(self):
+        page_info = PageInfo(search=True)
+        self.assertEqual([page_info.heading_anchor([line]) for line in ("# Intro", "## Intro", "## Intro-1", "# !!")], ["intro", "intro-1", "intro-1-1", "section"])
+        self.assertIsNone(PageInfo(links=True).heading_anchor(["# Intro"]))
+
+    def test_fresh(self):
+        page_info = PageInfo(links=True)
+        page_info.add_block(BlockType.PARAGRAPH, None, ["/x"], "text")
+        fresh = page_info.fresh()
+        self.assertEqual(fresh.links, [])
+        self.assertIsNone(fresh.sections)
+
+    def test_summarize(self):
+        self.assertEqual(summarize("short"), "short")
+        self.assertEqual(summarize("one two three", 9), "one two...")
+
+    def test_metadata(self):
+        page_info = PageInfo()
+        page_info.front_matter = {"date": "2024-05-01", "tags": ["tolkien"], "layout": "post"}
+        page_info.title = "Tom"
+        page_info.add_block(BlockType.HEADING, None, [], "Tom")
+        page_info.add_block(BlockType.PARAGRAPH, None, ["/"], "")
+        page_info.add_block(BlockType.PARAGRAPH, None, [], "Old Tom Bombadil")
+        page_info.add_block(BlockType.PARAGRAPH, None, [], "is a merry fellow")
+        self.assertEqual(page_info.to_dict(), {"metadata": {
+            "title": "Tom", "date": "2024-05-01", "tags": ["tolkien"], "layout": "post", "summary": "Old Tom Bombadil", "word_count": 8,
+        }})
+        page_info.front_matter = {"description": "Given"}
+        self.assertEqual(page_info.metadata()["summary"], "Given")
+        self.assertIsNone(page_info.metadata()["date"])
+
+    def test_to_dict(self):
+        page_info = PageInfo(links=True, search=True)
+        page_info.add_block(BlockType.PARAGRAPH, None, [], "Before the heading")
+        page_info.add_block(BlockType.HEADING, "tom", ["/"], "Tom")
+        page_info.add_block(BlockType.PARAGRAPH, None, [], "Tom is merry")
+        self.assertEqual(page_info.to_dict(), {
+            "metadata": {"title": None, "date": None, "tags": [], "summary": "Before the heading", "word_count": 7},
+            "links": ["/"],
+            "sections": [["", "", {"before": 1, "the": 1, "heading": 1}], ["tom", "Tom", {"tom": 2, "is": 1, "merry": 1}]],
+        })
+
+if __name__ == "__main__":
+    unittest.main()
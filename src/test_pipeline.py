@@ -0,0 +1,47 @@
+import os
+import unittest
+
+from main import find_pages, generate_page
+from output import ADDED
+from pipeline import generate_pages_pipelined
+from rendersettings import RenderSettings
+from fixtures import TempDirTestCase
+
+TEMPLATE = '<link href="/index.css"><title>{{ Title }}</title><article>{{ Content }}</article>'
+
+class TestPipeline(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.template = self.write("template.html", TEMPLATE)
+        for i in range(12):
+            self.write(os.path.join("blog", f"post{i}", "index.md"), f"# Post {i}\n\nSome **bold** text [home](/)\n\n- one\n- two", self.content)
+
+    def test_matches_generate_page(self):
+        pages = find_pages(self.content, os.path.join(self.tmp.name, "pipelined"))
+        results = generate_pages_pipelined(pages, RenderSettings(self.template, "/site/"), io_threads=3)
+        self.assertEqual(sorted(results), sorted((source_path, None, ADDED, None) for source_path, _ in pages))
+
+        for source_path, dest_path in pages:
+            expected_path = os.path.join(self.tmp.name, "expected.html")
+            generate_page(source_path, expected_path, RenderSettings(self.template, "/site/"))
+            self.assertEqual(self.read(dest_path), self.read(expected_path))
+
+    def test_errors_reported_per_page(self):
+        self.write("broken.md", "No title here", self.content)
+        self.write("unclosed.md", "# Title\n\nAn **unclosed delimiter", self.content)
+        pages = find_pages(self.content, os.path.join(self.tmp.name, "out"))
+        pages.append((os.path.join(self.content, "missing.md"), os.path.join(self.tmp.name, "out", "missing.html")))
+        results = {source_path: error for source_path, error, _, _ in generate_pages_pipelined(pages, RenderSettings(self.template), io_threads=2)}
+        self.assertEqual(len(results), len(pages))
+        failed = {source_path for source_path, error in results.items() if error is not None}
+        self.assertEqual(failed, {
+            os.path.join(self.content, "broken.md"),
+            os.path.join(self.content, "unclosed.md"),
+            os.path.join(self.content, "missing.md"),
+        })
+        self.assertIsInstance(results[os.path.join(self.content, "missing.md")], FileNotFoundError)
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, "out", "broken.html")))
+
+if __name__ == "__main__":
+    unittest.main()
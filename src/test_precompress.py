@@ -0,0 +1,63 @@
+import gzip
+import os
+import unittest
+
+from output import ADDED, CHANGED, REMOVED
+from precompress import compress_file, precompress_dir, gzip_compress
+from fixtures import TempDirTestCase
+
+PAGE = "<p>" + "Glorfindel faced the Balrog. " * 100 + "</p>"
+
+class TestPrecompress(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.root = os.path.join(self.tmp.name, "docs")
+        self.codecs = {".gz": gzip_compress}
+
+    def relative_changes(self, result):
+        return sorted((os.path.relpath(path, self.root), status) for path, status in result.changes)
+
+    def test_writes_sidecars_above_threshold(self):
+        page = self.write(os.path.join("blog", "index.html"), PAGE, self.root)
+        self.write("small.css", "body {}", self.root)
+        self.write("image.png", PAGE, self.root)
+        result = precompress_dir(self.root, self.codecs, min_size=100)
+        self.assertEqual(self.relative_changes(result), [(os.path.join("blog", "index.html.gz"), ADDED)])
+        with gzip.open(page + ".gz", 'rt') as f:
+            self.assertEqual(f.read(), PAGE)
+        self.assertEqual(os.stat(page + ".gz").st_mtime_ns, os.stat(page).st_mtime_ns)
+
+    def test_only_changed_files_recompressed(self):
+        page = self.write("index.html", PAGE, self.root)
+        precompress_dir(self.root, self.codecs, min_size=100)
+        self.assertEqual(precompress_dir(self.root, self.codecs, min_size=100).changes, [])
+
+        self.write("index.html", PAGE + "<p>more</p>", self.root)
+        os.utime(page, ns=(1_000_000_000, 1_000_000_000))
+        result = precompress_dir(self.root, self.codecs, min_size=100)
+        self.assertEqual(self.relative_changes(result), [("index.html.gz", CHANGED)])
+
+    def test_stale_sidecars_removed(self):
+        page = self.write("index.html", PAGE, self.root)
+        self.write("about.html", PAGE, self.root)
+        precompress_dir(self.root, self.codecs, min_size=100)
+        os.remove(page)
+        result = precompress_dir(self.root, self.codecs, min_size=100)
+        self.assertEqual(self.relative_changes(result), [("index.html.gz", REMOVED)])
+
+        result = precompress_dir(self.root, {}, min_size=100)
+        self.assertEqual(self.relative_changes(result), [("about.html.gz", REMOVED)])
+        self.assertEqual(sorted(os.listdir(self.root)), ["about.html"])
+
+    def test_synced_files_kept(self):
+        archive = self.write("index.css.gz", "not a sidecar", self.root)
+        self.assertEqual(precompress_dir(self.root, {}, keep={archive}).changes, [])
+        self.assertTrue(os.path.exists(archive))
+
+    def test_incompressible_file_skipped(self):
+        path = self.write("noise.svg", os.urandom(2048), self.root)
+        self.assertEqual(compress_file(path, self.codecs), [])
+        self.assertFalse(os.path.exists(path + ".gz"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import json
+import os
+import unittest
+
+from main import generate_page
+from profiler import PROFILE_STAGES, BuildProfiler
+from rendersettings import RenderSettings
+from fixtures import TempDirTestCase
+
+MARKDOWN = """# Profiled page
+
+Some **bold** text with a [link](/blog/tom).
+
+```
+code
+```
+"""
+
+class TestBuildProfiler(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.source = self.write("index.md", MARKDOWN)
+        self.template = self.write("template.html", '<link href="/index.css"><title>{{ Title }}</title>{{ Content }}')
+
+    def profile(self, dest_names):
+        profiler = BuildProfiler()
+        profiler.begin()
+        try:
+            for dest_name in dest_names:
+                profiler.generate_page(self.source, os.path.join(self.tmp.name, dest_name), RenderSettings(self.template, "/site/"))
+        finally:
+            profiler.finish()
+        return profiler
+
+    def test_output_matches_generate_page(self):
+        self.profile(["profiled.html"])
+        generate_page(self.source, os.path.join(self.tmp.name, "plain.html"), RenderSettings(self.template, "/site/"))
+        self.assertEqual(
+            self.read(os.path.join(self.tmp.name, "profiled.html")),
+            self.read(os.path.join(self.tmp.name, "plain.html")),
+        )
+
+    def test_report(self):
+        profiler = self.profile(["a.html", "b.html", "c.html"])
+        report = profiler.report(top=2)
+        self.assertEqual(report["pages"], 3)
+        self.assertEqual(len(report["slowest"]), 2)
+        self.assertEqual(list(report["stages"]), PROFILE_STAGES)
+        self.assertEqual(report["bytes_written"], 3 * os.path.getsize(os.path.join(self.tmp.name, "a.html")))
+        self.assertGreaterEqual(report["slowest"][0]["seconds"], report["slowest"][1]["seconds"])
+        self.assertGreater(report["slowest"][0]["allocated_bytes"], 0)
+
+    def test_write_report(self):
+        profiler = self.profile(["a.html"])
+        path = os.path.join(self.tmp.name, "out", "profile.json")
+        profiler.write_report(path)
+        report = json.loads(self.read(path))
+        self.assertEqual(report["page_profiles"][0]["source"], self.source)
+
+if __name__ == "__main__":
+    unittest.main()
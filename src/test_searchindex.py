@@ -0,0 +1,58 @@
+import json
+import os
+import unittest
+
+from output import ChangeSet, ADDED, CHANGED, REMOVED
+from searchindex import build_search_index, remove_search_index, shard_name, term_counts, tokenize, write_search_index
+from fixtures import TempDirTestCase
+
+PAGES = [
+    ("/blog/tom/", [["", "", {"old": 1}], ["tom", "Tom", {"tom": 2, "bombadil": 1}]]),
+    ("/", [["tolkien-fan-club", "Tolkien Fan Club", {"tolkien": 3, "tom": 1}]]),
+]
+
+class TestSearchIndex(TempDirTestCase):
+    def test_tokenize(self):
+        self.assertEqual(tokenize("Tom's a merry fellow, é-tude 42!"), ["tom", "merry", "fellow", "tude", "42"])
+        self.assertEqual(term_counts("Tom tom TOM bombadil"), {"tom": 3, "bombadil": 1})
+
+    def test_shard_name(self):
+        self.assertEqual(shard_name("tom"), "t")
+        self.assertEqual(shard_name("42"), "4")
+        self.assertEqual(shard_name("élan"), "_")
+
+    def test_build(self):
+        documents, shards = build_search_index(PAGES, "/site/")
+        self.assertEqual(documents, {
+            "/site/#tolkien-fan-club": ["Tolkien Fan Club", "Tolkien Fan Club"],
+            "/site/blog/tom/": ["Tom", ""],
+            "/site/blog/tom/#tom": ["Tom", "Tom"],
+        })
+        self.assertEqual(sorted(shards), ["b", "o", "t"])
+        self.assertEqual(shards["t"]["tom"], [["/site/#tolkien-fan-club", 1], ["/site/blog/tom/#tom", 2]])
+
+    def test_write_only_changed_shards(self):
+        dest = os.path.join(self.tmp.name, "search")
+        changes = ChangeSet(self.tmp.name)
+        written = write_search_index(dest, *build_search_index(PAGES), changes)
+        self.assertEqual(sorted(os.listdir(dest)), ["b.json", "documents.json", "o.json", "t.json"])
+        self.assertEqual(changes.to_dict()[ADDED], ["search/b.json", "search/documents.json", "search/o.json", "search/t.json"])
+        self.assertEqual(json.loads(self.read("t.json", dest))["tolkien"], [["/#tolkien-fan-club", 3]])
+
+        pages = [("/blog/tom/", [["tom", "Tom", {"tom": 2, "bombadil": 1}]]), PAGES[1], ("/contact/", [["", "", {"ring": 1}]])]
+        changes = ChangeSet(self.tmp.name)
+        write_search_index(dest, *build_search_index(pages), changes, written)
+        self.assertEqual(changes.to_dict(), {ADDED: ["search/r.json"], CHANGED: ["search/documents.json"], REMOVED: ["search/o.json"]})
+
+    def test_files_it_did_not_write_are_kept(self):
+        dest = os.path.join(self.tmp.name, "search")
+        page = self.write("index.html", "search page", dest)
+        written = write_search_index(dest, *build_search_index(PAGES), None, [os.path.join(dest, "x.json")])
+        self.assertEqual(written, [os.path.join(dest, name) for name in ["documents.json", "b.json", "o.json", "t.json"]])
+        self.assertTrue(os.path.exists(page))
+
+        remove_search_index(written, self.tmp.name)
+        self.assertEqual(os.listdir(dest), ["index.html"])
+
+if __name__ == "__main__":
+    unittest.main()
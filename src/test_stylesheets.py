@@ -0,0 +1,104 @@
+import os
+import unittest
+
+from stylesheets import linked_stylesheets, minify_css, point_css_urls, prepare_stylesheets, rebase_css_urls, CssCache
+from fixtures import TempDirTestCase
+
+class TestMinifyCss(unittest.TestCase):
+    def test_whitespace_and_comments(self):
+        css = "/* header */\nh1,\nh2 > a {\n  color: red;\n  margin: 0 auto;\n}\n"
+        self.assertEqual(minify_css(css), "h1,h2>a{color:red;margin:0 auto}")
+
+    def test_license_comment_kept(self):
+        self.assertEqual(minify_css("/*! MIT */\nb { x: y }"), "/*! MIT */b{x:y}")
+
+    def test_strings_kept(self):
+        self.assertEqual(minify_css('a::after { content: "  ;  }  " ; }'), 'a::after{content:"  ;  }  "}')
+
+    def test_significant_spaces_kept(self):
+        css = "@media screen and (max-width: 600px) { a :hover { width: calc(100% - 2px); } }"
+        self.assertEqual(minify_css(css), "@media screen and (max-width:600px){a :hover{width:calc(100% - 2px)}}")
+
+class TestRebaseCssUrls(unittest.TestCase):
+    def test_relative_urls_rebased(self):
+        css = "a { background: url(../images/a.png) } b { background: url('/b.png') } c { mask: url(\"c.svg#x\") }"
+        self.assertEqual(
+            rebase_css_urls(css, "css/theme", ""),
+            "a { background: url(css/images/a.png) } b { background: url('/b.png') } c { mask: url(\"css/theme/c.svg#x\") }",
+        )
+
+    def test_same_dir_unchanged(self):
+        self.assertEqual(rebase_css_urls("a { b: url(c.png) }", "", ""), "a { b: url(c.png) }")
+
+class TestPointCssUrls(unittest.TestCase):
+    def test_urls_pointed_at_fingerprints(self):
+        urls = {"/images/a.png": "/images/a.1234.png", "/fonts/f.woff": "/fonts/f.5678.woff"}
+        css = 'a { b: url(/images/a.png) } c { src: url("../fonts/f.woff?v=1#x") } d { e: url(other.png) url(data:x) url(//cdn/images/a.png) }'
+        self.assertEqual(
+            point_css_urls(css, "css", urls),
+            'a { b: url(/images/a.1234.png) } c { src: url("../fonts/f.5678.woff?v=1#x") } d { e: url(other.png) url(data:x) url(//cdn/images/a.png) }',
+        )
+        self.assertEqual(point_css_urls("a { b: url(images/a.png) }", "", urls), "a { b: url(images/a.1234.png) }")
+
+class TestLinkedStylesheets(unittest.TestCase):
+    def test_link_order(self):
+        html = (
+            '<link href="/b.css" rel="stylesheet" /><link rel="icon" href="/favicon.css">'
+            '<link rel="stylesheet" href="/css/a.css"><link href="https://x.org/c.css" rel="stylesheet">'
+        )
+        self.assertEqual(linked_stylesheets(html), ["b.css", "css/a.css"])
+
+class TestPrepareStylesheets(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.source = os.path.join(self.tmp.name, "static")
+        self.stage = os.path.join(self.tmp.name, "stage")
+        self.write("a.css", "a { color: red; }", self.source)
+        self.write("b.css", "b { color: blue; }", self.source)
+        self.write("c.css", "c { color: green; }", self.source)
+
+    def test_minify(self):
+        result = prepare_stylesheets(self.source, self.stage, minify=True)
+        self.assertEqual(sorted(result.prepared), ["a.css", "b.css", "c.css"])
+        self.assertEqual(self.read(result.prepared["a.css"]), "a{color:red}")
+        self.assertEqual(result.aliases, {})
+
+    def test_bundle(self):
+        result = prepare_stylesheets(self.source, self.stage, ["b.css", "a.css", "missing.css"], minify=True)
+        self.assertIsNone(result.prepared["a.css"])
+        self.assertIsNone(result.prepared["b.css"])
+        self.assertEqual(self.read(result.prepared["bundle.css"]), "b{color:blue}\na{color:red}")
+        self.assertEqual(self.read(result.prepared["c.css"]), "c{color:green}")
+        self.assertEqual(result.aliases, {"a.css": "bundle.css", "b.css": "bundle.css"})
+
+    def test_bundle_without_minify(self):
+        result = prepare_stylesheets(self.source, self.stage, ["a.css", "b.css"])
+        self.assertEqual(self.read(result.prepared["bundle.css"]), "a { color: red; }\nb { color: blue; }")
+        self.assertNotIn("c.css", result.prepared)
+
+    def test_unchanged_output_keeps_mtime_and_stale_output_removed(self):
+        first = prepare_stylesheets(self.source, self.stage, minify=True)
+        mtime = os.stat(first.prepared["a.css"]).st_mtime_ns
+        os.remove(os.path.join(self.source, "c.css"))
+        second = prepare_stylesheets(self.source, self.stage, minify=True)
+        self.assertEqual(os.stat(second.prepared["a.css"]).st_mtime_ns, mtime)
+        self.assertFalse(os.path.exists(first.prepared["c.css"]))
+
+    def test_cache(self):
+        path = os.path.join(self.tmp.name, "css_cache.json")
+        cache = CssCache.load(path)
+        prepare_stylesheets(self.source, self.stage, minify=True, cache=cache)
+        cache.save()
+        cache = CssCache.load(path)
+        self.assertEqual(len(cache.outputs), 3)
+        cache.outputs = {digest: "cached" for digest in cache.outputs}
+        result = prepare_stylesheets(self.source, self.stage, minify=True, cache=cache)
+        self.assertEqual(self.read(result.prepared["a.css"]), "cached")
+        os.remove(os.path.join(self.source, "c.css"))
+        cache = CssCache.load(path)
+        prepare_stylesheets(self.source, self.stage, minify=True, cache=cache)
+        cache.save()
+        self.assertEqual(len(CssCache.load(path).outputs), 2)
+
+if __name__ == "__main__":
+    unittest.main()
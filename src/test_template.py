@@ -0,0 +1,132 @@
+import io
+import os
+import unittest
+
+from assetsync import AssetUrls
+from template import compile_template, expand_includes, load_template, rewrite_root_urls, template_dependencies
+from fixtures import TempDirTestCase
+
+TEMPLATE = """<title>{{ Title }}</title>
+<link href="/index.css" rel="stylesheet" />
+<article>{{ Content }}</article>"""
+
+class TestRewriteRootUrls(unittest.TestCase):
+    def test_default_basepath_unchanged(self):
+        html = '<a href="/blog">blog</a><img src="/a.png" alt="">'
+        self.assertEqual(rewrite_root_urls(html, "/"), html)
+
+    def test_basepath(self):
+        html = '<a href="/blog">blog</a><img src="/a.png" alt=""><a href="https://boot.dev">x</a>'
+        self.assertEqual(
+            rewrite_root_urls(html, "/site/"),
+            '<a href="/site/blog">blog</a><img src="/site/a.png" alt=""><a href="https://boot.dev">x</a>',
+        )
+
+    def test_fingerprinted_assets(self):
+        assets = AssetUrls({"/index.css": "/index.3f9a1c2b.css"})
+        html = '<link href="/index.css"><a href="/index.css/">x</a>'
+        self.assertEqual(rewrite_root_urls(html, "/", assets), '<link href="/index.3f9a1c2b.css"><a href="/index.css/">x</a>')
+        self.assertEqual(rewrite_root_urls(html, "/site/", assets), '<link href="/site/index.3f9a1c2b.css"><a href="/site/index.css/">x</a>')
+
+class TestCompileTemplate(unittest.TestCase):
+    def test_segments(self):
+        template = compile_template("a{{ Title }}b{{Content}}c")
+        self.assertEqual(template.literals, ["a", "b", "c"])
+        self.assertEqual(template.slots, [("Title", "{{ Title }}"), ("Content", "{{Content}}")])
+
+    def test_render(self):
+        template = compile_template(TEMPLATE)
+        self.assertEqual(
+            template.render({"Title": "Hello", "Content": "<p>hi</p>"}),
+            TEMPLATE.replace("{{ Title }}", "Hello").replace("{{ Content }}", "<p>hi</p>"),
+        )
+
+    def test_render_repeated_and_custom_placeholders(self):
+        template = compile_template("{{ Title }} - {{ Date }} - {{ Title }}")
+        self.assertEqual(template.render({"Title": "T", "Date": "2024-01-01"}), "T - 2024-01-01 - T")
+
+    def test_unknown_placeholder_left_in_place(self):
+        template = compile_template("<p>{{ Missing }}</p>")
+        self.assertEqual(template.render({}), "<p>{{ Missing }}</p>")
+
+    def test_basepath_applied_to_template_only(self):
+        template = compile_template(TEMPLATE, "/site/")
+        html = template.render({"Title": "T", "Content": '<a href="/x">x</a>'})
+        self.assertIn('<link href="/site/index.css"', html)
+        self.assertIn('<a href="/x">x</a>', html)
+
+    def test_minify(self):
+        template = compile_template(TEMPLATE, "/site/", minify=True)
+        self.assertEqual(
+            template.render({"Title": "T", "Content": "<p>hi</p>"}),
+            '<title>T</title><link href=/site/index.css rel=stylesheet><article><p>hi</p></article>',
+        )
+
+    def test_duplicate_links_dropped(self):
+        text = '<link href="/a.css" rel="stylesheet" />\n<link href="/b.css" rel="stylesheet" />\n{{ Content }}'
+        assets = AssetUrls({"/a.css": "/bundle.css", "/b.css": "/bundle.css"})
+        template = compile_template(text, "/", assets)
+        self.assertEqual(template.render({"Content": "x"}), '<link href="/bundle.css" rel="stylesheet" />\nx')
+
+    def test_render_chunked_value(self):
+        template = compile_template(TEMPLATE)
+        chunks = iter(["<p>", "hi", "</p>"])
+        fp = io.StringIO()
+        template.write_to(fp, {"Title": "Hello", "Content": chunks})
+        self.assertEqual(fp.getvalue(), template.render({"Title": "Hello", "Content": "<p>hi</p>"}))
+
+    def test_no_placeholders(self):
+        template = compile_template("<p>static</p>")
+        self.assertEqual(template.render({"Title": "T"}), "<p>static</p>")
+
+class TestLoadTemplate(TempDirTestCase):
+    def test_cached_until_modified(self):
+        path = self.write("template.html", "<h1>{{ Title }}</h1>")
+        first = load_template(path)
+        self.assertIs(first, load_template(path))
+
+        self.write(path, "<h2>{{ Title }}</h2>")
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        second = load_template(path)
+        self.assertIsNot(first, second)
+        self.assertEqual(second.render({"Title": "T"}), "<h2>T</h2>")
+
+class TestIncludes(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.mtime_ns = 1_000_000_000
+        self.template = self.write("template.html", '{% include "partials/head.html" %}<main>{{ Content }}</main>')
+        self.head = self.write(os.path.join("partials", "head.html"), "<head>{% include 'title.html' %}<link href=\"/index.css\"></head>")
+        self.title = self.write(os.path.join("partials", "title.html"), "<title>{{ Title }}</title>")
+
+    def write(self, relative_path, text):
+        path = super().write(relative_path, text)
+        # Every write gets a new mtime, however coarse the file system's.
+        self.mtime_ns += 1_000_000_000
+        os.utime(path, ns=(self.mtime_ns, self.mtime_ns))
+        return path
+
+    def test_partials_are_included(self):
+        template = load_template(self.template, "/site/")
+        self.assertEqual(template.render({"Title": "T", "Content": "c"}), '<head><title>T</title><link href="/site/index.css"></head><main>c</main>')
+        self.assertEqual(template.dependencies, (self.template, self.head, self.title))
+        self.assertEqual(template.urls, ("/index.css",))
+        self.assertEqual(template_dependencies(self.template), [self.template, self.head, self.title])
+
+    def test_edited_partial_is_picked_up(self):
+        first = load_template(self.template)
+        self.write(os.path.join("partials", "title.html"), "<title>{{ Title }}!</title>")
+        self.assertIn("<title>T!</title>", load_template(self.template).render({"Title": "T"}))
+        self.assertIsNot(first, load_template(self.template))
+
+    def test_missing_and_recursive_partials(self):
+        self.write(os.path.join("partials", "title.html"), '{% include "missing.html" %}')
+        with self.assertRaisesRegex(ValueError, "Missing partial"):
+            load_template(self.template)
+        self.write(os.path.join("partials", "title.html"), '{% include "head.html" %}')
+        with self.assertRaisesRegex(ValueError, "includes itself"):
+            expand_includes(self.template)
+
+if __name__ == "__main__":
+    unittest.main()
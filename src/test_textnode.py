@@ -23,6 +23,14 @@ class TestTextNode(unittest.TestCase):
         node = TextNode("This is a text node", TextType.TEXT)
         self.assertEqual(node.url, None)
 
+    def test_repr(self):
+        node = TextNode("This is a text node", TextType.LINK, "https://boot.dev")
+        self.assertEqual(repr(node), "TextNode(This is a text node, link, https://boot.dev)")
+
+    def test_no_instance_dict(self):
+        node = TextNode("This is a text node", TextType.TEXT)
+        self.assertFalse(hasattr(node, "__dict__"))
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file